@@ -0,0 +1,183 @@
+"""
+Compares the built-in walker (`mcp_servers.fswalk`) with fd, rg and tree on a
+synthetic tree, by default 1M small files in 10k directories.
+
+For each search the table shows the time to the complete result and to the first
+page of 200 results (what a filesystem tool call returns), with the built-in walker on
+1 thread and on `--threads` threads. External tools missing from PATH are skipped.
+grep is also run through the trigram content index, after building it in a temporary
+directory.
+
+Drop the page cache before a run (`sync; echo 3 > /proc/sys/vm/drop_caches`) to
+measure a cold tree; otherwise the second run of each scenario is served from memory.
+
+Usage:
+    python benchmarks/fs_walk/run.py [--files 1000000] [--per-dir 100] [--threads 8] [--root DIR] [--keep]
+"""
+
+import os
+import time
+import asyncio
+import shutil
+import argparse
+import itertools
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from mcp_servers.content_index import ContentIndex
+from mcp_servers.fswalk import FILE, find, grep, render_tree
+
+PAGE = 200
+NAME_PATTERN = r"7\.txt$"  # matches 10% of the files
+TEXT_PATTERN = "needle"  # in 1% of the files
+
+
+def build_tree(root: Path, files: int, per_dir: int) -> None:
+    """Files f<i>.txt in <root>/d<a>/d<b>/, `per_dir` files and subdirectories per directory."""
+    print(f"Creating {files} files under {root} ...", flush=True)
+    started_at = time.perf_counter()
+    for i in range(files):
+        directory = root / f"d{i // (per_dir * per_dir)}" / f"d{i // per_dir % per_dir}"
+        if i % per_dir == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        content = f"line {i}\n" + ("a needle in the haystack\n" if i % 100 == 0 else "")
+        (directory / f"f{i}.txt").write_text(content)
+    print(f"Created in {time.perf_counter() - started_at:.1f}s\n")
+
+
+def timed(results: Iterator) -> Tuple[float, float, int]:
+    """Seconds to the first PAGE results, seconds to all results, result count."""
+    started_at = time.perf_counter()
+    first_page = None
+    count = 0
+    for _ in results:
+        count += 1
+        if count == PAGE:
+            first_page = time.perf_counter() - started_at
+    total = time.perf_counter() - started_at
+    return first_page if first_page is not None else total, total, count
+
+
+def command_lines(cmd: List[str], cwd: Path) -> Iterator[bytes]:
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE)
+    assert process.stdout is not None
+    try:
+        yield from process.stdout
+    finally:
+        process.kill()
+        process.wait()
+
+
+def external(cmd: List[str], cwd: Path) -> Optional[Callable[[], Iterator]]:
+    return (lambda: command_lines(cmd, cwd)) if shutil.which(cmd[0]) else None
+
+
+def os_walk_files(root: Path) -> Iterator[str]:
+    for directory, _, names in os.walk(root):
+        for name in names:
+            yield os.path.join(directory, name)
+
+
+def tree_lines(root: Path, executor: ThreadPoolExecutor) -> Iterator[str]:
+    """render_tree builds the whole output before returning, so the first page waits for it."""
+    yield from render_tree(root, max_depth=3, executor=executor)[0].splitlines()
+
+
+def build_content_index(root: Path, directory: Path) -> ContentIndex:
+    started_at = time.perf_counter()
+    index = ContentIndex(root, directory)
+    index.start()
+    while not index.ready:
+        time.sleep(0.05)
+    print(
+        f"Content index built in {time.perf_counter() - started_at:.1f}s, "
+        f"{index.snapshot()['disk_bytes'] / 2**20:.1f} MiB on disk\n"
+    )
+    return index
+
+
+def report(name: str, run: Optional[Callable[[], Iterator]]) -> None:
+    if run is None:
+        print(f"{name:<36}{'not installed':>14}")
+        return
+    first_page, total, count = timed(run())
+    print(f"{name:<36}{first_page * 1000:>14.1f}{total:>12.2f}{count:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--root", type=Path, help="Reuse or create the tree here")
+    parser.add_argument("--keep", action="store_true", help="Keep the created tree")
+    args = parser.parse_args()
+
+    root = args.root or Path(tempfile.mkdtemp(prefix="mcp_fs_walk_"))
+    if not any(root.iterdir()):
+        build_tree(root, args.files, args.per_dir)
+
+    single = ThreadPoolExecutor(1)
+    pool = ThreadPoolExecutor(args.threads)
+    index_dir = Path(tempfile.mkdtemp(prefix="mcp_content_index_"))
+    content_index = build_content_index(root, index_dir)
+
+    print(f"{'search':<36}{'first page ms':>14}{'total s':>12}{'results':>12}")
+    report("os.walk (all files, baseline)", lambda: os_walk_files(root))
+    report(
+        "find, built-in, 1 thread",
+        lambda: find(root, NAME_PATTERN, FILE, executor=single),
+    )
+    report(
+        f"find, built-in, {args.threads} threads",
+        lambda: find(root, NAME_PATTERN, FILE, executor=pool),
+    )
+    report(
+        "find, fd -j1",
+        external(["fd", "-Hi", "-j1", "-t", "f", NAME_PATTERN, "."], root),
+    )
+    report(
+        "grep, built-in, 1 thread",
+        lambda: grep(root, TEXT_PATTERN, executor=single),
+    )
+    report(
+        f"grep, built-in, {args.threads} threads",
+        lambda: grep(root, TEXT_PATTERN, executor=pool),
+    )
+    report(
+        f"grep, content index, {args.threads} threads",
+        lambda: content_index.grep(TEXT_PATTERN, pool),
+    )
+    report(
+        "grep, rg --sort=path",
+        external(["rg", "-il", "--sort=path", TEXT_PATTERN, "."], root),
+    )
+    report(
+        f"tree -L 3, built-in, {args.threads} threads",
+        lambda: tree_lines(root, pool),
+    )
+    report(
+        "tree -L 3",
+        external(["tree", "-L", "3", str(root)], root),
+    )
+    # The first page is all a tool call needs, and all the walker reads
+    started_at = time.perf_counter()
+    page = list(itertools.islice(find(root, NAME_PATTERN, FILE, executor=pool), PAGE))
+    print(
+        f"\nA {len(page)}-result find tool call stops after "
+        f"{(time.perf_counter() - started_at) * 1000:.1f} ms"
+    )
+
+    asyncio.run(content_index.close())
+    shutil.rmtree(index_dir)
+    single.shutdown()
+    pool.shutdown()
+    if not args.root and not args.keep:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Measures how much logging stalls the event loop when the log sink is slow (a busy
+terminal or a pipe nobody drains fast enough).
+
+Compares the old setup (`StreamHandler` + `ColoredFormatter` writing on the event
+loop thread) with the queue-based pipeline used by `MCPServersLogger` (records are
+enqueued; formatting and writing happen on a background thread), with and without
+per-call-site rate limiting.
+
+Usage:
+    python benchmarks/logging_stall/run.py [--requests 200] [--lines 5] [--write-delay-ms 1]
+"""
+
+import os
+
+# Rate limiting is switched on explicitly for the last scenario only
+os.environ["MCP_SERVERS_LOG_RATE_LIMIT"] = "0"
+
+import time  # noqa: E402
+import asyncio  # noqa: E402
+import logging  # noqa: E402
+import argparse  # noqa: E402
+from typing import Dict, List  # noqa: E402
+
+from mcp_servers import logger as logger_module  # noqa: E402
+from mcp_servers.logger import ColoredFormatter, MCPServersLogger  # noqa: E402
+
+
+class SlowStream:
+    """File-like sink whose writes block for `delay` seconds, like a full pipe."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, data: str) -> int:
+        time.sleep(self.delay)
+        self.writes += 1
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+async def monitor_lag(samples: List[float], stop: asyncio.Event, interval: float):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def fake_request(log: logging.Logger, request_id: int, lines: int) -> None:
+    for i in range(lines):
+        log.info(
+            f"Querying (Attempt 1): GET search with params {{'q': 'query {request_id}', 'page': {i}}}"
+        )
+        await asyncio.sleep(0)
+
+
+async def run_scenario(log: logging.Logger, requests: int, lines: int) -> Dict:
+    samples: List[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(samples, stop, 0.001))
+    await asyncio.sleep(0.01)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(fake_request(log, i, lines) for i in range(requests)))
+    elapsed = time.perf_counter() - started_at
+
+    stop.set()
+    await monitor
+    samples.sort()
+    return {
+        "workload_s": elapsed,
+        "max_lag_ms": samples[-1] * 1000 if samples else 0.0,
+        "p99_lag_ms": samples[int(len(samples) * 0.99)] * 1000 if samples else 0.0,
+        "total_lag_ms": sum(samples) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--write-delay-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    delay = args.write_delay_ms / 1000
+
+    # Before: formatting and blocking writes on the event loop thread
+    sync_stream = SlowStream(delay)
+    sync_log = logging.getLogger("bench.sync")
+    sync_log.propagate = False
+    sync_handler = logging.StreamHandler(sync_stream)  # type: ignore[arg-type]
+    sync_handler.setFormatter(ColoredFormatter())
+    sync_log.addHandler(sync_handler)
+    sync_log.setLevel(logging.INFO)
+
+    # After: the shared queue pipeline, its console handler pointed at a slow sink
+    queued_stream = SlowStream(delay)
+    logger_module._console_handler.setStream(queued_stream)  # type: ignore[arg-type]
+    queued_log = MCPServersLogger.get_logger("bench.queued")
+
+    results = {
+        "sync StreamHandler": asyncio.run(
+            run_scenario(sync_log, args.requests, args.lines)
+        ),
+        "queue pipeline": asyncio.run(
+            run_scenario(queued_log, args.requests, args.lines)
+        ),
+    }
+    os.environ["MCP_SERVERS_LOG_RATE_LIMIT"] = "20"
+    logger_module.configure_logging()
+    results["queue + rate limit"] = asyncio.run(
+        run_scenario(queued_log, args.requests, args.lines)
+    )
+    logger_module._stop_listeners()  # drain before printing the report
+
+    print(
+        f"\n{args.requests} requests x {args.lines} INFO lines, "
+        f"{args.write_delay_ms} ms per write to the sink\n"
+    )
+    print(
+        f"{'setup':<22}{'workload s':>12}{'max lag ms':>12}{'p99 lag ms':>12}{'total lag ms':>14}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<22}{r['workload_s']:>12.3f}{r['max_lag_ms']:>12.1f}"
+            f"{r['p99_lag_ms']:>12.1f}{r['total_lag_ms']:>14.1f}"
+        )
+    print(
+        f"\nsink writes: sync={sync_stream.writes}, queued (both queue runs)={queued_stream.writes}"
+    )
+
+
+if __name__ == "__main__":
+    main()
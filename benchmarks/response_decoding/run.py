@@ -0,0 +1,116 @@
+"""
+Compares the per-request cost of the old response handling (decode the full body to
+text for debug logging, then `response.json()`) with the single-pass path used by
+`MCPServerHttpBase` (parse JSON straight from bytes, orjson when installed).
+
+Usage:
+    python benchmarks/response_decoding/run.py [--sizes-mb 1 5 10] [--repeat 5]
+"""
+
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Callable, Dict, Any
+
+import httpx
+
+from mcp_servers.serialization import JSON_BACKEND, json_loads
+
+
+def make_tavily_like_payload(target_size_bytes: int) -> bytes:
+    """Builds a Tavily crawl-like JSON document of roughly `target_size_bytes`."""
+    page_text = "Lorem ipsum dolor sit amet, çonsectetur adipiscing elit. 🚀 " * 40
+    results = []
+    size = 0
+    i = 0
+    while size < target_size_bytes:
+        item = {
+            "url": f"https://docs.example.com/page/{i}",
+            "raw_content": page_text,
+            "images": [f"https://docs.example.com/img/{i}.png"],
+        }
+        results.append(item)
+        size += len(page_text.encode("utf-8")) + 100
+        i += 1
+    document = {"base_url": "docs.example.com", "results": results}
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+def make_response(body: bytes) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=body,
+        headers={"content-type": "application/json; charset=utf-8"},
+    )
+
+
+def old_path(response: httpx.Response) -> Any:
+    raw_response_text_for_debug = response.content.decode(
+        response.charset_encoding or response.encoding or "utf-8"
+    )
+    _ = raw_response_text_for_debug
+    return response.json()
+
+
+def new_path(response: httpx.Response) -> Any:
+    return json_loads(response.content)
+
+
+def stdlib_single_pass(response: httpx.Response) -> Any:
+    return json.loads(response.content)
+
+
+def time_it(fn: Callable[[httpx.Response], Any], body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        response = make_response(body)
+        start = time.perf_counter()
+        fn(response)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn: Callable[[httpx.Response], Any], body: bytes) -> int:
+    response = make_response(body)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = fn(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths: Dict[str, Callable[[httpx.Response], Any]] = {
+        "old (decode + response.json)": old_path,
+        "stdlib single pass": stdlib_single_pass,
+        f"new ({JSON_BACKEND})": new_path,
+    }
+
+    print(f"JSON backend: {JSON_BACKEND}, best of {args.repeat} runs\n")
+    header = f"{'size':>8} | {'path':<30} | {'time (ms)':>10} | {'peak mem (MB)':>13} | {'speedup':>7}"
+    print(header)
+    print("-" * len(header))
+    for size_mb in args.sizes_mb:
+        body = make_tavily_like_payload(int(size_mb * 1024 * 1024))
+        baseline = None
+        for name, fn in paths.items():
+            elapsed = time_it(fn, body, args.repeat)
+            peak = peak_memory(fn, body)
+            baseline = baseline or elapsed
+            print(
+                f"{len(body) / 1024 / 1024:>6.1f}MB | {name:<30} | {elapsed * 1000:>10.2f} | "
+                f"{peak / 1024 / 1024:>13.1f} | {baseline / elapsed:>6.2f}x"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
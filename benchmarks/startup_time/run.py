@@ -0,0 +1,136 @@
+"""
+Measures how long an MCP server takes to come up.
+
+Three numbers, each the median of several runs:
+
+- CLI import: `python -c "import mcp_servers.cli_app"` in a fresh interpreter, the
+  floor of every `mcpserver` invocation (`status`, `stop`, ...).
+- FastMCP import: `python -c "import mcp.server.fastmcp"`, the floor of every cold
+  start. Cold start minus this is what this package adds.
+- Cold start: from spawning `mcpserver start --server filesystem` to the first
+  accepted request (`GET /metrics` answering 200).
+- Warm start: `await server.start()` in an interpreter that has already imported
+  everything, i.e. the time spent in setup and uvicorn startup alone. The old
+  readiness check polled every 100 ms, so this used to be 100-200 ms.
+
+Usage:
+    python benchmarks/startup_time/run.py [--runs 5] [--port 8799]
+"""
+
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+import urllib.request
+from pathlib import Path
+from typing import Callable, List
+
+
+def free_port(port: int) -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", port if port else 0))
+        return s.getsockname()[1]
+
+
+def median_ms(samples: List[float]) -> str:
+    return (
+        f"median {statistics.median(samples) * 1000:7.1f} ms, "
+        f"min {min(samples) * 1000:7.1f} ms"
+    )
+
+
+def repeat(runs: int, fn: Callable[[], float]) -> List[float]:
+    return [fn() for _ in range(runs)]
+
+
+def python_import(module: str) -> float:
+    started_at = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+    return time.perf_counter() - started_at
+
+
+def wait_accepting(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.002)
+    raise TimeoutError(f"No response from {url} after {timeout}s")
+
+
+def cold_start(port: int, allowed_dir: str) -> float:
+    port = free_port(port)
+    started_at = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "mcp_servers.cli_app",
+            "start",
+            "--server",
+            "filesystem",
+            "--allowed-dir",
+            allowed_dir,
+            "--port",
+            str(port),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_accepting(f"http://127.0.0.1:{port}/metrics", proc)
+        return time.perf_counter() - started_at
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+async def warm_start(runs: int, port: int, allowed_dir: str) -> List[float]:
+    from mcp_servers.filesystem import MCPServerFilesystem
+
+    samples = []
+    for _ in range(runs):
+        server = MCPServerFilesystem(
+            host="127.0.0.1",
+            port=free_port(port),
+            allowed_dir=Path(allowed_dir),
+        )
+        started_at = time.perf_counter()
+        await server.start()
+        samples.append(time.perf_counter() - started_at)
+        await server.stop()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--port", type=int, default=0, help="Preferred port; 0 picks a free one"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as allowed_dir:
+        imports = repeat(args.runs, lambda: python_import("mcp_servers.cli_app"))
+        fastmcp = repeat(args.runs, lambda: python_import("mcp.server.fastmcp"))
+        cold = repeat(args.runs, lambda: cold_start(args.port, allowed_dir))
+        warm = asyncio.run(warm_start(args.runs, args.port, allowed_dir))
+
+    print(f"\n{args.runs} runs each, Python {sys.version.split()[0]}\n")
+    print(f"{'CLI import':<34}{median_ms(imports)}")
+    print(f"{'FastMCP import (cold start floor)':<34}{median_ms(fastmcp)}")
+    print(f"{'cold start to first request':<34}{median_ms(cold)}")
+    print(f"{'warm start (server.start())':<34}{median_ms(warm)}")
+
+
+if __name__ == "__main__":
+    main()
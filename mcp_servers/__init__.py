@@ -8,7 +8,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-from mcp_servers.logger import MCPServersLogger
+from mcp_servers.logger import MCPServersLogger, configure_logging
 
 
 DEFAULT_CONFIG_DIR = Path("~/.mcp_servers").expanduser().resolve()
@@ -22,6 +22,7 @@ _logger = MCPServersLogger.get_logger(__name__)
 def load_env_vars(dotenv_path: Optional[str] = str(DEFAULT_ENV_FILE)) -> None:
     """Loads environment variables from a .env file."""
     loaded = load_dotenv(dotenv_path=dotenv_path, override=True)
+    configure_logging()
     if loaded:
         _logger.debug(
             f".env file loaded successfully from {dotenv_path or 'default location'}."
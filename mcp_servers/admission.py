@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from mcp_servers.exceptions import MCPServerOverloadedError
+
+
+class AdmissionController:
+    """
+    Caps how many tool calls run at once, with a bounded FIFO queue for the rest.
+
+    Up to `max_concurrency` calls run concurrently. Further calls wait in arrival
+    order, at most `max_queue` of them; once the queue is full new calls are
+    rejected immediately. A queued call that is not admitted within `queue_timeout`
+    seconds is rejected as well, so overload surfaces as a fast, retryable
+    MCPServerOverloadedError instead of every call slowly timing out.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: Optional[float] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """
+        Waits for a free slot.
+
+        Raises:
+            MCPServerOverloadedError: If the queue is full or the queue deadline passes.
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise MCPServerOverloadedError(
+                f"Server is overloaded: {self.active} calls running and "
+                f"{len(self._waiters)} queued. Retry shortly.",
+                retry_after=1.0,
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            elif waiter in self._waiters:  # May already be skipped by `release`
+                self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                self.timed_out += 1
+                raise MCPServerOverloadedError(
+                    f"Server is overloaded: call waited {self.queue_timeout}s in the "
+                    "queue without being admitted. Retry shortly.",
+                    retry_after=1.0,
+                ) from e
+            raise
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Frees a slot, handing it directly to the oldest queued call if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # `active` is unchanged: the slot moves over
+                return
+        self.active -= 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
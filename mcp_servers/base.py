@@ -1,35 +1,169 @@
 import time
+import zlib
 import asyncio
 import logging
+import sqlite3
+import functools
+import inspect
+import socket
+from pathlib import Path
 import httpx
 from mcp.types import ToolAnnotations
 import uvicorn
 from abc import ABC, abstractmethod
-from typing import Callable, Optional, Dict, Any
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    List,
+    Literal,
+    Optional,
+    Dict,
+    Any,
+    TypeVar,
+)
 from asyncio import Task
 
 from uvicorn import Server
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic_ai.mcp import MCPServerStreamableHTTP
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
 
 from mcp_servers.exceptions import (
     MCPRateLimitError,
+    MCPServerError,
+    MCPServerOverloadedError,
     MCPToolConfigurationError,
     MCPUpstreamServiceError,
 )
+from mcp_servers import DEFAULT_CONFIG_DIR
+from mcp_servers.admission import AdmissionController
+from mcp_servers.cache import ResponseCache, SQLiteResponseCache, make_cache_key
+from mcp_servers.circuit_breaker import CircuitBreaker, CircuitState
 from mcp_servers.logger import MCPServersLogger
+from mcp_servers.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    RATE_LIMIT_REJECTIONS,
+    RATE_LIMIT_WAIT,
+    REGISTRY,
+    TOOL_CALL_DURATION,
+    TOOL_CALLS,
+    TOOL_CALLS_IN_FLIGHT,
+    UPSTREAM_HEDGES,
+    UPSTREAM_REQUEST_DURATION,
+    UPSTREAM_RESPONSES,
+    UPSTREAM_RETRIES,
+    MetricFamily,
+)
+from mcp_servers.rate_limiter import (
+    SQLiteTokenBucketRateLimiter,
+    TokenBucketRateLimiter,
+)
+from mcp_servers.retry import (
+    RETRYABLE_STATUS_CODES,
+    compute_backoff_delay,
+    get_retry_after_delay,
+)
+from mcp_servers.serialization import json_loads
+from mcp_servers.singleflight import SingleFlight
+from mcp_servers.stats import LatencyWindow, ToolCallStats
+from mcp_servers.watchdog import LoopWatchdog
+from mcp_servers.tracing import (
+    SPAN_KIND_CLIENT,
+    BatchSpanProcessor,
+    JsonLinesSpanExporter,
+    OTLPHttpSpanExporter,
+    Tracer,
+    current_span,
+)
+
+if TYPE_CHECKING:
+    # pydantic_ai is only needed by clients; importing it costs ~0.4s of server startup
+    from pydantic_ai.mcp import MCPServerStreamableHTTP
+
+# Upper bound on how much of a response body is decoded for logs and error details
+DEBUG_SNIPPET_BYTES = 500
+# Tools report handled failures as strings starting with this prefix
+TOOL_ERROR_PREFIX = "Error"
+
+
+_T = TypeVar("_T")
+
+
+def uvloop_available() -> bool:
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_event_loop(main: Awaitable[_T], loop: str = "asyncio") -> _T:
+    """
+    Runs `main` like `asyncio.run`, on uvloop when `loop` is "uvloop" or when it is
+    "auto" and uvloop is installed (the same rule uvicorn applies to `--loop auto`).
+    Uvicorn's own loop option only applies to `uvicorn.run`; our servers are started
+    inside an already running loop, so the loop has to be chosen here.
+    """
+    loop_factory = None
+    if loop in ("auto", "uvloop"):
+        if uvloop_available():
+            import uvloop
+
+            loop_factory = uvloop.new_event_loop
+        elif loop == "uvloop":
+            logging.getLogger(__name__).warning(
+                "UVICORN_LOOP=uvloop but uvloop is not installed "
+                "(pip install 'mcp-servers[speedups]'). Using asyncio."
+            )
+    return asyncio.run(main, loop_factory=loop_factory)  # type: ignore[arg-type]
+
+
+class MCPUvicornServer(Server):
+    """uvicorn.Server that signals readiness with an event instead of the `started` flag."""
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        self.started_event = asyncio.Event()
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.started_event.set()
+
+    async def wait_started(self, serve_task: Task) -> bool:
+        """
+        Waits until the server accepts connections. Returns False if `serve_task`
+        ended first, e.g. because the port was in use or the app lifespan failed.
+        """
+        started = asyncio.ensure_future(self.started_event.wait())
+        try:
+            await asyncio.wait(
+                {started, serve_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            started.cancel()
+        return self.started_event.is_set()
 
 
 class MCPServer(FastMCP):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self, *args, uvicorn_options: Optional[Dict[str, Any]] = None, **kwargs
+    ):
         super().__init__(*args, **kwargs)
-        self.server: Optional[Server] = None
+        self.uvicorn_options = uvicorn_options or {}
+        # Pre-bound listening sockets, e.g. shared by the processes of `--workers`
+        self.sockets: Optional[List[socket.socket]] = None
+        self.server: Optional[MCPUvicornServer] = None
         self.server_task: Optional[Task] = None
 
     async def run_streamable_http_async(self) -> None:
-        """Run the server using StreamableHTTP transport."""
+        """
+        Starts serving with the StreamableHTTP transport in a background task and
+        returns immediately; await `server.wait_started(server_task)` for readiness.
+        """
 
         starlette_app = self.streamable_http_app()
 
@@ -38,9 +172,10 @@ class MCPServer(FastMCP):
             host=self.settings.host,
             port=self.settings.port,
             log_level=self.settings.log_level.lower(),
+            **self.uvicorn_options,
         )
-        self.server = uvicorn.Server(config)
-        self.server_task = asyncio.create_task(self.server.serve())
+        self.server = MCPUvicornServer(config)
+        self.server_task = asyncio.create_task(self.server.serve(sockets=self.sockets))
 
 
 class BaseMCPServerSettings(BaseSettings):
@@ -52,6 +187,31 @@ class BaseMCPServerSettings(BaseSettings):
     LOG_LEVEL: int = logging.INFO
     HTTP_CLIENT_TIMEOUT: float = 60.0
     RATE_LIMIT_PER_SECOND: Optional[int] = 50
+    RATE_LIMIT_BURST: Optional[int] = None  # defaults to RATE_LIMIT_PER_SECOND
+    RATE_LIMIT_MAX_WAIT: Optional[float] = 10.0
+    # Admission control for tool calls; MAX_CONCURRENT_TOOL_CALLS=None disables it
+    MAX_CONCURRENT_TOOL_CALLS: Optional[int] = 32
+    TOOL_CALL_QUEUE_SIZE: int = 128
+    TOOL_CALL_QUEUE_TIMEOUT: Optional[float] = 30.0  # max seconds queued
+    METRICS_ENABLED: bool = True  # serve Prometheus metrics on /metrics
+    # Sampled tracing of tool calls, exported to a JSONL file or an OTLP/HTTP collector
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 0.1
+    TRACING_EXPORTER: Literal["jsonl", "otlp"] = "jsonl"
+    # Defaults to DEFAULT_CONFIG_DIR/traces/<server>.jsonl
+    TRACING_JSONL_PATH: Optional[Path] = None
+    TRACING_OTLP_ENDPOINT: str = "http://127.0.0.1:4318/v1/traces"
+    # Logs the blocking stack when the event loop stalls longer than the threshold
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_THRESHOLD: float = 0.25  # seconds
+    # Uvicorn runtime; "auto" uses uvloop/httptools when installed (speedups extra)
+    UVICORN_LOOP: Literal["auto", "asyncio", "uvloop"] = "asyncio"
+    UVICORN_HTTP: Literal["auto", "h11", "httptools"] = "auto"
+    UVICORN_BACKLOG: int = 2048  # pending TCP connections
+    UVICORN_LIMIT_CONCURRENCY: Optional[int] = None  # connections before 503s
+    UVICORN_TIMEOUT_KEEP_ALIVE: int = 5  # seconds an idle connection is kept open
+    # Max bytes buffered for an incomplete HTTP request head (h11 parser only)
+    UVICORN_H11_MAX_INCOMPLETE_EVENT_SIZE: Optional[int] = None
 
     model_config = SettingsConfigDict(
         extra="allow",
@@ -72,30 +232,60 @@ class AbstractMCPServer(ABC):
         self,
         host: str,
         port: int,
+        settings_overrides: Optional[Dict[str, Any]] = None,
+        sockets: Optional[List[socket.socket]] = None,
         **kwargs,
     ):
         """
         Initializes the server. Derived classes are expected to load their
         specific settings in their __init__ and pass them to super().__init__(settings=...).
         Alternatively, this __init__ can call an abstract method to load settings.
+        `settings_overrides` (e.g. from CLI flags) take precedence over the environment.
+        `sockets` are already listening sockets to serve on instead of binding HOST:PORT.
         """
         self.logger = MCPServersLogger.get_logger(self.__class__.__name__)
 
         self.http_client: Optional[httpx.AsyncClient] = None
-
-        self.rate_limit_state: Dict[str, Any] = {
-            "last_second_reset_ts": time.time(),
-            "second_count": 0,
-        }
+        # Connection pool shared with other servers in the process (CompositeMCPServer)
+        self.http_transport: Optional[httpx.AsyncBaseTransport] = None
+        self._warmup_task: Optional[Task] = None
+        self.mount_path = ""  # URL prefix when mounted in a CompositeMCPServer
+
+        self.rate_limiter: Optional[TokenBucketRateLimiter] = None
+        self.response_cache: Optional[ResponseCache] = None
+        self.disk_cache: Optional[SQLiteResponseCache] = None
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        self.upstream_latency: Dict[str, LatencyWindow] = {}
+        self.in_flight_requests = SingleFlight()
+        self.tool_stats: Dict[str, ToolCallStats] = {}
 
         self._settings = self._load_and_validate_settings(host, port, **kwargs)
+        for field, value in (settings_overrides or {}).items():
+            if field in type(self._settings).model_fields:
+                setattr(self._settings, field, value)
+        self.tracer = Tracer(self.settings.SERVER_NAME)  # disabled until start()
+        self.watchdog: Optional[LoopWatchdog] = None
+
+        self.admission: Optional[AdmissionController] = None
+        if self.settings.MAX_CONCURRENT_TOOL_CALLS:
+            self.admission = AdmissionController(
+                max_concurrency=self.settings.MAX_CONCURRENT_TOOL_CALLS,
+                max_queue=self.settings.TOOL_CALL_QUEUE_SIZE,
+                queue_timeout=self.settings.TOOL_CALL_QUEUE_TIMEOUT,
+            )
 
         self.mcp_server = MCPServer(
             name=self.settings.SERVER_NAME,
             port=self.settings.PORT,
             host=self.settings.HOST,
             log_level="WARNING",
+            uvicorn_options=self._get_uvicorn_options(),
         )
+        self.mcp_server.sockets = sockets
+        if self.settings.METRICS_ENABLED:
+            self.mcp_server.custom_route("/metrics", methods=["GET"])(
+                self._handle_metrics
+            )
 
         self._log_initial_config()
 
@@ -104,6 +294,25 @@ class AbstractMCPServer(ABC):
     def settings(self) -> BaseMCPServerSettings:
         return self._settings
 
+    def _get_uvicorn_options(self) -> Dict[str, Any]:
+        http = self.settings.UVICORN_HTTP
+        if http == "httptools":
+            try:
+                import httptools  # noqa: F401
+            except ImportError:
+                self.logger.warning(
+                    "UVICORN_HTTP=httptools but httptools is not installed "
+                    "(pip install 'mcp-servers[speedups]'). Using h11."
+                )
+                http = "h11"
+        return {
+            "http": http,
+            "backlog": self.settings.UVICORN_BACKLOG,
+            "limit_concurrency": self.settings.UVICORN_LIMIT_CONCURRENCY,
+            "timeout_keep_alive": self.settings.UVICORN_TIMEOUT_KEEP_ALIVE,
+            "h11_max_incomplete_event_size": self.settings.UVICORN_H11_MAX_INCOMPLETE_EVENT_SIZE,
+        }
+
     def _log_initial_config(self):
         settings_dict = self.settings.model_dump()
         max_field_length = max([len(f) for f in settings_dict.keys()])
@@ -153,8 +362,37 @@ class AbstractMCPServer(ABC):
         """
         pass
 
-    async def start(self):
+    async def setup(self) -> None:
+        """
+        Prepares everything but the HTTP listener: tools, tracing, metrics and, in
+        derived classes, upstream clients. `start()` calls it; a CompositeMCPServer
+        calls it directly and serves the app itself.
+        """
+        self._init_tracer()
+        if self.settings.LOOP_WATCHDOG_ENABLED and self.watchdog is None:
+            self.watchdog = LoopWatchdog.acquire(self.settings.LOOP_WATCHDOG_THRESHOLD)
         await self._register_tools()
+        # Skips admission control so health stays readable while the server is overloaded
+        self._register_mcp_server_tool(
+            self._get_server_stats,
+            read_only=True,
+            destructive=False,
+            idempotent=False,
+            open_world=False,
+            admission=False,
+        )
+        REGISTRY.register_collector(self._collect_metrics)
+
+    async def teardown(self) -> None:
+        """Releases what `setup()` acquired. Derived classes extend this."""
+        REGISTRY.unregister_collector(self._collect_metrics)
+        if self.watchdog:
+            self.watchdog.release()
+            self.watchdog = None
+        await asyncio.to_thread(self.tracer.shutdown)  # flushes buffered spans
+
+    async def start(self):
+        await self.setup()
 
         if not self.mcp_server or not self.mcp_server.streamable_http_app:
             self.logger.critical(
@@ -164,11 +402,14 @@ class AbstractMCPServer(ABC):
                 "FastMCP and/or streamable_http_app not available."
             )
 
-        _ = asyncio.create_task(self.mcp_server.run_streamable_http_async())
-        while not self.mcp_server.server:
-            await asyncio.sleep(0.1)
-        while not self.mcp_server.server.started:
-            await asyncio.sleep(0.1)
+        await self.mcp_server.run_streamable_http_async()
+        assert self.mcp_server.server and self.mcp_server.server_task
+        if not await self.mcp_server.server.wait_started(self.mcp_server.server_task):
+            await self.teardown()
+            raise MCPServerError(
+                f"{self.settings.SERVER_NAME} failed to start on "
+                f"{self.settings.HOST}:{self.settings.PORT}."
+            )
 
     async def stop(self):
         try:
@@ -183,6 +424,32 @@ class AbstractMCPServer(ABC):
         except Exception as exp:
             print("unknown exception occured while stopping Streamable HTTP server")
             self.logger.exception(exp)
+        await self.teardown()
+
+    def _init_tracer(self) -> None:
+        if not self.settings.TRACING_ENABLED or self.tracer.enabled:
+            return
+
+        service_name = self.settings.SERVER_NAME
+        if self.settings.TRACING_EXPORTER == "otlp":
+            exporter = OTLPHttpSpanExporter(
+                self.settings.TRACING_OTLP_ENDPOINT, service_name
+            )
+            destination = self.settings.TRACING_OTLP_ENDPOINT
+        else:
+            path = self.settings.TRACING_JSONL_PATH or (
+                DEFAULT_CONFIG_DIR / "traces" / f"{service_name.lower()}.jsonl"
+            )
+            exporter = JsonLinesSpanExporter(Path(path).expanduser(), service_name)
+            destination = str(exporter.path)
+        self.tracer = Tracer(
+            service_name,
+            BatchSpanProcessor(exporter),
+            sample_ratio=self.settings.TRACING_SAMPLE_RATIO,
+        )
+        self.logger.info(
+            f"Tracing {self.settings.TRACING_SAMPLE_RATIO:.0%} of tool calls to {destination}."
+        )
 
     async def await_server_task(self):
         if self.mcp_server.server_task:
@@ -190,14 +457,16 @@ class AbstractMCPServer(ABC):
         else:
             self.logger.warning("There is no active server task to await")
 
-    def get_mcp_server_streamable_http(self) -> MCPServerStreamableHTTP:
+    def get_mcp_server_streamable_http(self) -> "MCPServerStreamableHTTP":
         """Returns an MCPServerStreamableHTTP."""
+        from pydantic_ai.mcp import MCPServerStreamableHTTP
+
         if not self.settings:
             raise MCPToolConfigurationError(
                 "Settings not loaded, cannot generate MCPServerHTTP URL."
             )
         return MCPServerStreamableHTTP(
-            url=f"http://{self.settings.HOST}:{self.settings.PORT}/mcp"
+            url=f"http://{self.settings.HOST}:{self.settings.PORT}{self.mount_path}/mcp"
         )
 
     def _register_mcp_server_tool(
@@ -207,9 +476,10 @@ class AbstractMCPServer(ABC):
         destructive: bool = True,
         idempotent: bool = False,
         open_world: bool = True,
+        admission: bool = True,
     ) -> None:
         self.mcp_server.add_tool(
-            fn=fn,
+            fn=self._wrap_tool(fn, admission),
             name=fn.__name__,
             description=fn.__doc__,
             annotations=ToolAnnotations(
@@ -221,26 +491,209 @@ class AbstractMCPServer(ABC):
             ),
         )
 
+    def _wrap_tool(self, fn: Callable, admission: bool = True) -> Callable:
+        """
+        Wraps a tool so every call passes admission control (unless `admission` is False)
+        and is measured. The wrapper is always async; `functools.wraps` keeps the
+        signature FastMCP derives the schema from.
+        """
+        server_name = self.settings.SERVER_NAME
+        tool_name = fn.__name__
+        stats = self.tool_stats[tool_name] = ToolCallStats()
+        calls_ok = TOOL_CALLS.labels(server_name, tool_name, "ok")
+        calls_error = TOOL_CALLS.labels(server_name, tool_name, "error")
+        calls_rejected = TOOL_CALLS.labels(server_name, tool_name, "rejected")
+        call_duration = TOOL_CALL_DURATION.labels(server_name, tool_name)
+        calls_in_flight = TOOL_CALLS_IN_FLIGHT.labels(server_name, tool_name)
+
+        async def call(args, kwargs):
+            calls_in_flight.inc()
+            try:
+                result = fn(*args, **kwargs)
+                return await result if inspect.isawaitable(result) else result
+            finally:
+                calls_in_flight.dec()
+
+        @functools.wraps(fn)
+        async def tool(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = calls_error
+            try:
+                with self.tracer.span(
+                    f"tool {tool_name}", **{"mcp.server": server_name}
+                ) as span:
+                    if not (admission and self.admission):
+                        result = await call(args, kwargs)
+                    else:
+                        try:
+                            with self.tracer.span("admission.queue"):
+                                await self.admission.acquire()
+                        except MCPServerOverloadedError as e:
+                            outcome = calls_rejected
+                            stats.rejected += 1
+                            self.logger.warning(f"Rejected {tool_name}: {e}")
+                            raise
+                        try:
+                            result = await call(args, kwargs)
+                        finally:
+                            self.admission.release()
+                    if isinstance(result, str) and result.startswith(TOOL_ERROR_PREFIX):
+                        span.set_error(result[:200])
+                    else:
+                        outcome = calls_ok
+                    return result
+            finally:
+                elapsed = time.perf_counter() - started_at
+                outcome.inc()
+                call_duration.observe(elapsed)
+                if outcome is not calls_rejected:
+                    stats.record(elapsed, outcome is calls_error)
+
+        return tool
+
+    async def _get_server_stats(self) -> Dict[str, Any]:
+        """
+        Returns live health statistics of this MCP server, to help choose between servers.
+        Per tool: call/error/rejection totals, plus p50/p95/p99 latency (ms) and error rate
+        over the most recent calls. Also reports admission queue depth, event loop stalls
+        (when the watchdog is enabled) and, for servers calling an upstream API,
+        remaining rate-limit budget, upstream latency and circuit breaker state.
+        Returns:
+            dict: Server statistics.
+        """
+        await self._refresh_stats()
+        return self._collect_server_stats()
+
+    async def _refresh_stats(self) -> None:
+        """Reloads state kept outside the process before stats or metrics are collected."""
+
+    def _collect_server_stats(self) -> Dict[str, Any]:
+        """Builds the `_get_server_stats` payload. Derived classes extend this."""
+        return {
+            "server": self.settings.SERVER_NAME,
+            "tools": {
+                name: stats.snapshot()
+                for name, stats in self.tool_stats.items()
+                if name != "_get_server_stats"
+            },
+            "admission": self.admission.snapshot() if self.admission else None,
+            "event_loop": self.watchdog.snapshot() if self.watchdog else None,
+        }
+
+    async def _handle_metrics(self, request: Request) -> Response:
+        await self._refresh_stats()
+        return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+    def _collect_metrics(self) -> List[MetricFamily]:
+        """Reports state-derived metrics at scrape time. Derived classes extend this."""
+        families: List[MetricFamily] = []
+        if self.admission:
+            labels = {"server": self.settings.SERVER_NAME}
+            snapshot = self.admission.snapshot()
+            queued = MetricFamily(
+                "mcp_tool_calls_queued", "gauge", "Tool calls waiting for admission."
+            )
+            queued.add(labels, snapshot["queued"])
+            active = MetricFamily(
+                "mcp_tool_calls_active", "gauge", "Tool calls admitted and running."
+            )
+            active.add(labels, snapshot["active"])
+            rejected = MetricFamily(
+                "mcp_admission_rejections",
+                "counter",
+                "Tool calls rejected by admission control, by reason.",
+            )
+            rejected.add(
+                {**labels, "reason": "queue_full"}, snapshot["rejected"], "_total"
+            )
+            rejected.add(
+                {**labels, "reason": "queue_timeout"}, snapshot["timed_out"], "_total"
+            )
+            families += [queued, active, rejected]
+        return families
+
 
 class MCPServerHttpBaseSettings(BaseMCPServerSettings):
     """Base settings for all MCP servers using HTTP."""
 
     HTTP_CLIENT_TIMEOUT: float = 60.0
+    # Per-phase timeouts; read/write fall back to HTTP_CLIENT_TIMEOUT when unset
+    HTTP_CONNECT_TIMEOUT: Optional[float] = 10.0
+    HTTP_READ_TIMEOUT: Optional[float] = None
+    HTTP_WRITE_TIMEOUT: Optional[float] = None
+    HTTP_POOL_TIMEOUT: Optional[float] = 10.0  # wait for a free pooled connection
+    # Connection pool and keep-alive
+    HTTP_MAX_CONNECTIONS: Optional[int] = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: Optional[int] = 20
+    HTTP_KEEPALIVE_EXPIRY: Optional[float] = 60.0
+    HTTP2_ENABLED: bool = False  # requires the `http2` extra (h2)
+    # Connections opened to BASE_URL in the background at startup; 0 disables
+    HTTP_WARMUP_CONNECTIONS: int = 1
     # Default rate limit: 5 requests per second. Servers can override.
     RATE_LIMIT_PER_SECOND: Optional[int] = 50
+    # Share rate limit buckets with other processes of this server (on with --workers)
+    RATE_LIMIT_SHARED: bool = False
+    # Defaults to DEFAULT_CONFIG_DIR/state/rate_limits.sqlite3
+    RATE_LIMIT_STATE_PATH: Optional[Path] = None
+    # Retry policy shared by all upstream requests
+    HTTP_MAX_RETRIES: int = 2
+    HTTP_RETRY_BASE_DELAY: float = 0.5
+    HTTP_RETRY_MAX_DELAY: float = 10.0  # longer Retry-After hints fail the call
+    HTTP_REQUEST_DEADLINE: Optional[float] = 90.0  # overall per-call budget, seconds
+    # In-memory cache for idempotent requests; a TTL of 0 disables it
+    RESPONSE_CACHE_TTL: float = 300.0
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Optional on-disk cache shared by processes and kept across restarts
+    DISK_CACHE_ENABLED: bool = False
+    # Defaults to DEFAULT_CONFIG_DIR/cache/<server>.sqlite3
+    DISK_CACHE_PATH: Optional[Path] = None
+    DISK_CACHE_TTL: float = 24 * 60 * 60
+    DISK_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Opt-in hedging for idempotent requests: once an attempt is slower than the running
+    # HTTP_HEDGING_PERCENTILE latency of its endpoint, a second identical request is sent
+    HTTP_HEDGING_ENABLED: bool = False
+    HTTP_HEDGING_PERCENTILE: float = 95.0
+    # No hedging until the endpoint has this many latency samples
+    HTTP_HEDGING_MIN_SAMPLES: int = 20
+    HTTP_HEDGING_MIN_DELAY: float = 0.05  # lower bound for the hedge threshold, seconds
+    # Fail fast while the upstream is down, probing recovery with a single request
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures
+    CIRCUIT_BREAKER_ERROR_RATE: float = 0.5  # over the last CIRCUIT_BREAKER_WINDOW
+    CIRCUIT_BREAKER_WINDOW: int = 20
+    CIRCUIT_BREAKER_MIN_REQUESTS: int = 10
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds open before probing
 
     model_config = BaseMCPServerSettings.model_config
 
 
 class MCPServerHttpBase(AbstractMCPServer):
 
-    async def start(self):
+    async def setup(self) -> None:
+        self._init_rate_limiter()
+        self._init_response_cache()
         await self._init_http_client()
-        return await super().start()
-
-    async def stop(self):
+        self._init_circuit_breaker()
+        self._start_http_warmup()
+        await super().setup()
+
+    async def teardown(self) -> None:
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        self._warmup_task = None
         await self._close_http_client()
-        return await super().stop()
+        if self.response_cache:
+            self.logger.info(f"Response cache stats: {self.response_cache.stats()}")
+        if self.circuit_breaker:
+            self.logger.info(f"Circuit breaker: {self.circuit_breaker.snapshot()}")
+        if self.disk_cache:
+            self.logger.info(f"Disk cache stats: {self.disk_cache.stats()}")
+            self.disk_cache.close()
+            self.disk_cache = None
+        if isinstance(self.rate_limiter, SQLiteTokenBucketRateLimiter):
+            self.rate_limiter.close()
+            self.rate_limiter = None
+        await super().teardown()
 
     def _get_http_client_config(self) -> Dict[str, Any]:
         """
@@ -265,8 +718,14 @@ class MCPServerHttpBase(AbstractMCPServer):
             ):
                 client_config["base_url"] += "/"
 
+            client_config.setdefault("timeout", self._get_http_timeout())
+            if self.http_transport:
+                client_config.setdefault("transport", self.http_transport)
+            else:
+                client_config.setdefault("limits", self._get_http_limits())
+                client_config.setdefault("http2", self._http2_available())
+
             self.http_client = httpx.AsyncClient(
-                timeout=self.settings.HTTP_CLIENT_TIMEOUT,
                 follow_redirects=True,  # Common default
                 **client_config,
             )
@@ -278,309 +737,727 @@ class MCPServerHttpBase(AbstractMCPServer):
                 f"No HTTP client configuration provided for {self.settings.SERVER_NAME}."
             )
 
+    def _get_http_timeout(self) -> httpx.Timeout:
+        default = self.settings.HTTP_CLIENT_TIMEOUT
+        return httpx.Timeout(
+            default,
+            connect=self.settings.HTTP_CONNECT_TIMEOUT,
+            read=self.settings.HTTP_READ_TIMEOUT or default,
+            write=self.settings.HTTP_WRITE_TIMEOUT or default,
+            pool=self.settings.HTTP_POOL_TIMEOUT,
+        )
+
+    def _get_http_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=self.settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=self.settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 is used only when enabled and the `h2` package is installed."""
+        if not self.settings.HTTP2_ENABLED:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            self.logger.warning(
+                "HTTP2_ENABLED is set but the 'h2' package is not installed "
+                "(pip install 'mcp-servers[http2]'). Falling back to HTTP/1.1."
+            )
+            return False
+        return True
+
+    def _start_http_warmup(self) -> None:
+        """Opens `HTTP_WARMUP_CONNECTIONS` pooled connections to the base URL in the background."""
+        if (
+            not self.http_client
+            or not str(self.http_client.base_url)
+            or self.settings.HTTP_WARMUP_CONNECTIONS <= 0
+        ):
+            return
+        self._warmup_task = asyncio.create_task(self._warmup_http_client())
+
+    async def _warmup_http_client(self) -> None:
+        """
+        Pays DNS, TCP and TLS setup before the first tool call. The HEAD requests bypass
+        the rate limiter; their status does not matter, only the kept-alive connections.
+        With HTTP/2 the requests are multiplexed over a single connection.
+        """
+        assert self.http_client
+        count = self.settings.HTTP_WARMUP_CONNECTIONS
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        results = await asyncio.gather(
+            *(self.http_client.head("") for _ in range(count)),
+            return_exceptions=True,
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            self.logger.warning(
+                f"HTTP warm-up to {self.http_client.base_url} failed for "
+                f"{len(failures)}/{count} connections: {failures[0]!r}"
+            )
+        else:
+            self.logger.debug(
+                f"HTTP warm-up opened {count} connection(s) to {self.http_client.base_url} "
+                f"in {loop.time() - started_at:.3f}s."
+            )
+
     async def _close_http_client(self) -> None:
         """Closes the httpx.AsyncClient if it exists."""
         if self.http_client:
-            await self.http_client.aclose()
+            if not self.http_transport:  # a shared pool is closed by its owner
+                await self.http_client.aclose()
             self.http_client = None
             self.logger.debug(f"HTTP client closed for {self.settings.SERVER_NAME}.")
 
-    def _check_rate_limit(self) -> None:
-        """
-        Checks client-side rate limits. Base implementation handles per-second limit
-        if `settings.RATE_LIMIT_PER_SECOND` is configured.
-        Derived classes can override or extend this for more complex limits.
-        Raises MCPRateLimitError if a limit is exceeded.
-        """
-        now = time.time()
+    async def _refresh_stats(self) -> None:
+        if self.rate_limiter:
+            await self.rate_limiter.refresh()  # buckets shared through SQLite
+
+    def _collect_server_stats(self) -> Dict[str, Any]:
+        stats = super()._collect_server_stats()
+        if self.rate_limiter:
+            stats["rate_limit"] = {
+                "rate_per_second": self.rate_limiter.rate_per_second,
+                "burst": self.rate_limiter.burst,
+                "available_tokens": {
+                    endpoint: round(available, 2)
+                    for endpoint, available in self.rate_limiter.snapshot().items()
+                },
+            }
+        stats["upstream_latency"] = {
+            endpoint: window.summary()
+            for endpoint, window in self.upstream_latency.items()
+        }
+        stats["circuit_breaker"] = (
+            self.circuit_breaker.snapshot() if self.circuit_breaker else None
+        )
+        if self.response_cache:
+            stats["response_cache"] = self.response_cache.stats()
+        return stats
 
-        # Per-second check
-        if (
-            self.settings.RATE_LIMIT_PER_SECOND
-            and self.settings.RATE_LIMIT_PER_SECOND > 0
-        ):
-            if now - self.rate_limit_state.get("last_second_reset_ts", 0) >= 1.0:
-                self.rate_limit_state["second_count"] = 0
-                self.rate_limit_state["last_second_reset_ts"] = now
-
-            current_second_count = self.rate_limit_state.get("second_count", 0)
-            if current_second_count >= self.settings.RATE_LIMIT_PER_SECOND:
-                msg = f"Client-side per-second rate limit ({self.settings.RATE_LIMIT_PER_SECOND}) exceeded."
-                self.logger.warning(msg)
-                raise MCPRateLimitError(msg)
-            self.rate_limit_state["second_count"] = current_second_count + 1
-
-    async def _make_get_request_with_retry(self, endpoint: str, params: Dict[str, Any]):
-        self._check_rate_limit()
-        if not self.http_client:  # Should be initialized by start()
-            self.logger.error("HTTP client not initialized before search.")
-            raise MCPToolConfigurationError("HTTP client not initialized.")
+    def _collect_metrics(self) -> List[MetricFamily]:
+        families = super()._collect_metrics()
+        server_name = self.settings.SERVER_NAME
 
-        max_retries = 1
-        base_retry_delay = 2.0
-        raw_response_text_for_debug = ""
+        cache_lookups = MetricFamily(
+            "mcp_cache_lookups", "counter", "Response cache lookups by result."
+        )
+        cache_evictions = MetricFamily(
+            "mcp_cache_evictions", "counter", "Response cache evictions."
+        )
+        cache_hit_ratio = MetricFamily(
+            "mcp_cache_hit_ratio", "gauge", "Response cache hit ratio since start."
+        )
+        for cache_name, cache in (
+            ("memory", self.response_cache),
+            ("disk", self.disk_cache),
+        ):
+            if not cache:
+                continue
+            labels = {"server": server_name, "cache": cache_name}
+            lookups = cache.hits + cache.misses
+            cache_lookups.add({**labels, "result": "hit"}, cache.hits, "_total")
+            cache_lookups.add({**labels, "result": "miss"}, cache.misses, "_total")
+            cache_evictions.add(labels, cache.evictions, "_total")
+            cache_hit_ratio.add(labels, cache.hits / lookups if lookups else 0.0)
+        families += [cache_lookups, cache_evictions, cache_hit_ratio]
+
+        if self.response_cache:
+            cache_bytes = MetricFamily(
+                "mcp_cache_bytes",
+                "gauge",
+                "Bytes held by the in-memory response cache.",
+            )
+            cache_bytes.add(
+                {"server": server_name, "cache": "memory"},
+                self.response_cache.current_bytes,
+            )
+            families.append(cache_bytes)
 
-        query = params.get("q")
-        if not query:
-            # fallback to try `query`
-            query = params.get("query")
-        if not query:
-            query = "<query-not-provided>"
+        if self.rate_limiter:
+            tokens = MetricFamily(
+                "mcp_rate_limit_tokens",
+                "gauge",
+                "Available rate limit tokens per endpoint (negative: queued requests).",
+            )
+            for endpoint, available in self.rate_limiter.snapshot().items():
+                tokens.add({"server": server_name, "endpoint": endpoint}, available)
+            families.append(tokens)
+
+        if self.circuit_breaker:
+            breaker = self.circuit_breaker
+            labels = {"server": server_name, "upstream": breaker.name}
+            state = MetricFamily(
+                "mcp_circuit_breaker_state",
+                "gauge",
+                "Circuit breaker state (1 for the current state).",
+            )
+            for name in (
+                CircuitState.CLOSED,
+                CircuitState.OPEN,
+                CircuitState.HALF_OPEN,
+            ):
+                state.add({**labels, "state": name}, int(breaker.state == name))
+            opened = MetricFamily(
+                "mcp_circuit_breaker_opened", "counter", "Times the circuit opened."
+            )
+            opened.add(labels, breaker.times_opened, "_total")
+            rejected = MetricFamily(
+                "mcp_circuit_breaker_rejections",
+                "counter",
+                "Requests rejected while the circuit was open.",
+            )
+            rejected.add(labels, breaker.rejected, "_total")
+            families += [state, opened, rejected]
 
-        for attempt in range(max_retries + 1):
-            self._check_rate_limit()
+        coalescing = MetricFamily(
+            "mcp_upstream_requests_coalescing",
+            "gauge",
+            "Distinct idempotent upstream requests currently shared by callers.",
+        )
+        coalescing.add({"server": server_name}, self.in_flight_requests.in_flight)
+        families.append(coalescing)
+        return families
 
-            try:
-                if attempt > 0:
-                    actual_delay = base_retry_delay * (2 ** (attempt - 1))
-                    self.logger.info(
-                        f"Retrying Brave Search API request (attempt {attempt + 1}/{max_retries + 1}) after {actual_delay:.1f}s delay."
-                    )
+    def _init_circuit_breaker(self) -> None:
+        if not self.settings.CIRCUIT_BREAKER_ENABLED:
+            self.circuit_breaker = None
+            return
 
-                    self.logger.info(f"Retry query: {query}")
+        name = self.settings.SERVER_NAME
+        if self.http_client and str(self.http_client.base_url):
+            name = str(self.http_client.base_url)
+        self.circuit_breaker = CircuitBreaker(
+            name,
+            failure_threshold=self.settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            error_rate_threshold=self.settings.CIRCUIT_BREAKER_ERROR_RATE,
+            window_size=self.settings.CIRCUIT_BREAKER_WINDOW,
+            min_requests=self.settings.CIRCUIT_BREAKER_MIN_REQUESTS,
+            reset_timeout=self.settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+        )
 
-                    await asyncio.sleep(actual_delay)
+    def _init_rate_limiter(self) -> None:
+        """Initializes the token-bucket rate limiter if a per-second limit is configured."""
+        if self.rate_limiter:  # Already initialized
+            return
 
-                self.logger.info(
-                    f"Querying (Attempt {attempt + 1}): {endpoint} with params {params}"
+        rate = self.settings.RATE_LIMIT_PER_SECOND
+        if rate and rate > 0:
+            if self.settings.RATE_LIMIT_SHARED:
+                path = self.settings.RATE_LIMIT_STATE_PATH or (
+                    DEFAULT_CONFIG_DIR / "state" / "rate_limits.sqlite3"
                 )
-                response = await self.http_client.get(endpoint, params=params)
-
                 try:
-                    await response.aread()
-                    response_bytes = response.content
-                    encoding_to_try = (
-                        response.charset_encoding or response.encoding or "utf-8"
-                    )
-                    try:
-                        raw_response_text_for_debug = response_bytes.decode(
-                            encoding_to_try
-                        )
-                    except (UnicodeDecodeError, LookupError) as decode_err:
-                        self.logger.warning(
-                            f"Decoding with '{encoding_to_try}' failed: {decode_err}. Falling back to utf-8 with 'replace'."
-                        )
-                        raw_response_text_for_debug = response_bytes.decode(
-                            "utf-8", errors="replace"
-                        )
-                except Exception as text_ex:
-                    raw_response_text_for_debug = f"<Could not read/decode response content: {type(text_ex).__name__} - {text_ex}>"
-                    self.logger.warning(
-                        f"Error reading/decoding response content: {text_ex}"
-                    )
-
-                response.raise_for_status()
-
-                content_type = response.headers.get("content-type", "").lower()
-                if "application/json" not in content_type:
-                    error_detail = f"Status: {response.status_code}, Content-Type: {content_type}. Body: {raw_response_text_for_debug[:200]}"
-                    raise MCPUpstreamServiceError(
-                        f"Request did not return JSON as expected. {error_detail}",
-                        status_code=response.status_code,
+                    self.rate_limiter = SQLiteTokenBucketRateLimiter(
+                        path=Path(path).expanduser(),
+                        rate_per_second=rate,
+                        burst=self.settings.RATE_LIMIT_BURST,
+                        max_wait=self.settings.RATE_LIMIT_MAX_WAIT,
+                        namespace=self.settings.SERVER_NAME.lower(),
                     )
-
-                return response.json()
-
-            except httpx.HTTPStatusError as e:
-                reason_phrase_val = e.response.reason_phrase
-                if isinstance(reason_phrase_val, bytes):
-                    reason_phrase_val = reason_phrase_val.decode(
-                        "utf-8", errors="replace"
+                    self.logger.info(f"Rate limit shared across processes via {path}.")
+                except sqlite3.Error as e:
+                    self.logger.error(
+                        f"Could not open shared rate limit state at {path}: {e}. "
+                        "Falling back to a per-process limit."
                     )
-
-                error_message = (
-                    f"Request error: {e.response.status_code} {reason_phrase_val}"
-                )
-                self.logger.error(
-                    f"{error_message} - URL: {e.request.url} - Response: {raw_response_text_for_debug[:500]}"
+            if not self.rate_limiter:
+                self.rate_limiter = TokenBucketRateLimiter(
+                    rate_per_second=rate,
+                    burst=self.settings.RATE_LIMIT_BURST,
+                    max_wait=self.settings.RATE_LIMIT_MAX_WAIT,
                 )
+            self.logger.debug(
+                f"Rate limiter initialized for {self.settings.SERVER_NAME}: "
+                f"{rate}/s, burst {self.rate_limiter.burst}."
+            )
 
-                if (
-                    e.response.status_code == 429 and attempt < max_retries
-                ):  # Too Many Requests
-                    self.logger.warning(f"Returned 429 for '{query}'. Will retry.")
-                    continue
-                else:
-                    raise MCPUpstreamServiceError(
-                        error_message,
-                        status_code=e.response.status_code,
-                        details=raw_response_text_for_debug[:500],
-                    ) from e
+    def _init_response_cache(self) -> None:
+        """Initializes the in-memory and, if enabled, on-disk response caches."""
+        if not self.response_cache and self.settings.RESPONSE_CACHE_TTL > 0:
+            self.response_cache = ResponseCache(
+                ttl=self.settings.RESPONSE_CACHE_TTL,
+                max_bytes=self.settings.RESPONSE_CACHE_MAX_BYTES,
+            )
 
-            except httpx.RequestError as e:  # Network errors, timeouts
-                error_message = (
-                    f"'{query}' failed with network error: {type(e).__name__} - {e}"
+        if not self.disk_cache and self.settings.DISK_CACHE_ENABLED:
+            path = self.settings.DISK_CACHE_PATH or (
+                DEFAULT_CONFIG_DIR
+                / "cache"
+                / f"{self.settings.SERVER_NAME.lower()}.sqlite3"
+            )
+            try:
+                self.disk_cache = SQLiteResponseCache(
+                    path=Path(path).expanduser(),
+                    ttl=self.settings.DISK_CACHE_TTL,
+                    max_bytes=self.settings.DISK_CACHE_MAX_BYTES,
                 )
-                if attempt < max_retries:
-                    self.logger.warning(f"{error_message}. Will retry.")
-                    continue
-                else:
-                    self.logger.error(
-                        f"{error_message} after {max_retries + 1} attempts."
-                    )
-                    raise MCPUpstreamServiceError(
-                        f"{error_message} after {max_retries + 1} attempts."
-                    ) from e
+                self.logger.info(f"Disk cache enabled at {path}.")
+            except sqlite3.Error as e:
+                self.logger.error(f"Could not open disk cache at {path}: {e}")
 
-            except (
-                ValueError
-            ) as e:  # Includes JSONDecodeError, Pydantic ValidationError
-                error_message = f"Error processing response: {type(e).__name__} - {e}"
-                self.logger.error(
-                    f"{error_message}\nRaw response snippet: {raw_response_text_for_debug[:500]}"
-                )
-                raise MCPUpstreamServiceError(
-                    error_message, details=raw_response_text_for_debug[:500]
-                ) from e
+    async def _disk_cache_get(self, key: str) -> Optional[bytes]:
+        """Reads from the disk cache off the event loop. Errors count as a miss."""
+        assert self.disk_cache
+        try:
+            return await asyncio.to_thread(self.disk_cache.get, key)
+        except (sqlite3.Error, zlib.error) as e:
+            self.logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+    async def _disk_cache_set(self, key: str, value: bytes) -> None:
+        """Writes to the disk cache off the event loop. Errors are logged and ignored."""
+        assert self.disk_cache
+        try:
+            await asyncio.to_thread(self.disk_cache.set, key, value)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Disk cache write failed: {e}")
 
-            except MCPRateLimitError:  # Re-raise our own rate limit error
-                raise
+    async def _check_rate_limit(self, endpoint: str) -> None:
+        """
+        Waits for a client-side rate limit token for the given endpoint. Each endpoint
+        has its own bucket, so e.g. Tavily `/search` and `/crawl` do not starve each other.
+        Derived classes can override or extend this for more complex limits.
+        Raises MCPRateLimitError if the token cannot be obtained within `RATE_LIMIT_MAX_WAIT`.
+        """
+        if not self.rate_limiter:
+            return
 
-            except Exception as e:  # Other unexpected errors
-                error_message = f"Unexpected error: {type(e).__name__} - {e}"
-                self.logger.error(error_message)  # Log with stack trace
-                if raw_response_text_for_debug:
-                    self.logger.debug(
-                        f"Raw text during unexpected error for '{query}': {raw_response_text_for_debug[:1000]}"
-                    )
-                raise MCPUpstreamServiceError(error_message) from e
+        key = endpoint.strip("/")
+        try:
+            with self.tracer.span("rate_limit.wait", endpoint=key):
+                waited = await self.rate_limiter.acquire(key)
+        except MCPRateLimitError as e:
+            RATE_LIMIT_REJECTIONS.labels(self.settings.SERVER_NAME, key).inc()
+            self.logger.warning(f"Client-side rate limit for '{endpoint}': {e}")
+            raise
+        RATE_LIMIT_WAIT.labels(self.settings.SERVER_NAME, key).observe(waited)
+        if waited > 0:
+            self.logger.debug(f"Rate limiter delayed '{endpoint}' by {waited:.3f}s.")
+
+    def _response_snippet(
+        self, response: httpx.Response, max_bytes: int = DEBUG_SNIPPET_BYTES
+    ) -> str:
+        """
+        Decodes at most the first `max_bytes` of the response body for logging and
+        error details. Only called on error paths, so successful responses are never
+        decoded to text.
+        """
+        try:
+            response_bytes = response.content[:max_bytes]
+            encoding_to_try = response.charset_encoding or response.encoding or "utf-8"
+            try:
+                return response_bytes.decode(encoding_to_try)
+            except (UnicodeDecodeError, LookupError):
+                # Truncation may split a multi-byte character, so replace quietly
+                return response_bytes.decode("utf-8", errors="replace")
+        except Exception as text_ex:
+            self.logger.warning(f"Error reading/decoding response content: {text_ex}")
+            return f"<Could not read/decode response content: {type(text_ex).__name__} - {text_ex}>"
+
+    def _parse_json_response(self, response: httpx.Response) -> Any:
+        """Validates the content type of a successful response and parses its JSON body."""
+        content_type = response.headers.get("content-type", "").lower()
+        if "application/json" not in content_type:
+            error_detail = f"Status: {response.status_code}, Content-Type: {content_type}. Body: {self._response_snippet(response, 200)}"
+            raise MCPUpstreamServiceError(
+                f"Request did not return JSON as expected. {error_detail}",
+                status_code=response.status_code,
+            )
 
-        # Should only be reached if all retries for specific errors were exhausted
-        final_error_message = f"Request failed after {max_retries + 1} attempts."
-        self.logger.error(final_error_message)
-        raise MCPUpstreamServiceError(final_error_message)
+        try:
+            with self.tracer.span("json.parse", bytes=len(response.content)):
+                return json_loads(response.content)
+        except ValueError as e:  # Includes JSONDecodeError / orjson.JSONDecodeError
+            error_message = f"Error processing response: {type(e).__name__} - {e}"
+            raw_response_snippet = self._response_snippet(response)
+            self.logger.error(
+                f"{error_message}\nRaw response snippet: {raw_response_snippet}"
+            )
+            raise MCPUpstreamServiceError(
+                error_message, details=raw_response_snippet
+            ) from e
 
-    async def _make_post_request_with_retry(
-        self, endpoint: str, payload: Dict[str, Any]
-    ):
-        self._check_rate_limit()
+    async def _make_request_with_retry(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        idempotent: bool = False,
+    ) -> Any:
+        """
+        Sends a request to the upstream service and returns the parsed JSON body.
+
+        Idempotent requests are answered from the response cache when possible, without
+        spending rate limit budget; successful responses are stored for `RESPONSE_CACHE_TTL`.
+        Concurrent identical idempotent requests share a single upstream call and receive
+        the same parsed object, which callers must not mutate.
+
+        Retries connect errors, 429 and 5xx responses up to `HTTP_MAX_RETRIES` times with
+        decorrelated jitter backoff, preferring the delay advertised by `Retry-After` or
+        `X-RateLimit-Reset` when present; a hint longer than `HTTP_RETRY_MAX_DELAY` fails the
+        call instead of waiting. The whole call, including rate limit waits and
+        retry sleeps, is bounded by `HTTP_REQUEST_DEADLINE`.
+
+        Raises:
+            MCPToolConfigurationError: If the HTTP client is not initialized.
+            MCPRateLimitError: If the client-side rate limit cannot be satisfied.
+            MCPUpstreamServiceError: For any upstream, network or decoding failure.
+        """
         if not self.http_client:  # Should be initialized by start()
-            self.logger.error("HTTP client not initialized before search.")
+            self.logger.error("HTTP client not initialized before request.")
             raise MCPToolConfigurationError("HTTP client not initialized.")
 
-        max_retries = 1
-        base_retry_delay = 2.0
-        raw_response_text_for_debug = ""
-
-        for attempt in range(max_retries + 1):
-            self._check_rate_limit()
+        cache_key = None
+        if idempotent:
+            cache_key = make_cache_key(
+                method, endpoint, params if params is not None else payload
+            )
 
+        if cache_key and self.response_cache:
+            cached_body = self.response_cache.get(cache_key)
+            if cached_body is not None:
+                self.logger.debug(f"Cache hit for {method} {endpoint}.")
+                self._annotate_span("cache", "memory")
+                return json_loads(cached_body)
+
+        if cache_key and self.disk_cache:
+            cached_body = await self._disk_cache_get(cache_key)
+            if cached_body is not None:
+                self.logger.debug(f"Disk cache hit for {method} {endpoint}.")
+                self._annotate_span("cache", "disk")
+                if self.response_cache:
+                    self.response_cache.set(cache_key, cached_body)
+                return json_loads(cached_body)
+
+        fetch = functools.partial(
+            self._fetch_json, method, endpoint, params, payload, cache_key
+        )
+        if cache_key:
+            # Identical idempotent requests already in flight share one upstream call
+            return await self.in_flight_requests.do(cache_key, fetch)
+        return await fetch()
+
+    @staticmethod
+    def _annotate_span(key: str, value: Any) -> None:
+        span = current_span()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    async def _fetch_json(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        payload: Optional[Dict[str, Any]],
+        cache_key: Optional[str],
+    ) -> Any:
+        """Runs the retry loop within the per-call deadline, parses and caches the result."""
+        loop = asyncio.get_running_loop()
+        deadline = self.settings.HTTP_REQUEST_DEADLINE
+        deadline_at = loop.time() + deadline if deadline else None
+
+        with self.tracer.span(
+            "upstream.fetch", **{"http.method": method, "endpoint": endpoint}
+        ):
             try:
-                if attempt > 0:
-                    actual_delay = base_retry_delay * (2 ** (attempt - 1))
-                    self.logger.info(
-                        f"Retrying Brave Search API request (attempt {attempt + 1}/{max_retries + 1}) after {actual_delay:.1f}s delay."
+                async with asyncio.timeout_at(deadline_at):
+                    response = await self._request_with_retry_loop(
+                        method,
+                        endpoint,
+                        params,
+                        payload,
+                        deadline_at,
+                        hedge=cache_key is not None
+                        and self.settings.HTTP_HEDGING_ENABLED,
                     )
-
-                    self.logger.info("Retry request")
-
-                    await asyncio.sleep(actual_delay)
-
-                self.logger.info(
-                    f"Querying (Attempt {attempt + 1}): {endpoint} with params {payload}"
+                    data = self._parse_json_response(response)
+                    if cache_key and self.response_cache:
+                        self.response_cache.set(cache_key, response.content)
+                    if cache_key and self.disk_cache:
+                        await self._disk_cache_set(cache_key, response.content)
+                    return data
+            except TimeoutError as e:
+                error_message = (
+                    f"{method} {endpoint} exceeded the request deadline of {deadline}s."
                 )
-                response = await self.http_client.post(endpoint, json=payload)
-
-                try:
-                    await response.aread()
-                    response_bytes = response.content
-                    encoding_to_try = (
-                        response.charset_encoding or response.encoding or "utf-8"
-                    )
-                    try:
-                        raw_response_text_for_debug = response_bytes.decode(
-                            encoding_to_try
-                        )
-                    except (UnicodeDecodeError, LookupError) as decode_err:
-                        self.logger.warning(
-                            f"Decoding with '{encoding_to_try}' failed: {decode_err}. Falling back to utf-8 with 'replace'."
-                        )
-                        raw_response_text_for_debug = response_bytes.decode(
-                            "utf-8", errors="replace"
-                        )
-                except Exception as text_ex:
-                    raw_response_text_for_debug = f"<Could not read/decode response content: {type(text_ex).__name__} - {text_ex}>"
-                    self.logger.warning(
-                        f"Error reading/decoding response content: {text_ex}"
-                    )
+                self.logger.error(error_message)
+                raise MCPUpstreamServiceError(error_message) from e
+            except (MCPRateLimitError, MCPUpstreamServiceError):
+                raise
+            except Exception as e:  # Other unexpected errors
+                error_message = f"Unexpected error: {type(e).__name__} - {e}"
+                self.logger.error(error_message, exc_info=True)
+                raise MCPUpstreamServiceError(error_message) from e
 
-                response.raise_for_status()
+    async def _request_with_retry_loop(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        payload: Optional[Dict[str, Any]],
+        deadline_at: Optional[float],
+        hedge: bool = False,
+    ) -> httpx.Response:
+        assert self.http_client
+        send = self._send_hedged_request if hedge else self._send_upstream_request
+        loop = asyncio.get_running_loop()
+        max_retries = max(0, self.settings.HTTP_MAX_RETRIES)
+        base_retry_delay = self.settings.HTTP_RETRY_BASE_DELAY
+        max_retry_delay = self.settings.HTTP_RETRY_MAX_DELAY
+        retry_delay = base_retry_delay
 
-                content_type = response.headers.get("content-type", "").lower()
-                if "application/json" not in content_type:
-                    error_detail = f"Status: {response.status_code}, Content-Type: {content_type}. Body: {raw_response_text_for_debug[:200]}"
+        for attempt in range(max_retries + 1):
+            try:
+                response = await send(method, endpoint, params, payload, attempt)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                error_message = f"{method} {endpoint} failed with network error: {type(e).__name__} - {e}"
+                if attempt >= max_retries:
+                    self.logger.error(f"{error_message} after {attempt + 1} attempts.")
                     raise MCPUpstreamServiceError(
-                        f"Request did not return JSON as expected. {error_detail}",
-                        status_code=response.status_code,
-                    )
-
-                return response.json()
+                        f"{error_message} after {attempt + 1} attempts."
+                    ) from e
+                self.logger.warning(f"{error_message}. Will retry.")
+                hinted_delay = None
+            except httpx.RequestError as e:  # Read/write timeouts etc. are not retried
+                error_message = f"{method} {endpoint} failed with network error: {type(e).__name__} - {e}"
+                self.logger.error(error_message)
+                raise MCPUpstreamServiceError(error_message) from e
+            else:
+                if response.is_success:
+                    return response
 
-            except httpx.HTTPStatusError as e:
-                reason_phrase_val = e.response.reason_phrase
+                reason_phrase_val = response.reason_phrase
                 if isinstance(reason_phrase_val, bytes):
                     reason_phrase_val = reason_phrase_val.decode(
                         "utf-8", errors="replace"
                     )
-
                 error_message = (
-                    f"Request error: {e.response.status_code} {reason_phrase_val}"
+                    f"Request error: {response.status_code} {reason_phrase_val}"
                 )
+                raw_response_snippet = self._response_snippet(response)
                 self.logger.error(
-                    f"{error_message} - URL: {e.request.url} - Response: {raw_response_text_for_debug[:500]}"
+                    f"{error_message} - URL: {response.request.url} - Response: {raw_response_snippet}"
                 )
-
                 if (
-                    e.response.status_code == 429 and attempt < max_retries
-                ):  # Too Many Requests
-                    self.logger.warning("Returned 429. Will retry.")
-                    continue
-                else:
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt >= max_retries
+                ):
                     raise MCPUpstreamServiceError(
                         error_message,
-                        status_code=e.response.status_code,
-                        details=raw_response_text_for_debug[:500],
-                    ) from e
-
-            except httpx.RequestError as e:  # Network errors, timeouts
-                error_message = (
-                    f"Request ailed with network error: {type(e).__name__} - {e}"
-                )
-                if attempt < max_retries:
-                    self.logger.info(f"{error_message}. Will retry.")
-                    continue
-                else:
-                    self.logger.error(
-                        f"{error_message} after {max_retries + 1} attempts."
+                        status_code=response.status_code,
+                        details=raw_response_snippet,
                     )
+                hinted_delay = get_retry_after_delay(response.headers)
+                if hinted_delay is not None and hinted_delay > max_retry_delay:
+                    error_message = f"{method} {endpoint} cannot be retried: upstream asked to wait {hinted_delay:.1f}s, more than the {max_retry_delay:.1f}s retry delay limit."
+                    self.logger.error(error_message)
                     raise MCPUpstreamServiceError(
-                        f"{error_message} after {max_retries + 1} attempts."
-                    ) from e
-
-            except (
-                ValueError
-            ) as e:  # Includes JSONDecodeError, Pydantic ValidationError
-                error_message = f"Error processing response: {type(e).__name__} - {e}"
-                self.logger.error(
-                    f"{error_message}\nRaw response snippet: {raw_response_text_for_debug[:500]}"
-                )
-                raise MCPUpstreamServiceError(
-                    error_message, details=raw_response_text_for_debug[:500]
-                ) from e
+                        error_message,
+                        status_code=response.status_code,
+                        details=raw_response_snippet,
+                    )
 
-            except MCPRateLimitError:  # Re-raise our own rate limit error
-                raise
+            retry_delay = compute_backoff_delay(
+                retry_delay, base_retry_delay, max_retry_delay
+            )
+            actual_delay = hinted_delay if hinted_delay is not None else retry_delay
+            if deadline_at is not None and loop.time() + actual_delay >= deadline_at:
+                error_message = f"{method} {endpoint} cannot be retried: a {actual_delay:.1f}s delay exceeds the request deadline."
+                self.logger.error(error_message)
+                raise MCPUpstreamServiceError(error_message)
 
-            except Exception as e:  # Other unexpected errors
-                error_message = f"Unexpected error: {type(e).__name__} - {e}"
-                self.logger.error(error_message)  # Log with stack trace
-                if raw_response_text_for_debug:
-                    self.logger.debug(
-                        f"Raw text during unexpected error: {raw_response_text_for_debug[:1000]}"
-                    )
-                raise MCPUpstreamServiceError(error_message) from e
+            self.logger.info(
+                f"Retrying {method} {endpoint} (attempt {attempt + 2}/{max_retries + 1}) after {actual_delay:.2f}s delay."
+            )
+            UPSTREAM_RETRIES.labels(
+                self.settings.SERVER_NAME, endpoint.strip("/")
+            ).inc()
+            with self.tracer.span("retry.sleep", delay_s=round(actual_delay, 3)):
+                await asyncio.sleep(actual_delay)
 
-        # Should only be reached if all retries for specific errors were exhausted
+        # Unreachable: the last attempt either returns or raises
         final_error_message = f"Request failed after {max_retries + 1} attempts."
         self.logger.error(final_error_message)
         raise MCPUpstreamServiceError(final_error_message)
+
+    async def _send_upstream_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        payload: Optional[Dict[str, Any]],
+        attempt: int,
+        rate_limited: bool = True,
+    ) -> httpx.Response:
+        """
+        Sends a single attempt through the circuit breaker and the rate limiter.
+
+        Network errors and 5xx responses count as upstream failures; any other response,
+        including 4xx and 429, proves the upstream is reachable and counts as a success.
+        Pass `rate_limited=False` when the caller already holds a rate limit token.
+        """
+        assert self.http_client
+        breaker = self.circuit_breaker
+        # Fails fast, before spending rate limit budget
+        circuit_token = breaker.before_request() if breaker else 0
+
+        try:
+            if rate_limited:
+                await self._check_rate_limit(endpoint)
+
+            self.logger.debug(
+                f"Querying (Attempt {attempt + 1}): {method} {endpoint} with params {params if params is not None else payload}"
+            )
+            with self.tracer.span(
+                f"HTTP {method}",
+                kind=SPAN_KIND_CLIENT,
+                **{"http.method": method, "endpoint": endpoint, "attempt": attempt + 1},
+            ) as span:
+                started_at = time.perf_counter()
+                response = await self.http_client.request(
+                    method, endpoint, params=params, json=payload
+                )
+                await response.aread()
+                elapsed = time.perf_counter() - started_at
+                span.set_attribute("http.status_code", response.status_code)
+        except httpx.RequestError:
+            UPSTREAM_RESPONSES.labels(
+                self.settings.SERVER_NAME, endpoint.strip("/"), "error"
+            ).inc()
+            self._record_circuit_outcome(circuit_token, failed=True)
+            raise
+        except BaseException:  # Rate limited or cancelled: says nothing about health
+            if breaker:
+                breaker.record_cancelled(circuit_token)
+            raise
+
+        key = endpoint.strip("/")
+        self._get_latency_window(key).record(elapsed)
+        UPSTREAM_REQUEST_DURATION.labels(self.settings.SERVER_NAME, key).observe(
+            elapsed
+        )
+        UPSTREAM_RESPONSES.labels(
+            self.settings.SERVER_NAME, key, str(response.status_code)
+        ).inc()
+        self._record_circuit_outcome(circuit_token, failed=response.status_code >= 500)
+        return response
+
+    def _get_latency_window(self, endpoint: str) -> LatencyWindow:
+        key = endpoint.strip("/")
+        window = self.upstream_latency.get(key)
+        if window is None:
+            window = self.upstream_latency[key] = LatencyWindow()
+        return window
+
+    def _get_hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while the endpoint has too few samples."""
+        window = self._get_latency_window(endpoint)
+        if window.count < self.settings.HTTP_HEDGING_MIN_SAMPLES:
+            return None
+        threshold = window.percentile(self.settings.HTTP_HEDGING_PERCENTILE)
+        return max(threshold or 0.0, self.settings.HTTP_HEDGING_MIN_DELAY)
+
+    async def _send_hedged_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        payload: Optional[Dict[str, Any]],
+        attempt: int,
+    ) -> httpx.Response:
+        """
+        Sends an attempt and, if it is still running after the endpoint's hedge delay,
+        a second identical request. The first successful response wins and the other
+        request is cancelled. A hedge is only sent when a rate limit token is available
+        right away, so hedging never queues behind or delays regular traffic.
+        """
+        hedge_delay = self._get_hedge_delay(endpoint)
+        if hedge_delay is None:
+            return await self._send_upstream_request(
+                method, endpoint, params, payload, attempt
+            )
+
+        primary = asyncio.create_task(
+            self._send_upstream_request(method, endpoint, params, payload, attempt)
+        )
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            if self.rate_limiter and not await self.rate_limiter.try_acquire(
+                endpoint.strip("/")
+            ):
+                self.logger.debug(
+                    f"No rate limit budget to hedge {method} {endpoint}; waiting for the original request."
+                )
+                return await primary
+
+            self.logger.debug(
+                f"Hedging {method} {endpoint}: no response after {hedge_delay:.3f}s."
+            )
+            UPSTREAM_HEDGES.labels(self.settings.SERVER_NAME, endpoint.strip("/")).inc()
+            tasks.append(
+                asyncio.create_task(
+                    self._send_upstream_request(
+                        method, endpoint, params, payload, attempt, rate_limited=False
+                    )
+                )
+            )
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.exception() and task.result().is_success:
+                        if task is not primary:
+                            self.logger.debug(f"Hedged request won for {endpoint}.")
+                        return task.result()
+            # Neither succeeded: report the original request's outcome
+            return primary.result()
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def _record_circuit_outcome(self, token: int, failed: bool) -> None:
+        breaker = self.circuit_breaker
+        if not breaker:
+            return
+        previous_state = breaker.state
+        if failed:
+            breaker.record_failure(token)
+        else:
+            breaker.record_success(token)
+
+        if breaker.state != previous_state:
+            if breaker.state == CircuitState.OPEN:
+                self.logger.warning(
+                    f"Circuit for {breaker.name} opened: {breaker.snapshot()}. "
+                    f"Failing fast for {breaker.reset_timeout}s."
+                )
+            else:
+                self.logger.info(f"Circuit for {breaker.name} is {breaker.state}.")
+
+    async def _make_get_request_with_retry(
+        self, endpoint: str, params: Dict[str, Any], idempotent: bool = False
+    ):
+        return await self._make_request_with_retry(
+            "GET", endpoint, params=params, idempotent=idempotent
+        )
+
+    async def _make_post_request_with_retry(
+        self, endpoint: str, payload: Dict[str, Any], idempotent: bool = False
+    ):
+        return await self._make_request_with_retry(
+            "POST", endpoint, payload=payload, idempotent=idempotent
+        )
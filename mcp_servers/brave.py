@@ -115,9 +115,13 @@ class MCPServerBrave(MCPServerHttpBase):
             "safesearch": "strict",
             "freshness": freshness,
         }
-        json_data = await self._make_get_request_with_retry(search_endpoint, params)
-        data = BraveWebResponse.model_validate(json_data)
-        return self._format_web_results(data)
+        json_data = await self._make_get_request_with_retry(
+            search_endpoint, params, idempotent=True
+        )
+        with self.tracer.span("validate"):
+            data = BraveWebResponse.model_validate(json_data)
+        with self.tracer.span("format"):
+            return self._format_web_results(data)
 
     def _format_web_results(self, data: BraveWebResponse):
         if not data.web or not data.web.results:
@@ -0,0 +1,225 @@
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from mcp_servers.serialization import json_dumps
+
+
+def make_cache_key(method: str, endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+    """
+    Builds a stable cache key from the request method, endpoint and params/payload.
+    Method case, surrounding slashes of the endpoint and dict ordering do not matter.
+    """
+    normalized = json_dumps(
+        [method.upper(), endpoint.strip("/"), params or {}], sort_keys=True
+    )
+    return hashlib.sha256(normalized).hexdigest()
+
+
+class ResponseCache:
+    """
+    Bounded in-memory cache of raw upstream response bodies with per-entry TTL
+    and LRU eviction once `max_bytes` is exceeded.
+
+    Bodies are stored as bytes and parsed by the caller on every hit, so callers
+    never share (and accidentally mutate) the same decoded object.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.current_bytes -= len(value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SQLiteResponseCache:
+    """
+    Persistent response cache in a single SQLite file, shared by every server
+    process that points at the same path.
+
+    Bodies are zlib-compressed. The database runs in WAL mode so several processes
+    can read concurrently while one writes. Once the compressed size exceeds
+    `max_bytes`, expired entries go first, then the least recently accessed ones.
+
+    All methods are blocking; call them via `asyncio.to_thread` from the event loop.
+    """
+
+    # Re-check the total size only every N writes, it needs a full table scan
+    _SIZE_CHECK_INTERVAL = 50
+    # Avoid a write per read: refresh the LRU timestamp at most this often (seconds)
+    _ACCESS_UPDATE_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float,
+        max_bytes: int,
+        compression_level: int = 3,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes_since_size_check = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=5.0, check_same_thread=False
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            if now - row[2] > self._ACCESS_UPDATE_INTERVAL:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+        self.hits += 1
+        return zlib.decompress(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        compressed = zlib.compress(value, self.compression_level)
+        if len(compressed) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), now + (ttl or self.ttl), now),
+            )
+            self._conn.commit()
+            self._writes_since_size_check += 1
+            if self._writes_since_size_check >= self._SIZE_CHECK_INTERVAL:
+                self._writes_since_size_check = 0
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drops expired rows, then least recently accessed rows until under `max_bytes`."""
+        self.evictions += self._conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (now,)
+        ).rowcount
+        total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_bytes > self.max_bytes:
+            excess = total_bytes - self.max_bytes
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+            )
+            keys_to_delete = []
+            for row_key, size in rows:
+                if excess <= 0:
+                    break
+                keys_to_delete.append((row_key,))
+                excess -= size
+            self._conn.executemany(
+                "DELETE FROM responses WHERE key = ?", keys_to_delete
+            )
+            self.evictions += len(keys_to_delete)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
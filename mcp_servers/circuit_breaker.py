@@ -0,0 +1,149 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from mcp_servers.exceptions import MCPCircuitOpenError
+
+
+class CircuitState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of one upstream and rejects requests while it is failing.
+
+    The circuit opens after `failure_threshold` consecutive failures, or when the
+    error rate over the last `window_size` outcomes reaches `error_rate_threshold`
+    (once at least `min_requests` outcomes were seen). While open, requests fail
+    immediately. After `reset_timeout` seconds a single probe request is let through
+    (half-open): success closes the circuit, failure opens it again.
+
+    Every state change starts a new generation. `before_request` hands out the
+    current generation as a token, and outcomes recorded with an older token are
+    ignored: a slow request admitted while the circuit was closed cannot close a
+    half-open circuit or take the probe's slot when it finally finishes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_requests: int = 10,
+        reset_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True = failure
+        self._probe_in_flight = False
+        self._generation = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def before_request(self) -> int:
+        """
+        Admits a request or raises. Every admitted request must be followed by exactly
+        one call to `record_success`, `record_failure` or `record_cancelled`, passing
+        the token returned here.
+
+        Raises:
+            MCPCircuitOpenError: If the circuit is open, or half-open with a probe running.
+        """
+        if self.state == CircuitState.CLOSED:
+            return self._generation
+
+        if self.state == CircuitState.OPEN:
+            retry_after = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_after > 0:
+                self.rejected += 1
+                raise MCPCircuitOpenError(
+                    f"Circuit for {self.name} is open after repeated upstream failures; "
+                    f"retry in {retry_after:.1f}s.",
+                    retry_after=retry_after,
+                )
+            self._set_state(CircuitState.HALF_OPEN)
+
+        if self._probe_in_flight:
+            self.rejected += 1
+            raise MCPCircuitOpenError(
+                f"Circuit for {self.name} is half-open and a recovery probe is already running.",
+                retry_after=0.0,
+            )
+        self._probe_in_flight = True
+        return self._generation
+
+    def record_success(self, token: int) -> None:
+        if token != self._generation:
+            return
+        self.consecutive_failures = 0
+        if self.state == CircuitState.HALF_OPEN:
+            self._set_state(CircuitState.CLOSED)
+            self._outcomes.clear()
+            return
+        self._outcomes.append(False)
+
+    def record_failure(self, token: int) -> None:
+        if token != self._generation:
+            return
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+
+        self._outcomes.append(True)
+        if self.state == CircuitState.CLOSED and (
+            self.consecutive_failures >= self.failure_threshold
+            or (
+                len(self._outcomes) >= self.min_requests
+                and self.error_rate >= self.error_rate_threshold
+            )
+        ):
+            self._open()
+
+    def record_cancelled(self, token: int) -> None:
+        """Releases the probe slot without counting an outcome, e.g. on cancellation."""
+        if token == self._generation and self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self._set_state(CircuitState.OPEN)
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._generation += 1
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_after: Optional[float] = None
+        if self.state == CircuitState.OPEN:
+            retry_after = max(
+                0.0, self.opened_at + self.reset_timeout - time.monotonic()
+            )
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": self.error_rate,
+            "window": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after": retry_after,
+        }
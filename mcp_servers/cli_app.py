@@ -2,25 +2,20 @@
 
 import os
 import sys
+import socket
 import argparse
 import logging
 import asyncio
 import signal
 import shutil
+import time
 import secrets
 import subprocess
-from typing import List, Dict, Any
-
-import httpx
-import daemon
-import daemon.pidfile
-import psutil
+import multiprocessing
+import multiprocessing.connection
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
 
 import mcp_servers
-from mcp_servers.filesystem import MCPServerFilesystem
-from mcp_servers.brave import MCPServerBrave
-from mcp_servers.searxng import MCPServerSearxng
-from mcp_servers.tavily import MCPServerTavily
 from mcp_servers import (
     DEFAULT_CONFIG_DIR,
     DEFAULT_ENV_FILE,
@@ -29,6 +24,24 @@ from mcp_servers import (
     load_env_vars,
 )
 from mcp_servers.logger import MCPServersLogger
+from mcp_servers.profiling import (
+    ALLOCATION_REPORT_SUFFIX,
+    CPU_PROFILE_SUFFIX,
+    PROFILE_REQUEST_SUFFIX,
+    PROFILE_TARGETS_SUFFIX,
+    install_profile_signal_handler,
+    read_profile_request,
+    read_profile_targets,
+    write_profile_request,
+    write_profile_targets,
+)
+
+# Server modules (and their FastMCP/httpx/pydantic dependencies) take most of the
+# CLI's import time, so they are imported only by the subcommands that need them;
+# so are psutil and python-daemon, which a foreground `mcpserver start` never needs.
+if TYPE_CHECKING:
+    from mcp_servers.base import AbstractMCPServer
+    from mcp_servers.composite import CompositeMCPServer
 
 logger = MCPServersLogger.get_logger("mcpserver")
 
@@ -68,6 +81,8 @@ def initialize_config(subcommand: str, force: bool):
         print(f"Creating {DEFAULT_ENV_FILE}")
         url = f"https://raw.githubusercontent.com/assagman/mcp_servers/refs/tags/v{mcp_servers.__version__}/.env.example"
 
+        import httpx
+
         try:
             with httpx.Client() as client:
                 response = client.get(url)
@@ -222,57 +237,337 @@ def stop_external_container(container: str):
         raise NotImplementedError(container)
 
 
-async def start_server(args: argparse.Namespace):
+# `mcpserver start` flags that override server settings of the same name
+UVICORN_SETTINGS_FLAGS = {
+    "http": "UVICORN_HTTP",
+    "backlog": "UVICORN_BACKLOG",
+    "limit_concurrency": "UVICORN_LIMIT_CONCURRENCY",
+    "timeout_keep_alive": "UVICORN_TIMEOUT_KEEP_ALIVE",
+    "h11_max_incomplete_event_size": "UVICORN_H11_MAX_INCOMPLETE_EVENT_SIZE",
+}
+
+
+def get_settings_overrides(args: argparse.Namespace) -> Dict[str, Any]:
+    """Settings given on the command line; unset flags keep the .env / default value."""
+    overrides = {
+        setting: getattr(args, flag)
+        for flag, setting in UVICORN_SETTINGS_FLAGS.items()
+        if getattr(args, flag, None) is not None
+    }
+    if getattr(args, "workers", 1) > 1:
+        # Workers share the provider's rate limit and cached responses through SQLite
+        overrides["RATE_LIMIT_SHARED"] = True
+        overrides["DISK_CACHE_ENABLED"] = True
+    if getattr(args, "worker_index", None) is not None:
+        # ...but not a content index, whose shards each worker rewrites and deletes
+        overrides["CONTENT_INDEX_WORKER"] = args.worker_index
+    return overrides
+
+
+def get_event_loop_type(args: argparse.Namespace) -> str:
+    """--loop, else UVICORN_LOOP read like every other server setting."""
+    if args.loop:
+        return args.loop
+    # The loop must exist before the server (and its settings) can be created
+    from mcp_servers.base import BaseMCPServerSettings
+
+    settings = BaseMCPServerSettings(SERVER_NAME=args.server, PORT=args.port)
+    return settings.UVICORN_LOOP
+
+
+# URL prefix of each server in `--server composite` mode, e.g. /fs/mcp
+COMPOSITE_PREFIXES = {
+    "filesystem": "fs",
+    "brave": "brave",
+    "searxng": "searxng",
+    "tavily": "tavily",
+}
+
+
+def create_server(
+    server_type: str,
+    args: argparse.Namespace,
+    sockets: Optional[List[socket.socket]] = None,
+) -> "AbstractMCPServer":
+    """Instantiates a single MCP server from `mcpserver start` arguments."""
+    options: Dict[str, Any] = {
+        "host": args.host,
+        "port": args.port,
+        "settings_overrides": get_settings_overrides(args),
+        "sockets": sockets,
+    }
+    if server_type == "filesystem":
+        from mcp_servers.filesystem import MCPServerFilesystem
+
+        return MCPServerFilesystem(allowed_dir=args.allowed_dir, **options)
+    elif server_type == "brave":
+        from mcp_servers.brave import MCPServerBrave
+
+        assert os.getenv("BRAVE_API_KEY"), "BRAVE_API_KEY must be set"
+        return MCPServerBrave(**options)
+    elif server_type == "searxng":
+        from mcp_servers.searxng import MCPServerSearxng
+
+        assert os.getenv("SEARXNG_BASE_URL"), "SEARXNG_BASE_URL must be set"
+        return MCPServerSearxng(**options)
+    elif server_type == "tavily":
+        from mcp_servers.tavily import MCPServerTavily
+
+        assert os.getenv("TAVILY_API_KEY"), "TAVILY_API_KEY must be set"
+        return MCPServerTavily(**options)
+    else:
+        raise ValueError(f"Unknown server type: {server_type}")
+
+
+async def start_server(
+    args: argparse.Namespace, sockets: Optional[List[socket.socket]] = None
+):
     """Main entry point for the mcpserver CLI application."""
     # Handle the 'start' command
     if args.command == "start":
         server_type = args.server  # more readable
-        if server_type == "filesystem":
-            server = MCPServerFilesystem(
-                host=args.host, port=args.port, allowed_dir=args.allowed_dir
+        profile_output_prefix = get_profile_output_prefix(
+            server_type, args.port, getattr(args, "worker_index", None)
+        )
+        server: Union["AbstractMCPServer", "CompositeMCPServer"]
+        if server_type == "composite":
+            from mcp_servers.composite import CompositeMCPServer
+
+            server = CompositeMCPServer(
+                {
+                    COMPOSITE_PREFIXES[name]: create_server(name, args)
+                    for name in args.mount
+                },
+                host=args.host,
+                port=args.port,
+                sockets=sockets,
             )
-            try:
-                await server.start()
-                await server.await_server_task()
-            except KeyboardInterrupt:
-                print("\nServer shutting down...")
-                await server.stop()
-                sys.exit(0)
-        elif server_type == "brave":
-            assert os.getenv("BRAVE_API_KEY"), "BRAVE_API_KEY must be set"
-
-            server = MCPServerBrave(host=args.host, port=args.port)
-            try:
-                await server.start()
-                await server.await_server_task()
-            except KeyboardInterrupt:
-                print("\nServer shutting down...")
-                await server.stop()
-                sys.exit(0)
-        elif server_type == "searxng":
-            assert os.getenv("SEARXNG_BASE_URL"), "SEARXNG_BASE_URL must be set"
-
-            server = MCPServerSearxng(host=args.host, port=args.port)
-            try:
-                await server.start()
-                await server.await_server_task()
-            except KeyboardInterrupt:
-                print("\nServer shutting down...")
-                await server.stop()
-                sys.exit(0)
-        elif server_type == "tavily":
-            assert os.getenv("TAVILY_API_KEY"), "TAVILY_API_KEY must be set"
-
-            server = MCPServerTavily(host=args.host, port=args.port)
-            try:
-                await server.start()
-                await server.await_server_task()
-            except KeyboardInterrupt:
-                print("\nServer shutting down...")
-                await server.stop()
-                sys.exit(0)
         else:
-            raise ValueError(f"Unknown server type: {args.server}")
+            server = create_server(server_type, args, sockets)
+        try:
+            await server.start()
+            install_profile_signal_handler(profile_output_prefix)
+            await server.await_server_task()
+        except KeyboardInterrupt:
+            print("\nServer shutting down...")
+            await server.stop()
+            sys.exit(0)
+
+
+def get_profile_output_prefix(
+    server: str, port: int, worker_index: Optional[int] = None
+) -> str:
+    prefix = os.path.join(PID_DIR, f"mcp_server_{server}_{port}")
+    if worker_index is not None:
+        prefix += f".worker{worker_index}"
+    return prefix
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Creates the listening socket shared by all worker processes."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+    except OSError as e:
+        logger.error(f"Could not bind {host}:{port}: {e}")
+        sys.exit(1)
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(args: argparse.Namespace, sock: socket.socket, index: int) -> None:
+    """Entry point of a worker process started by `run_workers`."""
+    from mcp_servers.base import run_event_loop
+
+    args.worker_index = index
+    try:
+        run_event_loop(start_server(args, sockets=[sock]), get_event_loop_type(args))
+    except KeyboardInterrupt:
+        pass
+
+
+# A worker that exits this soon after starting is failing to start, not crashing
+WORKER_STARTUP_GRACE_PERIOD = 10.0
+# A crashed worker is restarted after a delay that doubles with each crash of that
+# worker, and starts over once it has run WORKER_STABLE_UPTIME seconds
+WORKER_RESTART_DELAY = 0.5
+WORKER_RESTART_MAX_DELAY = 30.0
+WORKER_STABLE_UPTIME = 60.0
+
+
+def run_workers(args: argparse.Namespace) -> None:
+    """
+    Serves `args.workers` processes that accept connections from one listening socket
+    (pre-fork, like `uvicorn --workers`). Crashed workers are restarted, with
+    exponential backoff; a worker that exits with code 0 was stopped on purpose and
+    is not. SIGTERM and SIGINT stop all of them, SIGUSR1 profiles each one.
+    """
+    backlog = args.backlog or int(os.getenv("UVICORN_BACKLOG", "2048"))
+    sock = bind_socket(args.host, args.port, backlog)
+    # Spawn instead of fork: workers must not inherit the supervisor's threads
+    context = multiprocessing.get_context("spawn")
+    workers: Dict[int, Any] = {}
+    started_at: Dict[int, float] = {}
+    crashes: Dict[int, int] = {}  # consecutive crashes of each worker
+    restart_at: Dict[int, float] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        process = context.Process(
+            target=run_worker,
+            args=(args, sock, index),
+            name=f"mcpserver-{args.server}-{args.port}-worker{index}",
+        )
+        process.start()
+        workers[index] = process
+        started_at[index] = time.monotonic()
+
+    def on_stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    def on_profile(signum, frame) -> None:
+        output_prefix = get_profile_output_prefix(args.server, args.port)
+        # Written before the request is consumed, which is what `profile_server` waits for
+        write_profile_targets(
+            output_prefix,
+            [
+                get_profile_output_prefix(args.server, args.port, index)
+                for index, process in workers.items()
+                if process.pid
+            ],
+        )
+        duration = read_profile_request(output_prefix)
+        for index, process in workers.items():
+            prefix = get_profile_output_prefix(args.server, args.port, index)
+            write_profile_request(prefix, duration)
+            if process.pid:
+                os.kill(process.pid, signal.SIGUSR1)
+
+    signal.signal(signal.SIGTERM, on_stop)
+    signal.signal(signal.SIGINT, on_stop)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, on_profile)
+
+    logger.info(
+        f"Starting {args.workers} {args.server} workers on {args.host}:{args.port}."
+    )
+    for index in range(args.workers):
+        spawn(index)
+
+    exit_code = 0
+    while not stopping:
+        now = time.monotonic()
+        for index, at in list(restart_at.items()):
+            if at <= now:
+                del restart_at[index]
+                spawn(index)
+        timeout = min([1.0, *(at - now for at in restart_at.values())])
+        multiprocessing.connection.wait(
+            [process.sentinel for process in workers.values()], timeout=max(timeout, 0)
+        )
+        for index, process in list(workers.items()):
+            if process.is_alive() or stopping:
+                continue
+            del workers[index]
+            uptime = time.monotonic() - started_at[index]
+            if process.exitcode == 0:
+                logger.info(f"Worker {index} stopped; it is not restarted.")
+                if not workers and not restart_at:
+                    stopping = True
+                continue
+            if uptime < WORKER_STARTUP_GRACE_PERIOD:
+                logger.error(
+                    f"Worker {index} failed to start (exit code {process.exitcode}); stopping."
+                )
+                stopping = True
+                exit_code = 1
+                break
+            if uptime >= WORKER_STABLE_UPTIME:
+                crashes[index] = 0
+            delay = min(
+                WORKER_RESTART_DELAY * 2 ** min(crashes.get(index, 0), 16),
+                WORKER_RESTART_MAX_DELAY,
+            )
+            crashes[index] = crashes.get(index, 0) + 1
+            logger.warning(
+                f"Worker {index} exited with code {process.exitcode}; "
+                f"restarting it in {delay:.1f}s."
+            )
+            restart_at[index] = time.monotonic() + delay
+
+    for process in workers.values():
+        if process.is_alive():
+            process.terminate()
+    for process in workers.values():
+        process.join(timeout=10)
+        if process.is_alive():
+            process.kill()
+    sock.close()
+    logger.info(f"Stopped {args.server} workers.")
+    sys.exit(exit_code)
+
+
+def profile_server(server: str, port: int, duration: float) -> None:
+    """Profile a running server for `duration` seconds and wait for the reports."""
+    pid_filename = os.path.join(PID_DIR, f"mcp_server_{server}_{port}.pid")
+    try:
+        with open(pid_filename, "r") as f:
+            pid = int(f.read().strip())
+    except (IOError, ValueError) as e:
+        logger.error(
+            f"Error reading PID file: {e}. Only detached servers can be profiled."
+        )
+        sys.exit(1)
+
+    output_prefix = get_profile_output_prefix(server, port)
+    request_filename = output_prefix + PROFILE_REQUEST_SUFFIX
+    write_profile_request(output_prefix, duration)
+    try:
+        os.remove(output_prefix + PROFILE_TARGETS_SUFFIX)  # left by an earlier profile
+    except FileNotFoundError:
+        pass
+
+    requested_at = time.time()
+    try:
+        os.kill(pid, signal.SIGUSR1)
+    except ProcessLookupError:
+        logger.error(f"Error: No process found with PID {pid}.")
+        sys.exit(1)
+    logger.info(f"Profiling {server} (PID: {pid}) for {duration:.0f}s...")
+
+    def is_written(path: str) -> bool:
+        try:
+            return os.path.getmtime(path) >= requested_at
+        except OSError:
+            return False
+
+    # The server (or the --workers supervisor) consumes the request when the signal
+    # arrives; only then is the list of processes that will write reports known
+    deadline = requested_at + duration + 30
+    while time.time() < deadline and os.path.exists(request_filename):
+        time.sleep(0.1)
+    targets = read_profile_targets(output_prefix)
+    # The allocation report is written last, after the CPU profile
+    pending = [prefix + ALLOCATION_REPORT_SUFFIX for prefix in targets]
+    while time.time() < deadline and pending:
+        pending = [path for path in pending if not is_written(path)]
+        if pending:
+            time.sleep(0.5)
+    if pending:
+        logger.error(
+            f"Profile not written in time ({', '.join(pending)} missing); "
+            f"check {output_prefix}.err"
+        )
+        sys.exit(1)
+
+    for prefix in targets:
+        print(f"CPU profile (collapsed stacks): {prefix + CPU_PROFILE_SUFFIX}")
+        print(f"Allocation report: {prefix + ALLOCATION_REPORT_SUFFIX}")
+    print("Render a flamegraph with: flamegraph.pl <cpu profile> > profile.svg")
 
 
 def stop_server(server: str, port: int) -> None:
@@ -299,6 +594,8 @@ def stop_server(server: str, port: int) -> None:
             os.remove(err_filename)
         sys.exit(1)
 
+    import psutil
+
     # Check if process is running
     try:
         proc = psutil.Process(pid)
@@ -345,6 +642,11 @@ def daemon_main(args: argparse.Namespace):
     # Handle graceful shutdown
     daemon_logger = setup_damon_logging(args.server, args.port)
     daemon_logger.info(f"Starting {args.server}:{args.port} in daemon mode")
+    if args.workers > 1:
+        run_workers(args)
+        return
+    from mcp_servers.base import run_event_loop
+
     loop = asyncio.get_event_loop()
     for sig in (signal.SIGTERM, signal.SIGINT):
         loop.add_signal_handler(
@@ -355,7 +657,7 @@ def daemon_main(args: argparse.Namespace):
         )
 
     try:
-        asyncio.run(start_server(args))
+        run_event_loop(start_server(args), get_event_loop_type(args))
     except Exception as e:
         daemon_logger.error(f"Daemon failed: {str(e)}", exc_info=True)
         sys.exit(1)
@@ -363,6 +665,8 @@ def daemon_main(args: argparse.Namespace):
 
 def check_existing_server(pid_file: str) -> None:
     """Check if a server of the given type is already running."""
+    import psutil
+
     if os.path.exists(pid_file):
         try:
             with open(pid_file, "r") as f:
@@ -395,6 +699,8 @@ def show_status():
     Display MCP servers' status, both attached and detached.
     """
 
+    import psutil
+
     def find_processes_by_cmdline(search_string):
         processes = []
         for process in psutil.process_iter(["pid", "name", "cmdline"]):
@@ -509,9 +815,18 @@ def main():
             "brave",
             "searxng",
             "tavily",
+            "composite",
         ],
         required=True,
-        help="Type of server to start",
+        help="Type of server to start. 'composite' serves the servers given by "
+        "--mount on one port, under /fs/mcp, /brave/mcp, /searxng/mcp and /tavily/mcp",
+    )
+    start_parser.add_argument(
+        "--mount",
+        nargs="+",
+        choices=list(COMPOSITE_PREFIXES),
+        default=list(COMPOSITE_PREFIXES),
+        help="Servers to host with --server composite",
     )
     start_parser.add_argument(
         "--allowed-dir",
@@ -533,6 +848,45 @@ def main():
     start_parser.add_argument(
         "--detach", action="store_true", help="Run the server in detached (daemon) mode"
     )
+    start_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes sharing the port. With more than one, "
+        "rate limits and the disk cache are shared through SQLite",
+    )
+    uvicorn_group = start_parser.add_argument_group(
+        "runtime options",
+        "Override the UVICORN_* settings from the .env file",
+    )
+    uvicorn_group.add_argument(
+        "--loop",
+        choices=["auto", "asyncio", "uvloop"],
+        help="Event loop implementation (default: asyncio); auto uses uvloop when installed",
+    )
+    uvicorn_group.add_argument(
+        "--http",
+        choices=["auto", "h11", "httptools"],
+        help="HTTP/1.1 parser; auto uses httptools when installed",
+    )
+    uvicorn_group.add_argument(
+        "--backlog", type=int, help="Maximum number of pending TCP connections"
+    )
+    uvicorn_group.add_argument(
+        "--limit-concurrency",
+        type=int,
+        help="Maximum concurrent connections before responding with 503",
+    )
+    uvicorn_group.add_argument(
+        "--timeout-keep-alive",
+        type=int,
+        help="Seconds to keep idle keep-alive connections open",
+    )
+    uvicorn_group.add_argument(
+        "--h11-max-incomplete-event-size",
+        type=int,
+        help="Maximum bytes buffered for an incomplete request head (h11 only)",
+    )
 
     stop_parser = subparsers.add_parser("stop", help="Stop a running MCP server")
     stop_parser.add_argument(
@@ -542,6 +896,7 @@ def main():
             "brave",
             "searxng",
             "tavily",
+            "composite",
         ],
         required=True,
         help="Type of server to start",
@@ -550,6 +905,28 @@ def main():
         "--port", type=int, required=True, help="Port to stop the server on"
     )
 
+    profile_parser = subparsers.add_parser(
+        "profile", help="Profile CPU and memory of a running detached MCP server"
+    )
+    profile_parser.add_argument(
+        "--server",
+        choices=[
+            "filesystem",
+            "brave",
+            "searxng",
+            "tavily",
+            "composite",
+        ],
+        required=True,
+        help="Type of server to profile",
+    )
+    profile_parser.add_argument(
+        "--port", type=int, required=True, help="Port of the server to profile"
+    )
+    profile_parser.add_argument(
+        "--duration", type=float, default=30.0, help="Seconds to profile for"
+    )
+
     init_parser = subparsers.add_parser("init", help="Stop a running MCP server")
     init_parser.add_argument(
         "--force",
@@ -619,6 +996,9 @@ def main():
 
             check_existing_server(pid_filename)
 
+            import daemon
+            import daemon.pidfile
+
             pidfile = daemon.pidfile.TimeoutPIDLockFile(pid_filename)
             logger.info(
                 f"Starting {args.server} at {args.host}:{args.port} in detach mode."
@@ -632,9 +1012,16 @@ def main():
                 daemon_main(args)
         else:
             # Run in foreground
-            asyncio.run(start_server(args))
+            if args.workers > 1:
+                run_workers(args)
+            else:
+                from mcp_servers.base import run_event_loop
+
+                run_event_loop(start_server(args), get_event_loop_type(args))
     elif args.command == "stop":
         stop_server(args.server, args.port)
+    elif args.command == "profile":
+        profile_server(args.server, args.port, args.duration)
     elif args.command == "init":
         initialize_config(args.subcommand, args.force)
     elif args.command == "run_external_container":
@@ -0,0 +1,283 @@
+import os
+import signal
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from mcp_servers.exceptions import MCPCommandTimeoutError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+READ_CHUNK_SIZE = 64 * 1024
+MAX_STDERR_BYTES = 64 * 1024  # kept for error messages; the rest is drained
+
+
+class CommandResult:
+    """Exit status and captured output of one external command."""
+
+    def __init__(self, returncode: int, stdout: str, stderr: str, truncated: bool):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        # The command was killed before its output ended: stdout outgrew
+        # `max_output_bytes` (`stdout` holds the complete lines read until then), or
+        # more than `max_lines` lines were available
+        self.truncated = truncated
+
+
+class CommandRunner:
+    """
+    Runs external commands (fd, rg, tree) as asyncio subprocesses, so a slow command
+    does not block the event loop and every other session of the server with it.
+
+    At most `max_concurrency` commands run at once; the rest wait for a slot. A command
+    still running after `timeout` seconds, or whose caller is cancelled, is killed.
+    Output is read in chunks while the command runs: stdout is kept up to
+    `max_output_bytes`, after which the command is killed and the result marked as
+    truncated, and stderr up to 64 KiB.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        timeout: Optional[float] = 30.0,
+        max_output_bytes: int = 4 * 1024 * 1024,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.timed_out = 0
+        self.truncated = 0
+        self.result_limited = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(
+        self,
+        cmd: List[str],
+        cwd: Optional[Union[str, Path]] = None,
+        timeout: Optional[float] = None,
+        skip_lines: int = 0,
+        max_lines: Optional[int] = None,
+    ) -> CommandResult:
+        """
+        Runs `cmd` and returns its result. Non-zero exit codes are returned, not raised.
+
+        With `max_lines`, stdout is consumed line by line: the first `skip_lines` lines
+        are discarded, the next `max_lines` kept, and the command is killed as soon as
+        one more line arrives. `truncated` then means more lines were available.
+
+        Raises:
+            FileNotFoundError: If the executable is not installed.
+            MCPCommandTimeoutError: If the command ran longer than the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        async with self._slot():
+            return await self._run(cmd, cwd, timeout, skip_lines, max_lines)
+
+    async def run_in_thread(
+        self,
+        name: str,
+        fn: Callable[[threading.Event], T],
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Runs `fn(cancel)` on a worker thread under the same concurrency cap and timeout
+        as commands; used for the built-in equivalents of fd, rg and tree. `cancel` is
+        set when the call times out or is cancelled, and `fn` should stop soon after.
+
+        Raises:
+            MCPCommandTimeoutError: If `fn` ran longer than the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        cancel = threading.Event()
+        async with self._slot():
+            try:
+                async with asyncio.timeout(timeout):
+                    return await asyncio.to_thread(fn, cancel)
+            except TimeoutError as e:
+                self.timed_out += 1
+                logger.warning(f"Stopped built-in {name} after {timeout:g}s.")
+                raise MCPCommandTimeoutError(
+                    f"{name} did not finish within {timeout:g}s and was stopped. "
+                    "Narrow the search and try again."
+                ) from e
+            finally:
+                cancel.set()
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def _run(
+        self,
+        cmd: List[str],
+        cwd: Optional[Union[str, Path]],
+        timeout: Optional[float],
+        skip_lines: int,
+        max_lines: Optional[int],
+    ) -> CommandResult:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+        assert process.stdout is not None and process.stderr is not None
+        if max_lines is None:
+            read_stdout = self._read(
+                process, process.stdout, self.max_output_bytes, True
+            )
+        else:
+            read_stdout = self._read_lines(
+                process, process.stdout, skip_lines, max_lines
+            )
+        try:
+            async with asyncio.timeout(timeout):
+                (stdout, truncated), (stderr, _) = await asyncio.gather(
+                    read_stdout,
+                    self._read(process, process.stderr, MAX_STDERR_BYTES, False),
+                )
+                returncode = await process.wait()
+        except TimeoutError as e:
+            self.timed_out += 1
+            logger.warning(f"Killed `{cmd[0]}` after {timeout:g}s: {' '.join(cmd)}")
+            raise MCPCommandTimeoutError(
+                f"`{cmd[0]}` did not finish within {timeout:g}s and was stopped. "
+                "Narrow the search and try again."
+            ) from e
+        finally:
+            if process.returncode is None:
+                _kill(process)
+                await process.wait()
+
+        if truncated and max_lines is not None:
+            self.result_limited += 1
+        elif truncated:
+            self.truncated += 1
+            stdout = stdout[: stdout.rfind(b"\n") + 1]  # drop the partial last line
+        return CommandResult(
+            returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+            truncated,
+        )
+
+    @staticmethod
+    async def _read(
+        process: asyncio.subprocess.Process,
+        stream: asyncio.StreamReader,
+        limit: int,
+        kill_on_overflow: bool,
+    ) -> Tuple[bytes, bool]:
+        """
+        Reads `stream` to EOF keeping at most `limit` bytes. On overflow either kills
+        the process or keeps draining the stream so the process never blocks on a
+        full pipe.
+        """
+        chunks: List[bytes] = []
+        size = 0
+        overflowed = False
+        while chunk := await stream.read(READ_CHUNK_SIZE):
+            if overflowed:
+                continue
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                overflowed = True
+                if kill_on_overflow:
+                    _kill(process)
+                    break
+        return b"".join(chunks)[:limit], overflowed
+
+    async def _read_lines(
+        self,
+        process: asyncio.subprocess.Process,
+        stream: asyncio.StreamReader,
+        skip_lines: int,
+        max_lines: int,
+    ) -> Tuple[bytes, bool]:
+        """
+        Keeps non-empty lines `skip_lines` to `skip_lines + max_lines` of `stream`, and
+        kills the process once a line past them arrives. Only the kept lines and one
+        partial line are held in memory; a partial line longer than `max_output_bytes`
+        also stops the process.
+        """
+        kept: List[bytes] = []
+        seen = 0
+        pending = b""
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop() if chunk else b""
+            for line in lines:
+                if not line:
+                    continue
+                if seen >= skip_lines + max_lines:
+                    _kill(process)
+                    return b"\n".join(kept), True
+                if seen >= skip_lines:
+                    kept.append(line)
+                seen += 1
+            if not chunk:
+                return b"\n".join(kept), False
+            if len(pending) > self.max_output_bytes:
+                _kill(process)
+                return b"\n".join(kept), True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "timed_out": self.timed_out,
+            "truncated": self.truncated,
+            "result_limited": self.result_limited,
+        }
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    """
+    Kills the command and everything it started: a child left running (e.g. by a
+    wrapper script) would hold the output pipes open and keep `wait()` blocked.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
@@ -0,0 +1,168 @@
+import socket
+import asyncio
+import contextlib
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from mcp_servers.base import AbstractMCPServer, MCPServerHttpBase, MCPUvicornServer
+from mcp_servers.exceptions import MCPServerError
+from mcp_servers.logger import MCPServersLogger
+from mcp_servers.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+
+if TYPE_CHECKING:
+    from pydantic_ai.mcp import MCPServerStreamableHTTP
+
+
+class CompositeMCPServer:
+    """
+    Serves several MCP servers from one process, one uvicorn server and one port,
+    each mounted under its own prefix: {"fs": filesystem_server} is served at `/fs/mcp`.
+
+    Servers keep their own tools, settings, rate limits and caches. Upstream HTTP
+    requests of all servers share one connection pool, whose limits are the sum of the
+    servers' limits. `/metrics` at the root reports every server.
+    """
+
+    def __init__(
+        self,
+        servers: Dict[str, AbstractMCPServer],
+        host: str,
+        port: int,
+        uvicorn_options: Optional[Dict[str, Any]] = None,
+        sockets: Optional[List[socket.socket]] = None,
+    ):
+        if not servers:
+            raise ValueError("CompositeMCPServer needs at least one server.")
+        self.logger = MCPServersLogger.get_logger(self.__class__.__name__)
+        self.servers = servers
+        self.host = host
+        self.port = port
+        first_server = next(iter(servers.values()))
+        self.uvicorn_options = (
+            uvicorn_options
+            if uvicorn_options is not None
+            else first_server.mcp_server.uvicorn_options
+        )
+        self.sockets = sockets
+        self.http_transport: Optional[httpx.AsyncHTTPTransport] = None
+        self.server: Optional[MCPUvicornServer] = None
+        self.server_task: Optional[asyncio.Task] = None
+
+        for prefix, server in servers.items():
+            server.mount_path = f"/{prefix.strip('/')}"
+            server.settings.HOST = host
+            server.settings.PORT = port
+
+    def _create_http_transport(self) -> Optional[httpx.AsyncHTTPTransport]:
+        http_servers = [
+            server
+            for server in self.servers.values()
+            if isinstance(server, MCPServerHttpBase)
+        ]
+        if not http_servers:
+            return None
+
+        def total(values: List[Optional[int]]) -> Optional[int]:
+            return None if any(v is None for v in values) else sum(values)  # type: ignore[arg-type]
+
+        limits = [server._get_http_limits() for server in http_servers]
+        expiries = [limit.keepalive_expiry for limit in limits]
+        return httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=total([limit.max_connections for limit in limits]),
+                max_keepalive_connections=total(
+                    [limit.max_keepalive_connections for limit in limits]
+                ),
+                keepalive_expiry=(
+                    None if None in expiries else max(expiries)  # type: ignore[type-var]
+                ),
+            ),
+            http2=any(server._http2_available() for server in http_servers),
+        )
+
+    def build_app(self) -> Starlette:
+        """Mounts every server's MCP app and runs all their session managers."""
+        routes: List[Any] = [
+            Route("/metrics", self._handle_metrics, methods=["GET"]),
+        ]
+        for server in self.servers.values():
+            routes.append(
+                Mount(server.mount_path, app=server.mcp_server.streamable_http_app())
+            )
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            # Mounted apps' lifespans are not run by Starlette, so enter them here
+            async with contextlib.AsyncExitStack() as stack:
+                for server in self.servers.values():
+                    await stack.enter_async_context(
+                        server.mcp_server.session_manager.run()
+                    )
+                yield
+
+        return Starlette(routes=routes, lifespan=lifespan)
+
+    async def start(self) -> None:
+        self.http_transport = self._create_http_transport()
+        for server in self.servers.values():
+            server.http_transport = self.http_transport
+        await asyncio.gather(*(server.setup() for server in self.servers.values()))
+
+        config = uvicorn.Config(
+            self.build_app(),
+            host=self.host,
+            port=self.port,
+            log_level="warning",
+            **self.uvicorn_options,
+        )
+        self.server = MCPUvicornServer(config)
+        self.server_task = asyncio.create_task(self.server.serve(sockets=self.sockets))
+        if not await self.server.wait_started(self.server_task):
+            await self.stop()
+            raise MCPServerError(
+                f"Composite server failed to start on {self.host}:{self.port}."
+            )
+        self.logger.info(
+            f"Serving {', '.join(f'{s.mount_path}/mcp' for s in self.servers.values())} "
+            f"on http://{self.host}:{self.port}"
+        )
+
+    async def await_server_task(self) -> None:
+        if self.server_task:
+            await self.server_task
+        else:
+            self.logger.warning("There is no active server task to await")
+
+    async def stop(self) -> None:
+        if self.server and self.server_task:
+            self.server.should_exit = True
+            await self.server_task
+        results = await asyncio.gather(
+            *(server.teardown() for server in self.servers.values()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Error while stopping a server: {result!r}")
+        if self.http_transport:
+            await self.http_transport.aclose()
+            self.http_transport = None
+        self.logger.info("Shutdown composite server")
+
+    def get_mcp_servers_streamable_http(self) -> List["MCPServerStreamableHTTP"]:
+        """Returns one MCPServerStreamableHTTP per mounted server."""
+        return [
+            server.get_mcp_server_streamable_http() for server in self.servers.values()
+        ]
+
+    async def _handle_metrics(self, request: Request) -> Response:
+        await asyncio.gather(
+            *(server._refresh_stats() for server in self.servers.values())
+        )
+        return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
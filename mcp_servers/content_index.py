@@ -0,0 +1,559 @@
+import os
+import re
+import mmap
+import time
+import struct
+import asyncio
+import bisect
+import logging
+import threading
+from array import array
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from mcp_servers.fswalk import (
+    BINARY_SNIFF_BYTES,
+    FILE,
+    compile_grep_pattern,
+    search_files,
+    walk,
+)
+from mcp_servers.metrics import REGISTRY
+
+try:  # the parser re itself uses, private to CPython
+    from re import _constants as sre, _parser as sre_parse
+except ImportError:  # pragma: no cover - grep then scans every file
+    sre = sre_parse = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+UPDATE_LAG = REGISTRY.histogram(
+    "mcp_content_index_update_lag_seconds",
+    "Delay between a file change being reported and the content index reflecting it.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+).labels()
+
+MAGIC = b"MCPTRI02"
+HEADER = struct.Struct("<8sQQQQ")  # magic, files, trigrams, postings, path bytes
+SHARD_FILES = 20_000  # changed files collected in memory before a shard is written
+MAX_FILE_BYTES = 4 * 1024 * 1024  # larger text files are not indexed, only searched
+PATH_SAMPLE_EVERY = 64  # shard paths kept in memory to narrow path lookups
+# File flags
+UNINDEXED = 1  # too large to index: a candidate for every search
+BINARY = 2  # never a candidate, like rg and the built-in grep
+
+# A trigram, or ("and" | "or", [Query, ...])
+Query = Union[int, Tuple[str, List[Any]]]
+
+
+# The non-ASCII letters that case-insensitive matching equates with ASCII ones: the
+# dotted and dotless i, the long s and the Kelvin sign. Folded before trigrams are
+# taken, so the trigrams of an ASCII literal are in every file that matches it.
+ASCII_FOLDS = [
+    (letter.encode(), ascii_letter.encode())
+    for letter, ascii_letter in (
+        ("\u0130", "i"),
+        ("\u0131", "i"),
+        ("\u017f", "s"),
+        ("\u212a", "k"),
+    )
+]
+
+
+def trigrams(data: bytes) -> Set[int]:
+    """Distinct 3-byte sequences of `data`, ASCII-lowercased, as 24-bit integers."""
+    if not data.isascii():
+        for letter, ascii_letter in ASCII_FOLDS:
+            data = data.replace(letter, ascii_letter)
+    data = data.lower()
+    return {a << 16 | b << 8 | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+def trigram_query(pattern: str) -> Optional[Query]:
+    """
+    The trigrams a file must contain to match the regex `pattern` case-insensitively,
+    or None if the pattern requires none (e.g. `.*`, `ab`, `[0-9]+`). Literal runs of
+    3+ ASCII characters contribute their trigrams; alternations become an OR of their
+    branches; optional parts, character classes, lookarounds and non-ASCII characters
+    (whose other cases may be encoded differently) contribute nothing.
+    Always None when the interpreter does not expose `re`'s parser.
+    """
+    if sre_parse is None:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern.encode("utf-8"), re.IGNORECASE)
+        return _conjunction(_required(parsed))
+    except (re.error, RecursionError):
+        return None
+    except (AttributeError, TypeError, ValueError):  # a parser of another shape
+        logger.debug(f"Cannot extract trigrams from {pattern!r}", exc_info=True)
+        return None
+
+
+def _conjunction(terms: List[Query]) -> Optional[Query]:
+    if not terms:
+        return None
+    return terms[0] if len(terms) == 1 else ("and", terms)
+
+
+def _required(items) -> List[Query]:
+    terms: List[Query] = []
+    run = bytearray()
+
+    def flush() -> None:
+        if len(run) >= 3:
+            terms.extend(trigrams(bytes(run)))
+        run.clear()
+
+    for op, av in items:
+        # Matches are within one line; bytes >= 0x80 are parts of non-ASCII characters
+        if op is sre.LITERAL and av != ord("\n") and av < 0x80:
+            run.append(av)
+            continue
+        flush()
+        if op is sre.SUBPATTERN:
+            terms.extend(_required(av[-1]))
+        elif op is sre.ATOMIC_GROUP:
+            terms.extend(_required(av))
+        elif op in (sre.MAX_REPEAT, sre.MIN_REPEAT, sre.POSSESSIVE_REPEAT):
+            if av[0] >= 1:
+                terms.extend(_required(av[2]))
+        elif op is sre.BRANCH:
+            branches = [_conjunction(_required(branch)) for branch in av[1]]
+            if all(branch is not None for branch in branches):
+                terms.append(("or", branches))
+    flush()
+    return terms
+
+
+def _evaluate(query: Query, postings: Callable[[int], Sequence[int]]) -> Sequence[int]:
+    """Sorted ids of the files that can match `query`."""
+    if isinstance(query, int):
+        return postings(query)
+    op, terms = query
+    if op == "or":
+        ids: Set[int] = set()
+        for term in terms:
+            ids.update(_evaluate(term, postings))
+        return sorted(ids)
+    lists = sorted((_evaluate(term, postings) for term in terms), key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        if not result:
+            break
+        result = [i for i in result if _contains(other, i)]
+    return result
+
+
+def _contains(ids: Sequence[int], file_id: int) -> bool:
+    i = bisect.bisect_left(ids, file_id)
+    return i < len(ids) and ids[i] == file_id
+
+
+def _unchanged(location: "Location", st: os.stat_result) -> bool:
+    index, file_id = location
+    return (
+        index.mtimes[file_id] == st.st_mtime_ns and index.sizes[file_id] == st.st_size
+    )
+
+
+def _is_hidden(path: str) -> bool:
+    return any(part.startswith(".") for part in path.split(os.sep))
+
+
+class _Shard:
+    """
+    A memory-mapped, immutable index of some files: their paths (sorted), mtime, size
+    and flags, a sorted trigram table and, per trigram, the sorted ids of the files
+    containing it. Files changed since it was written are marked stale in memory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, files, trigram_count, posting_count, path_bytes = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a content index shard")
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+
+        def take(count: int, fmt: str) -> memoryview:
+            nonlocal offset
+            size = count * struct.calcsize(fmt)
+            part = view[offset : offset + size].cast(fmt)
+            offset += size
+            return part
+
+        self._path_offsets = take(files + 1, "Q")
+        self.mtimes = take(files, "q")
+        self.sizes = take(files, "q")
+        self._keys = take(trigram_count, "I")
+        self._starts = take(trigram_count + 1, "I")
+        self._postings = take(posting_count, "I")
+        self.flags = take(files, "B")
+        self._paths = view[offset : offset + path_bytes]
+        self.files = files
+        self.disk_bytes = len(self._mmap)
+        self.unindexed = [i for i in range(files) if self.flags[i] & UNINDEXED]
+        self.stale: Set[int] = set()
+        self._sample = [self.path_at(i) for i in range(0, files, PATH_SAMPLE_EVERY)]
+
+    def path_at(self, file_id: int) -> str:
+        start, end = self._path_offsets[file_id], self._path_offsets[file_id + 1]
+        return bytes(self._paths[start:end]).decode("utf-8", "surrogateescape")
+
+    def find(self, path: str) -> Optional[int]:
+        block = bisect.bisect_right(self._sample, path) - 1
+        if block < 0:
+            return None
+        lo = block * PATH_SAMPLE_EVERY
+        hi = min(lo + PATH_SAMPLE_EVERY, self.files)
+        i = bisect.bisect_left(range(self.files), path, lo, hi, key=self.path_at)
+        return i if i < hi and self.path_at(i) == path else None
+
+    def postings(self, trigram: int) -> Sequence[int]:
+        i = bisect.bisect_left(self._keys, trigram)
+        if i < len(self._keys) and self._keys[i] == trigram:
+            return self._postings[self._starts[i] : self._starts[i + 1]]
+        return ()
+
+
+class _Delta:
+    """Files indexed since the last shard was written, held in memory."""
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self.mtimes: List[int] = []
+        self.sizes: List[int] = []
+        self.flags = bytearray()
+        self.ids: Dict[str, int] = {}  # live files only
+        self.unindexed: List[int] = []
+        self.stale: Set[int] = set()
+        self._postings: Dict[int, array] = {}
+
+    def add(
+        self, path: str, mtime: int, size: int, flags: int, content: Set[int]
+    ) -> None:
+        file_id = len(self.paths)
+        self.paths.append(path)
+        self.mtimes.append(mtime)
+        self.sizes.append(size)
+        self.flags.append(flags)
+        self.ids[path] = file_id
+        if flags & UNINDEXED:
+            self.unindexed.append(file_id)
+        for trigram in content:
+            ids = self._postings.get(trigram)
+            if ids is None:
+                ids = self._postings[trigram] = array("I")
+            ids.append(file_id)
+
+    def remove(self, path: str) -> None:
+        file_id = self.ids.pop(path, None)
+        if file_id is not None:
+            self.stale.add(file_id)
+
+    def path_at(self, file_id: int) -> str:
+        return self.paths[file_id]
+
+    def postings(self, trigram: int) -> Sequence[int]:
+        return self._postings.get(trigram, ())
+
+    def write(self, path: Path) -> None:
+        """Writes the live files as a shard, atomically."""
+        order = sorted(self.ids.values(), key=self.paths.__getitem__)
+        new_ids = {old: new for new, old in enumerate(order)}
+        keys = array("I", sorted(self._postings))
+        starts = array("I", [0])
+        postings = array("I")
+        for trigram in keys:
+            ids = sorted(new_ids[i] for i in self._postings[trigram] if i in new_ids)
+            postings.extend(ids)
+            starts.append(len(postings))
+        encoded = [self.paths[i].encode("utf-8", "surrogateescape") for i in order]
+        path_offsets = array("Q", [0])
+        for name in encoded:
+            path_offsets.append(path_offsets[-1] + len(name))
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC, len(order), len(keys), len(postings), path_offsets[-1]
+                )
+            )
+            f.write(path_offsets.tobytes())
+            f.write(array("q", [self.mtimes[i] for i in order]).tobytes())
+            f.write(array("q", [self.sizes[i] for i in order]).tobytes())
+            f.write(keys.tobytes())
+            f.write(starts.tobytes())
+            f.write(postings.tobytes())
+            f.write(bytes(self.flags[i] for i in order))
+            f.write(b"".join(encoded))
+        os.replace(tmp, path)
+
+
+# Where a file is indexed: a shard or the delta, and its id there
+Location = Tuple[Union[_Shard, _Delta], int]
+
+
+class ContentIndex:
+    """
+    A trigram index of the text files under `root`, in the style of codesearch and
+    zoekt, that narrows a grep to the files that can match before they are read.
+
+    The index lives in `directory` as memory-mapped shards of up to 20k files each.
+    Changed files are re-read into an in-memory delta, and their old entries marked
+    stale; once the delta holds 20k files it is written as a new shard. A shard that
+    is more than half stale is re-indexed into the delta and deleted.
+
+    At startup the shards are checked against the tree (by mtime and size) in the
+    background: changed and new files are re-indexed, and removed ones marked stale.
+    Until then, and for patterns without a literal of 3+ characters, `covers()` is
+    False and searches scan every file. Afterwards `file_changed()` keeps the index
+    current; it is fed by the path index's inotify events.
+
+    Index updates and candidate lookups run in order on one thread; the candidates
+    are then verified on the caller's executor, like the built-in grep.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        directory: Union[str, Path],
+        exclude: Sequence[str] = (),
+    ):
+        self.root = os.fspath(root)
+        self.directory = Path(directory)
+        self._exclude = list(exclude)
+        self.ready = False
+        self.closing = False
+        self.reindexed = 0
+        self.build_seconds = 0.0
+        self._shards: List[_Shard] = []
+        self._delta = _Delta()
+        self._next_shard = 0
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="mcp-content-index")
+
+    # Called from other threads
+
+    def start(self) -> None:
+        """Loads the shards on disk and brings them up to date in the background."""
+        self._submit(self._load)
+        self._submit(self._reconcile)
+
+    async def close(self) -> None:
+        """
+        Stops a reconcile in progress and writes the delta as a shard, so the files
+        read so far are not read again at the next start.
+        """
+        self.ready = False
+        self.closing = True
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._flush)
+        await asyncio.to_thread(self._executor.shutdown)
+
+    def file_changed(self, path: str, exists: bool) -> None:
+        if not _is_hidden(path):
+            self._submit(self._update, path, exists, time.monotonic())
+
+    def events_lost(self) -> None:
+        self.ready = False
+        self._submit(self._reconcile)
+
+    def covers(self, pattern: str) -> bool:
+        """Whether `grep(pattern)` can use the index."""
+        return self.ready and trigram_query(pattern) is not None
+
+    def grep(
+        self,
+        pattern: str,
+        executor: Executor,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[str]:
+        """
+        Yields paths (relative to `root`) of files matching the regex `pattern`, like
+        `fswalk.grep` with its defaults, in path order, reading only the candidate
+        files the index yields.
+
+        Raises:
+            re.error: If `pattern` is not a valid regular expression.
+        """
+        regex = compile_grep_pattern(pattern)
+        query = trigram_query(pattern)
+        if query is None:
+            raise ValueError(f"{pattern!r} has no trigrams to look up")
+        paths = self._executor.submit(self._candidates, query).result()
+        yield from search_files(self.root, paths, regex, executor, cancel)
+
+    def snapshot(self) -> Dict[str, Any]:
+        shards, delta = list(self._shards), self._delta
+        return {
+            "ready": self.ready,
+            "files": sum(s.files - len(s.stale) for s in shards) + len(delta.ids),
+            "shards": len(shards),
+            "delta_files": len(delta.ids),
+            "disk_bytes": sum(s.disk_bytes for s in shards),
+            "reindexed": self.reindexed,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+    def _submit(self, fn: Callable[..., None], *args: Any) -> None:
+        self._executor.submit(fn, *args).add_done_callback(_log_failure)
+
+    # Index thread
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directory.glob("shard-*.tri")):
+            try:
+                self._shards.append(_Shard(path))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable content index shard: {e}")
+                path.unlink(missing_ok=True)
+                continue
+            self._next_shard = max(self._next_shard, int(path.stem[6:]) + 1)
+
+    def _reconcile(self) -> None:
+        started_at = time.perf_counter()
+        seen = {id(shard): bytearray(shard.files) for shard in self._shards}
+        seen_delta: Set[str] = set()
+        for entry in walk(self.root, self._exclude, include_hidden=False):
+            if self.closing:
+                return
+            if entry.kind != FILE:
+                continue
+            path = entry.path
+            try:
+                st = os.stat(os.path.join(self.root, path))
+            except OSError:
+                continue
+            location = self._locate(path)
+            if location is None or not _unchanged(location, st):
+                self._index(path)
+                location = self._locate(path)
+            if location is not None:
+                index, file_id = location
+                if isinstance(index, _Delta):
+                    seen_delta.add(path)
+                elif id(index) in seen:  # not a shard written during this pass
+                    seen[id(index)][file_id] = 1
+        for shard in self._shards:
+            marks = seen.get(id(shard))
+            if marks is not None:
+                shard.stale.update(i for i in range(shard.files) if not marks[i])
+        for path in [p for p in self._delta.ids if p not in seen_delta]:
+            self._delta.remove(path)
+        self._compact()
+        self.ready = True
+        self.build_seconds = time.perf_counter() - started_at
+        snapshot = self.snapshot()
+        logger.info(
+            f"Content index of {self.root} is up to date: {snapshot['files']} files, "
+            f"{self.reindexed} read, {snapshot['disk_bytes'] / 2**20:.0f} MiB on disk, "
+            f"in {self.build_seconds:.1f}s."
+        )
+
+    def _update(self, path: str, exists: bool, changed_at: float) -> None:
+        if self.closing:  # the next start's reconcile picks the change up
+            return
+        if exists:
+            self._index(path)
+        else:
+            self._forget(path)
+        self._compact()
+        UPDATE_LAG.observe(time.monotonic() - changed_at)
+
+    def _locate(self, path: str) -> Optional[Location]:
+        file_id = self._delta.ids.get(path)
+        if file_id is not None:
+            return self._delta, file_id
+        for shard in reversed(self._shards):
+            file_id = shard.find(path)
+            if file_id is not None and file_id not in shard.stale:
+                return shard, file_id
+        return None
+
+    def _forget(self, path: str) -> None:
+        location = self._locate(path)
+        if location is None:
+            return
+        index, file_id = location
+        if isinstance(index, _Delta):
+            index.remove(path)
+        else:
+            index.stale.add(file_id)
+
+    def _index(self, path: str) -> None:
+        """(Re-)reads one file into the delta."""
+        self._forget(path)
+        content: Set[int] = set()
+        try:
+            with open(os.path.join(self.root, path), "rb") as f:
+                st = os.fstat(f.fileno())
+                head = f.read(BINARY_SNIFF_BYTES)
+                if b"\0" in head:
+                    flags = BINARY
+                elif st.st_size > MAX_FILE_BYTES:
+                    flags = UNINDEXED
+                else:
+                    flags = 0
+                    content = trigrams(head + f.read())
+        except OSError:
+            return
+        self._delta.add(path, st.st_mtime_ns, st.st_size, flags, content)
+        self.reindexed += 1
+        if len(self._delta.ids) >= SHARD_FILES:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._delta.ids:
+            return
+        path = self.directory / f"shard-{self._next_shard:06d}.tri"
+        self._next_shard += 1
+        self._delta.write(path)
+        self._shards = [*self._shards, _Shard(path)]
+        self._delta = _Delta()
+
+    def _compact(self) -> None:
+        """Re-indexes the live files of mostly stale shards and deletes the shards."""
+        for shard in list(self._shards):
+            if len(shard.stale) * 2 <= shard.files:
+                continue
+            for file_id in range(shard.files):
+                if file_id not in shard.stale:
+                    self._index(shard.path_at(file_id))
+            self._shards = [s for s in self._shards if s is not shard]
+            shard.path.unlink(missing_ok=True)
+
+    def _candidates(self, query: Query) -> List[str]:
+        paths: List[str] = []
+        for index in (*self._shards, self._delta):
+            ids = set(_evaluate(query, index.postings))
+            ids.update(index.unindexed)
+            paths.extend(
+                index.path_at(i)
+                for i in ids
+                if i not in index.stale and not index.flags[i] & BINARY
+            )
+        paths.sort()
+        return paths
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Content index update failed.", exc_info=future.exception())
@@ -32,3 +32,25 @@ class MCPUpstreamServiceError(MCPServerError):
         if self.details:
             base += f" Details: {str(self.details)[:200]}..."  # Truncate long details
         return base
+
+
+class MCPCircuitOpenError(MCPUpstreamServiceError):
+    """Exception raised when a request is rejected because the upstream circuit is open."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class MCPServerOverloadedError(MCPServerError):
+    """Exception raised when a tool call is rejected by admission control. Safe to retry."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class MCPCommandTimeoutError(MCPServerError):
+    """Exception raised when an external command (fd, rg, tree) exceeds its time limit and is killed."""
+
+    pass
@@ -1,19 +1,72 @@
 import os
+import re
+import base64
+import hashlib
+import itertools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Union, List, Dict, cast, Any, Optional
+from typing import (
+    Awaitable,
+    Callable,
+    Generator,
+    Literal,
+    Union,
+    List,
+    Dict,
+    Tuple,
+    cast,
+    Any,
+    Optional,
+)
 import datetime
 import tempfile
 import shutil
-import subprocess
 
 from pydantic import Field, AliasChoices, field_validator, model_validator
 
+from mcp_servers import DEFAULT_CONFIG_DIR
 from mcp_servers.base import AbstractMCPServer, BaseMCPServerSettings
+from mcp_servers.command_runner import CommandRunner
+from mcp_servers.content_index import ContentIndex
+from mcp_servers.fswalk import DIRECTORY, FILE, find, grep, render_tree
+from mcp_servers.exceptions import MCPCommandTimeoutError
 from mcp_servers.logger import MCPServersLogger
+from mcp_servers.metrics import MetricFamily
+from mcp_servers.path_index import Inotify, PathIndex
 
 ERROR_PREFIX = "Error: "
 STR_ENCODING = "utf-8"
 
+# Built-in search: called with the walk thread pool and a cancel event
+BuiltinSearch = Callable[[Executor, threading.Event], Generator[str, None, None]]
+# Path index search: called with the index, the result offset and the page size
+IndexSearch = Callable[[PathIndex, int, int], Awaitable[Tuple[List[str], bool]]]
+# Left out by every search, so never indexed
+PATH_INDEX_EXCLUDE_DIRS = [".venv", "__pycache__", "node_modules"]
+
+
+def _query_key(cmd: List[str]) -> str:
+    return hashlib.sha256("\0".join(cmd).encode()).hexdigest()[:16]
+
+
+def _encode_cursor(cmd: List[str], offset: int) -> str:
+    """Opaque continuation token: the result offset, bound to the exact command."""
+    return base64.urlsafe_b64encode(f"{offset}:{_query_key(cmd)}".encode()).decode()
+
+
+def _decode_cursor(cursor: str, cmd: List[str]) -> int:
+    try:
+        offset, key = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if key == _query_key(cmd) and int(offset) >= 0:
+            return int(offset)
+    except ValueError:
+        pass
+    raise ValueError(
+        f"{ERROR_PREFIX}Invalid cursor. Pass the next_cursor returned by the same "
+        "search, with the same arguments."
+    )
+
 
 class MCPServerFilesystemSettings(BaseMCPServerSettings):
     """
@@ -37,6 +90,26 @@ class MCPServerFilesystemSettings(BaseMCPServerSettings):
             "The path will be resolved to an absolute path."
         ),
     )
+    # fd, rg and tree subprocesses; slower ones are killed
+    MAX_CONCURRENT_COMMANDS: int = 4
+    COMMAND_TIMEOUT: float = 30.0  # seconds
+    COMMAND_MAX_OUTPUT_BYTES: int = 4 * 1024 * 1024  # stdout kept per command
+    SEARCH_MAX_RESULTS: int = 1000  # upper bound for a search tool's max_results
+    # "auto" runs fd, rg and tree when installed and the built-in walker otherwise
+    SEARCH_ENGINE: Literal["auto", "external", "builtin"] = "auto"
+    WALK_THREADS: int = 8  # built-in walker threads listing directories, reading files
+    # Resident index of every path, kept current with inotify (Linux); once built, the
+    # find tools query it instead of walking the tree
+    PATH_INDEX_ENABLED: bool = False
+    # Trigram index of file contents that narrows the built-in grep to the files that
+    # can match; ignored while grep runs rg. It is kept current from the path index's
+    # inotify events, so it enables that too
+    CONTENT_INDEX_ENABLED: bool = False
+    # Defaults to DEFAULT_CONFIG_DIR/index/<hash of ALLOWED_DIRECTORY>
+    CONTENT_INDEX_DIR: Optional[Path] = None
+    # Set by `mcpserver start --workers`: each worker keeps its index in its own
+    # subdirectory, as shards are written and deleted by the process that owns them
+    CONTENT_INDEX_WORKER: Optional[int] = None
 
     @field_validator("ALLOWED_DIRECTORY", mode="before")
     @classmethod
@@ -105,13 +178,184 @@ class MCPServerFilesystem(AbstractMCPServer):
         host: str,
         port: int,
         allowed_dir: Optional[Path] = None,
+        **kwargs,
     ):
-        super().__init__(host=host, port=port, allowed_dir=allowed_dir)
+        super().__init__(host=host, port=port, allowed_dir=allowed_dir, **kwargs)
+        self.command_runner = CommandRunner(
+            max_concurrency=self.settings.MAX_CONCURRENT_COMMANDS,
+            timeout=self.settings.COMMAND_TIMEOUT,
+            max_output_bytes=self.settings.COMMAND_MAX_OUTPUT_BYTES,
+        )
+        self._installed_tools: Dict[str, bool] = {}
+        self._walk_executor: Optional[ThreadPoolExecutor] = None
+        self.path_index: Optional[PathIndex] = None
+        self.content_index: Optional[ContentIndex] = None
 
     @property
     def settings(self):
         return cast(MCPServerFilesystemSettings, self._settings)
 
+    def _collect_server_stats(self) -> Dict[str, Any]:
+        stats = super()._collect_server_stats()
+        stats["commands"] = self.command_runner.snapshot()
+        if self.path_index:
+            stats["path_index"] = self.path_index.snapshot()
+        if self.content_index:
+            stats["content_index"] = self.content_index.snapshot()
+        return stats
+
+    def _collect_metrics(self) -> List[MetricFamily]:
+        families = super()._collect_metrics()
+        labels = {"server": self.settings.SERVER_NAME}
+        snapshot = self.command_runner.snapshot()
+        active = MetricFamily(
+            "mcp_commands_active", "gauge", "fd, rg and tree processes running."
+        )
+        active.add(labels, snapshot["active"])
+        queued = MetricFamily(
+            "mcp_commands_queued", "gauge", "Commands waiting for a process slot."
+        )
+        queued.add(labels, snapshot["queued"])
+        stopped = MetricFamily(
+            "mcp_commands_stopped",
+            "counter",
+            "Commands killed before finishing, by reason.",
+        )
+        stopped.add({**labels, "reason": "timeout"}, snapshot["timed_out"], "_total")
+        stopped.add(
+            {**labels, "reason": "output_limit"}, snapshot["truncated"], "_total"
+        )
+        stopped.add(
+            {**labels, "reason": "result_limit"}, snapshot["result_limited"], "_total"
+        )
+        families += [active, queued, stopped]
+        if self.path_index:
+            families += self._path_index_metrics(labels, self.path_index.snapshot())
+        if self.content_index:
+            families += self._content_index_metrics(
+                labels, self.content_index.snapshot()
+            )
+        return families
+
+    @staticmethod
+    def _path_index_metrics(
+        labels: Dict[str, str], snapshot: Dict[str, Any]
+    ) -> List[MetricFamily]:
+        ready = MetricFamily(
+            "mcp_path_index_ready",
+            "gauge",
+            "1 while the path index is built and current, 0 while searches walk the tree.",
+        )
+        ready.add(labels, int(snapshot["ready"]))
+        entries = MetricFamily(
+            "mcp_path_index_entries", "gauge", "Paths held by the path index."
+        )
+        entries.add(labels, snapshot["entries"])
+        memory = MetricFamily(
+            "mcp_path_index_memory_bytes",
+            "gauge",
+            "Approximate memory used by the path index.",
+        )
+        memory.add(labels, snapshot["memory_bytes"])
+        watches = MetricFamily(
+            "mcp_path_index_watches", "gauge", "Directories watched through inotify."
+        )
+        watches.add(labels, snapshot["watches"])
+        return [ready, entries, memory, watches]
+
+    @staticmethod
+    def _content_index_metrics(
+        labels: Dict[str, str], snapshot: Dict[str, Any]
+    ) -> List[MetricFamily]:
+        ready = MetricFamily(
+            "mcp_content_index_ready",
+            "gauge",
+            "1 while the content index is up to date, 0 while grep scans every file.",
+        )
+        ready.add(labels, int(snapshot["ready"]))
+        files = MetricFamily(
+            "mcp_content_index_files", "gauge", "Files held by the content index."
+        )
+        files.add(labels, snapshot["files"])
+        delta = MetricFamily(
+            "mcp_content_index_delta_files",
+            "gauge",
+            "Changed files indexed in memory, not yet written to a shard.",
+        )
+        delta.add(labels, snapshot["delta_files"])
+        disk = MetricFamily(
+            "mcp_content_index_disk_bytes", "gauge", "Size of the content index shards."
+        )
+        disk.add(labels, snapshot["disk_bytes"])
+        return [ready, files, delta, disk]
+
+    async def setup(self) -> None:
+        await super().setup()
+        settings = self.settings
+        if self.path_index:
+            return
+        content_index = settings.CONTENT_INDEX_ENABLED
+        if content_index and not self._use_builtin("rg"):
+            self.logger.warning(
+                "CONTENT_INDEX_ENABLED is ignored while grep runs rg, whose results "
+                "differ from the index's; set SEARCH_ENGINE=builtin to use it."
+            )
+            content_index = False
+        if not (settings.PATH_INDEX_ENABLED or content_index):
+            return
+        if not Inotify.supported():
+            self.logger.warning(
+                "PATH_INDEX_ENABLED and CONTENT_INDEX_ENABLED need inotify (Linux); "
+                "searches walk the tree."
+            )
+            return
+        root = settings.ALLOWED_DIRECTORY
+        if content_index:
+            root_key = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+            directory = (
+                settings.CONTENT_INDEX_DIR or DEFAULT_CONFIG_DIR / "index" / root_key
+            )
+            if settings.CONTENT_INDEX_WORKER is not None:
+                directory = directory / f"worker{settings.CONTENT_INDEX_WORKER}"
+            self.content_index = ContentIndex(root, directory, PATH_INDEX_EXCLUDE_DIRS)
+            self.content_index.start()
+        self.path_index = PathIndex(
+            root,
+            PATH_INDEX_EXCLUDE_DIRS,
+            self.content_index.file_changed if self.content_index else None,
+            self.content_index.events_lost if self.content_index else None,
+        )
+        self.path_index.start()
+
+    async def teardown(self) -> None:
+        await super().teardown()
+        if self._walk_executor:
+            self._walk_executor.shutdown(wait=False, cancel_futures=True)
+            self._walk_executor = None
+        if self.path_index:
+            await self.path_index.close()
+            self.path_index = None
+        if self.content_index:
+            await self.content_index.close()
+            self.content_index = None
+
+    def _use_builtin(self, tool: str) -> bool:
+        """Whether to use the built-in walker instead of the `tool` executable."""
+        if self.settings.SEARCH_ENGINE != "auto":
+            return self.settings.SEARCH_ENGINE == "builtin"
+        if tool not in self._installed_tools:
+            self._installed_tools[tool] = shutil.which(tool) is not None
+            if not self._installed_tools[tool]:
+                self.logger.info(f"{tool} is not installed, using the built-in walker.")
+        return not self._installed_tools[tool]
+
+    def _get_walk_executor(self) -> ThreadPoolExecutor:
+        if self._walk_executor is None:
+            self._walk_executor = ThreadPoolExecutor(
+                self.settings.WALK_THREADS, thread_name_prefix="mcp-fswalk"
+            )
+        return self._walk_executor
+
     def _load_and_validate_settings(
         self, host: str, port: int, **kwargs
     ) -> MCPServerFilesystemSettings:
@@ -251,31 +495,135 @@ class MCPServerFilesystem(AbstractMCPServer):
             self.logger.error(f"Error listing files at '{path}': {e}", exc_info=True)
             return f"{ERROR_PREFIX}Could not list directory '{path}': {e}"
 
-    def _find_files_in_current_working_directory(
+    async def _run_path_search(
+        self,
+        cmd: List[str],
+        builtin: BuiltinSearch,
+        description: str,
+        max_results: int,
+        cursor: Optional[str],
+        indexed: Optional[IndexSearch] = None,
+        content_indexed: Optional[BuiltinSearch] = None,
+    ) -> Dict[str, Any]:
+        """
+        Runs fd or rg in `ALLOWED_DIRECTORY`, or `builtin` when the tool is not
+        installed, and returns one page of relative paths. `indexed` answers the search
+        from the path index instead, once it is built; `content_indexed` from the
+        content index, when it can and `builtin` would run otherwise. The content index
+        only narrows the built-in grep, so it must not stand in for rg, whose results
+        differ (rg reads .gitignore files).
+
+        Results are consumed as they are produced and the search is stopped once the
+        page is full, so a broad search costs no more than the results it returns. All
+        engines produce results in a stable order, so cursors address the same results;
+        the orders differ, so a cursor is only valid for the engine that issued it.
+        """
+        max_results = max(1, min(max_results, self.settings.SEARCH_MAX_RESULTS))
+        if indexed and self.path_index and self.path_index.ready:
+            engine = "index"
+        elif self._use_builtin(cmd[0]):
+            engine = "content-index" if content_indexed else "builtin"
+        else:
+            engine = "external"
+        query = cmd if engine == "external" else [engine, *cmd]
+        offset = _decode_cursor(cursor, query) if cursor else 0
+        if engine == "index":
+            assert indexed and self.path_index
+            try:
+                matches, more = await indexed(self.path_index, offset, max_results)
+            except re.error as e:
+                raise ValueError(
+                    f"{ERROR_PREFIX}Invalid regular expression: {e}"
+                ) from e
+        elif engine != "external":
+            search = content_indexed if engine == "content-index" else builtin
+            assert search
+            matches, more = await self._run_builtin_search(
+                cmd[0], search, offset, max_results
+            )
+        else:
+            matches, more = await self._run_external_search(cmd, offset, max_results)
+        next_cursor = _encode_cursor(query, offset + len(matches)) if more else None
+        self.logger.info(
+            f"Returning {len(matches)} {description} from offset {offset}"
+            f"{', more available' if next_cursor else ''}."
+        )
+        return {"matches": matches, "next_cursor": next_cursor}
+
+    async def _run_external_search(
+        self, cmd: List[str], offset: int, max_results: int
+    ) -> Tuple[List[str], bool]:
+        """Exit code 1 of fd and rg means nothing matched."""
+        self.logger.debug(" ".join(cmd))
+        try:
+            result = await self.command_runner.run(
+                cmd,
+                cwd=self.settings.ALLOWED_DIRECTORY,
+                skip_lines=offset,
+                max_lines=max_results,
+            )
+        except FileNotFoundError as exc:
+            self.logger.error(f"{cmd[0]} is not installed or not in PATH.")
+            raise RuntimeError(f"{cmd[0]} is not installed or not in PATH") from exc
+
+        if result.returncode not in (0, 1) and not result.truncated:
+            self.logger.error(
+                f"Error running {cmd[0]} (exit code {result.returncode}): {result.stderr}"
+            )
+            raise RuntimeError(
+                f"{cmd[0]} failed with exit code {result.returncode}: "
+                f"{result.stderr.strip()}"
+            )
+        matches = [str(Path(line)) for line in result.stdout.splitlines()]
+        return matches, result.truncated
+
+    async def _run_builtin_search(
+        self, tool: str, search: BuiltinSearch, offset: int, max_results: int
+    ) -> Tuple[List[str], bool]:
+        executor = self._get_walk_executor()
+
+        def page(cancel: threading.Event) -> List[str]:
+            results = search(executor, cancel)
+            try:
+                return list(itertools.islice(results, offset, offset + max_results + 1))
+            finally:
+                results.close()
+
+        try:
+            found = await self.command_runner.run_in_thread(f"{tool} search", page)
+        except re.error as e:
+            raise ValueError(f"{ERROR_PREFIX}Invalid regular expression: {e}") from e
+        return found[:max_results], len(found) > max_results
+
+    async def _find_files_in_current_working_directory(
         self,
         filename: str,
         exact_match: bool = True,
-    ) -> List[str]:
+        max_results: int = 200,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Search and return all files matching with given filename recursively in cwd. This tool
-        uses `fd` and it's expected as executable in the system.
+        uses `fd` when it is installed and a built-in equivalent otherwise.
 
         Args:
             filename (str): Filename to search.
             exact_match (bool): Specifies if the name should be searched exactly or not.
                 Like patterns: name vs ^name$
 
+            max_results (int): Maximum number of paths to return (the server caps it,
+                at 1000 by default).
+            cursor (Optional[str]): `next_cursor` of a previous call with the same
+                arguments, to get the next page of results.
+
         Returns:
-            A list of paths, each corresponds to relative paths to the current
-            working directory.
+            A dict with "matches", paths relative to the current working directory,
+            and "next_cursor", to pass back for more results, or null when there are
+            no more.
         """
         self.logger.info(f"Searching for filename '{filename}' in project.")
 
-        default_exclude_dirs = [
-            ".venv",
-            "__pycache__",
-            "node_modules",
-        ]
+        default_exclude_dirs = PATH_INDEX_EXCLUDE_DIRS
 
         if exact_match:
             filename_pattern = f"^{filename}$"
@@ -285,53 +633,57 @@ class MCPServerFilesystem(AbstractMCPServer):
         cmd = [
             "fd",  # fd executable
             "-Hi",  # --hidden, --ignore-case
+            "-j1",  # one thread: output order is stable across pages
             "-t",  # type
             "f",  # file
-            *[f"-E {d}" for d in default_exclude_dirs],  # exclude dirs
+            *[arg for d in default_exclude_dirs for arg in ("-E", d)],  # exclude dirs
+            "--",
             filename_pattern,
             ".",
         ]
-        self.logger.debug(" ".join(cmd))
-        try:
-            completed = subprocess.run(cmd, check=True, text=True, capture_output=True)
-            found_matches = [str(Path(line)) for line in completed.stdout.splitlines()]
-            self.logger.info(f"Found {filename} matches: {'\n'.join(found_matches)}.")
-            return found_matches
-        except FileNotFoundError as exc:
-            self.logger.error("fd is not installed or not in PATH.")
-            raise RuntimeError("fd is not installed or not in PATH") from exc
-        except subprocess.CalledProcessError as exc:
-            if exc.returncode == 1:
-                self.logger.info(f"No files found named '{filename}'.")
-                return []
-            self.logger.error(
-                f"Error running ripgrep: {exc}\n{exc.stderr}", exc_info=True
-            )
-            raise
-        except Exception as e:
-            self.logger.error(
-                f"Unexpected error occured while finding file '{filename}': {e}",
-                exc_info=True,
-            )
-            raise
+        return await self._run_path_search(
+            cmd,
+            lambda executor, cancel: find(
+                self.settings.ALLOWED_DIRECTORY,
+                filename_pattern,
+                FILE,
+                default_exclude_dirs,
+                executor=executor,
+                cancel=cancel,
+            ),
+            f"matches for '{filename}'",
+            max_results,
+            cursor,
+            lambda index, offset, limit: index.find(
+                filename, FILE, exact_match, (), offset, limit
+            ),
+        )
 
-    def _find_directories_in_current_working_directory(
+    async def _find_directories_in_current_working_directory(
         self,
         dirname: str,
         exact_match: bool = True,
-    ) -> List[str]:
+        max_results: int = 200,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Search and return all directories matching with given dirname recursively in cwd. This tool
-        uses `fd` and it's expected as executable in the system.
+        uses `fd` when it is installed and a built-in equivalent otherwise.
 
         Args:
             dirname (str): Dirname to search.
             exact_match (bool): Specifies if the name should be searched exactly or not.
                 Like patterns: name vs ^name$
 
+            max_results (int): Maximum number of paths to return (the server caps it,
+                at 1000 by default).
+            cursor (Optional[str]): `next_cursor` of a previous call with the same
+                arguments, to get the next page of results.
+
         Returns:
-            A list of paths, each corresponds to relative paths to the current
-            working directory.
+            A dict with "matches", paths relative to the current working directory,
+            and "next_cursor", to pass back for more results, or null when there are
+            no more.
         """
         self.logger.info(f"Searching for dirname '{dirname}' in project.")
 
@@ -350,83 +702,90 @@ class MCPServerFilesystem(AbstractMCPServer):
         cmd = [
             "fd",  # fd executable
             "-Hi",  # --hidden, --ignore-case
+            "-j1",  # one thread: output order is stable across pages
             "-t",  # type
             "d",  # directory
-            *[f"-E {d}" for d in default_exclude_dirs],  # exclude dirs
+            *[arg for d in default_exclude_dirs for arg in ("-E", d)],  # exclude dirs
+            "--",
             dirname_pattern,
             ".",
         ]
-        self.logger.debug(" ".join(cmd))
-        try:
-            completed = subprocess.run(cmd, check=True, text=True, capture_output=True)
-            found_matches = [str(Path(line)) for line in completed.stdout.splitlines()]
-            self.logger.info(f"Found {dirname} matches: {'\n'.join(found_matches)}.")
-            return found_matches
-        except FileNotFoundError as exc:
-            self.logger.error("fd is not installed or not in PATH.")
-            raise RuntimeError("fd is not installed or not in PATH") from exc
-        except subprocess.CalledProcessError as exc:
-            if exc.returncode == 1:
-                self.logger.info(f"No files found named '{dirname}'.")
-                return []
-            self.logger.error(
-                f"Error running ripgrep: {exc}\n{exc.stderr}", exc_info=True
-            )
-            raise
-        except Exception as e:
-            self.logger.error(
-                f"Unexpected error occured while finding file '{dirname}': {e}",
-                exc_info=True,
-            )
-            raise
+        return await self._run_path_search(
+            cmd,
+            lambda executor, cancel: find(
+                self.settings.ALLOWED_DIRECTORY,
+                dirname_pattern,
+                DIRECTORY,
+                default_exclude_dirs,
+                executor=executor,
+                cancel=cancel,
+            ),
+            f"matches for '{dirname}'",
+            max_results,
+            cursor,
+            lambda index, offset, limit: index.find(
+                dirname, DIRECTORY, exact_match, default_exclude_dirs, offset, limit
+            ),
+        )
 
-    def _grep_text_in_current_working_directory(
+    async def _grep_text_in_current_working_directory(
         self,
         text: str,
-    ):
+        max_results: int = 200,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Search and return all files matching with given text. This tool
-        uses `rg` and it's expected as executable in the system.
+        uses `rg` when it is installed and a built-in equivalent otherwise.
 
         Args:
             text (str): Text pattern to search.
 
+            max_results (int): Maximum number of paths to return (the server caps it,
+                at 1000 by default).
+            cursor (Optional[str]): `next_cursor` of a previous call with the same
+                arguments, to get the next page of results.
+
         Returns:
-            A list of paths, each corresponds to relative paths to the current
-            working directory.
+            A dict with "matches", paths relative to the current working directory,
+            and "next_cursor", to pass back for more results, or null when there are
+            no more.
         """
         self.logger.info(f"Searching for text '{text}' in project files.")
+
+        # The content index is built without these too, so every engine agrees
+        default_exclude_dirs = PATH_INDEX_EXCLUDE_DIRS
+
         cmd = [
             "rg",
             "-il",
+            "--sort=path",  # stable order across pages
+            *[arg for d in default_exclude_dirs for arg in ("-g", f"!{d}")],  # exclude
+            "--",
             text,
-            str(Path(self.settings.ALLOWED_DIRECTORY).expanduser()),
+            ".",
         ]
-        try:
-            completed = subprocess.run(cmd, check=True, text=True, capture_output=True)
-            found_files = [str(Path(line)) for line in completed.stdout.splitlines()]
-            self.logger.info(
-                f"Found {len(found_files)} files containing text '{text}'."
-            )
-            return found_files
-        except FileNotFoundError as exc:
-            self.logger.error("ripgrep (rg) is not installed or not in PATH.")
-            raise RuntimeError("ripgrep (rg) is not installed or not in PATH") from exc
-        except subprocess.CalledProcessError as exc:
-            if exc.returncode == 1:
-                self.logger.info(f"No files found containing text '{text}'.")
-                return []
-            self.logger.error(
-                f"Error running ripgrep: {exc}\n{exc.stderr}", exc_info=True
-            )
-            raise
-        except Exception as e:
-            self.logger.error(
-                f"Unexpected error searching for text '{text}': {e}", exc_info=True
-            )
-            raise
+        content_index = self.content_index
+        return await self._run_path_search(
+            cmd,
+            lambda executor, cancel: grep(
+                self.settings.ALLOWED_DIRECTORY,
+                text,
+                default_exclude_dirs,
+                executor=executor,
+                cancel=cancel,
+            ),
+            f"files containing text '{text}'",
+            max_results,
+            cursor,
+            content_indexed=(
+                (lambda executor, cancel: content_index.grep(text, executor, cancel))
+                if content_index and content_index.covers(text)
+                else None
+            ),
+        )
 
-    def _get_directory_tree(
+    async def _get_directory_tree(
         self,
         exclude_dirs: List[str] = [],
         max_depth: int = 4,
@@ -459,41 +818,69 @@ class MCPServerFilesystem(AbstractMCPServer):
             "__pycache__",
             "node_modules",
         ]
-        exclude_dirs.extend(default_exclude_dirs)
+        exclude_dirs = [*exclude_dirs, *default_exclude_dirs]
 
         if max_depth > 10:
             msg = "max_depth > 10 is not allowed."
             self.logger.warning(msg)
             raise ValueError(msg)
 
-        command = ["tree"]
-        if exclude_dirs:
-            # Join exclusion patterns with | for regex
-            exclude_pattern = "|".join(exclude_dirs)
-            command.extend(["-I", exclude_pattern])
-        if max_depth:
-            command.extend(["-L", str(max_depth)])
+        if self._use_builtin("tree"):
+            executor = self._get_walk_executor()
+            try:
+                output, truncated = await self.command_runner.run_in_thread(
+                    "tree",
+                    lambda cancel: render_tree(
+                        self.settings.ALLOWED_DIRECTORY,
+                        exclude_dirs,
+                        max_depth,
+                        self.command_runner.max_output_bytes,
+                        executor,
+                        cancel,
+                    ),
+                )
+            except MCPCommandTimeoutError as e:
+                return f"{ERROR_PREFIX}{e}"
+        else:
+            command = ["tree"]
+            if exclude_dirs:
+                # Join exclusion patterns with | for regex
+                exclude_pattern = "|".join(exclude_dirs)
+                command.extend(["-I", exclude_pattern])
+            if max_depth:
+                command.extend(["-L", str(max_depth)])
+
+            command.extend([str(self.settings.ALLOWED_DIRECTORY)])
 
-        command.extend([str(self.settings.ALLOWED_DIRECTORY)])
+            try:
+                self.logger.info(f"Executing: {' '.join(command)}")
+                result = await self.command_runner.run(command)
+            except FileNotFoundError:
+                self.logger.error("'tree' command not found.")
+                return "Error: 'tree' command not found. Please install it."
+            except MCPCommandTimeoutError as e:
+                return f"{ERROR_PREFIX}{e}"
+            except Exception as e:
+                self.logger.error(
+                    f"Unexpected error getting directory tree: {e}", exc_info=True
+                )
+                raise
 
-        try:
-            self.logger.info(f"Executing: {' '.join(command)}")
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            self.logger.debug("Directory tree command executed successfully.")
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            self.logger.error(
-                f"Error running tree command: {e}\n{e.stderr}", exc_info=True
-            )
-            return f"Error running tree command: {e}\n{e.stderr}"
-        except FileNotFoundError:
-            self.logger.error("'tree' command not found.")
-            return "Error: 'tree' command not found. Please install it."
-        except Exception as e:
-            self.logger.error(
-                f"Unexpected error getting directory tree: {e}", exc_info=True
+            if result.returncode != 0 and not result.truncated:
+                self.logger.error(
+                    f"Error running tree command (exit code {result.returncode}): {result.stderr}"
+                )
+                return f"Error running tree command (exit code {result.returncode}): {result.stderr}"
+            output, truncated = result.stdout, result.truncated
+
+        self.logger.debug("Directory tree built successfully.")
+        if truncated:
+            return (
+                f"{output}\n[Output truncated at "
+                f"{self.command_runner.max_output_bytes} bytes. Lower max_depth or "
+                "exclude more directories.]"
             )
-            raise
+        return output
 
     async def _read_file(self, path: str) -> str:
         """
@@ -0,0 +1,377 @@
+import os
+import re
+import fnmatch
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+DEFAULT_WALK_THREADS = 8
+PREFETCH_PER_DIRECTORY = 16  # subdirectory listings requested ahead of the walk
+# Files are searched in batches (one task per file costs more than a small file's
+# search), up to GREP_WINDOW batches ahead of the results being consumed
+GREP_BATCH = 32
+GREP_WINDOW = 16
+BINARY_SNIFF_BYTES = 8192  # like rg, files with a NUL byte here are skipped
+READ_BLOCK_SIZE = 1024 * 1024
+
+FILE = "f"
+DIRECTORY = "d"
+SYMLINK = "l"
+OTHER = "o"
+
+# (name, kind), sorted by name
+Listing = List[Tuple[str, str]]
+
+
+class WalkEntry:
+    """One entry found by `walk`. `path` is relative to the walked root."""
+
+    __slots__ = ("path", "name", "depth", "kind", "is_last")
+
+    def __init__(self, path: str, name: str, depth: int, kind: str, is_last: bool):
+        self.path = path
+        self.name = name
+        self.depth = depth  # 1 for entries of the root
+        self.kind = kind
+        self.is_last = is_last  # last entry of its directory
+
+
+def compile_excludes(exclude: Sequence[str]) -> Optional[Pattern[str]]:
+    """Glob patterns matched against entry names, like fd's -E and tree's -I."""
+    if not exclude:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in exclude))
+
+
+def _scan(path: str, include_hidden: bool, exclude: Optional[Pattern[str]]) -> Listing:
+    """
+    Lists one directory. Entry types come from the directory entry itself (d_type),
+    so no entry is stat()ed. Unreadable directories are listed as empty.
+    """
+    listing: Listing = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not include_hidden and name.startswith("."):
+                    continue
+                if exclude is not None and exclude.match(name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        kind = DIRECTORY
+                    elif entry.is_file(follow_symlinks=False):
+                        kind = FILE
+                    elif entry.is_symlink():
+                        kind = SYMLINK
+                    else:
+                        kind = OTHER
+                except OSError:
+                    kind = OTHER
+                listing.append((name, kind))
+    except OSError:
+        return []
+    listing.sort()
+    return listing
+
+
+class _Frame:
+    """A directory being walked: its listing, read position and prefetched subdirectories."""
+
+    __slots__ = ("path", "depth", "listing", "index", "prefetch_index", "pending")
+
+    def __init__(self, path: str, depth: int, listing: Listing):
+        self.path = path
+        self.depth = depth
+        self.listing = listing
+        self.index = 0
+        self.prefetch_index = 0
+        self.pending: Dict[int, Future] = {}
+
+
+def walk(
+    root: Union[str, Path],
+    exclude: Sequence[str] = (),
+    include_hidden: bool = True,
+    max_depth: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[WalkEntry]:
+    """
+    Yields every entry under `root` depth-first, each directory's entries sorted by
+    name, so the order is the same on every run over an unchanged tree. Symlinks are
+    reported but not followed.
+
+    The walk itself is sequential, but directory listings are requested ahead of it on
+    `executor` (up to 16 subdirectories per open directory), so several directories
+    are read at once while the caller consumes entries. `scandir` releases the GIL
+    while it waits on the filesystem, which is where a cold or network-backed tree
+    spends its time. Stops early once `cancel` is set.
+    """
+    root_path = os.fspath(root)
+    exclude_pattern = compile_excludes(exclude)
+    own_executor = executor is None
+    pool = executor or ThreadPoolExecutor(
+        DEFAULT_WALK_THREADS, thread_name_prefix="mcp-fswalk"
+    )
+
+    def scan(path: str) -> Listing:
+        return _scan(
+            os.path.join(root_path, path) if path else root_path,
+            include_hidden,
+            exclude_pattern,
+        )
+
+    stack = [_Frame("", 0, scan(""))]
+    try:
+        while stack:
+            if cancel is not None and cancel.is_set():
+                return
+            frame = stack[-1]
+            if frame.index >= len(frame.listing):
+                stack.pop()
+                continue
+
+            child_depth = frame.depth + 1
+            descend = max_depth is None or child_depth < max_depth
+            if descend:
+                _prefetch(frame, pool, scan)
+
+            index = frame.index
+            name, kind = frame.listing[index]
+            frame.index += 1
+            path = os.path.join(frame.path, name) if frame.path else name
+            yield WalkEntry(
+                path, name, child_depth, kind, frame.index == len(frame.listing)
+            )
+
+            if kind == DIRECTORY and descend:
+                future = frame.pending.pop(index, None)
+                listing = future.result() if future else scan(path)
+                stack.append(_Frame(path, child_depth, listing))
+    finally:
+        for frame in stack:
+            for future in frame.pending.values():
+                future.cancel()
+        if own_executor:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _prefetch(frame: _Frame, pool: Executor, scan) -> None:
+    start = max(frame.prefetch_index, frame.index)
+    while len(frame.pending) < PREFETCH_PER_DIRECTORY and start < len(frame.listing):
+        name, kind = frame.listing[start]
+        if kind == DIRECTORY:
+            path = os.path.join(frame.path, name) if frame.path else name
+            frame.pending[start] = pool.submit(scan, path)
+        start += 1
+    frame.prefetch_index = start
+
+
+def find(
+    root: Union[str, Path],
+    pattern: str,
+    kind: str,
+    exclude: Sequence[str] = (),
+    include_hidden: bool = True,
+    ignore_case: bool = True,
+    executor: Optional[Executor] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """
+    Yields paths (relative to `root`) of entries of the given kind whose name matches
+    the regex `pattern`, like `fd [-i] -t <kind> <pattern>`.
+
+    Raises:
+        re.error: If `pattern` is not a valid regular expression.
+    """
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    for entry in walk(root, exclude, include_hidden, None, executor, cancel):
+        if entry.kind == kind and regex.search(entry.name):
+            yield entry.path
+
+
+def _decode(data: bytes) -> str:
+    # Invalid UTF-8 becomes lone surrogates instead of failing the search
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _file_contains(path: str, regex: Pattern[str]) -> bool:
+    """
+    Searches the file in blocks that end at a line break, so memory stays bounded by the
+    block size. As with rg, a match has to lie within one line. Blocks are decoded
+    before the search, so case is ignored beyond ASCII too; a line break never falls
+    inside a UTF-8 sequence, so no character is split between blocks.
+    """
+    try:
+        with open(path, "rb") as f:
+            block = f.read(BINARY_SNIFF_BYTES)
+            if b"\0" in block:
+                return False
+            if len(block) < BINARY_SNIFF_BYTES:  # the whole file
+                return regex.search(_decode(block)) is not None
+            carry = b""
+            while block:
+                block = carry + block
+                end = block.rfind(b"\n") + 1
+                if end == 0:  # no line break yet: keep reading the line
+                    carry = block
+                else:
+                    if regex.search(_decode(block[:end])):
+                        return True
+                    carry = block[end:]
+                block = f.read(READ_BLOCK_SIZE)
+            return bool(carry) and regex.search(_decode(carry)) is not None
+    except OSError:
+        return False
+
+
+def grep(
+    root: Union[str, Path],
+    pattern: str,
+    exclude: Sequence[str] = (),
+    include_hidden: bool = False,
+    ignore_case: bool = True,
+    executor: Optional[Executor] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """
+    Yields paths (relative to `root`) of files whose content matches the regex
+    `pattern`, in walk order, like `rg [-i] -l <pattern>`. `^` and `$` match at line
+    boundaries. Binary files are skipped. Files are searched on `executor`, a few
+    hundred ahead of the consumer.
+
+    Raises:
+        re.error: If `pattern` is not a valid regular expression.
+    """
+    regex = compile_grep_pattern(pattern, ignore_case)
+    own_executor = executor is None
+    pool = executor or ThreadPoolExecutor(
+        DEFAULT_WALK_THREADS, thread_name_prefix="mcp-fswalk"
+    )
+    try:
+        files = (
+            entry.path
+            for entry in walk(root, exclude, include_hidden, None, pool, cancel)
+            if entry.kind == FILE
+        )
+        yield from search_files(root, files, regex, pool, cancel)
+    finally:
+        if own_executor:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def compile_grep_pattern(pattern: str, ignore_case: bool = True) -> Pattern[str]:
+    """
+    `pattern` as `_file_contains` searches it: over decoded text, so that, like
+    `rg -i`, case is ignored for every Unicode letter and not only ASCII.
+    """
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(pattern, flags)
+
+
+def search_files(
+    root: Union[str, Path],
+    paths: Iterable[str],
+    regex: Pattern[str],
+    executor: Executor,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """
+    Yields those of `paths` (relative to `root`) whose file content matches `regex`,
+    in the order given. Files are searched on `executor` in batches, up to
+    GREP_WINDOW batches ahead of the consumer.
+    """
+    root_path = os.fspath(root)
+    window: Deque[Tuple[List[str], Future]] = deque()
+
+    def search(batch: List[str]) -> List[bool]:
+        return [_file_contains(os.path.join(root_path, p), regex) for p in batch]
+
+    def submit(batch: List[str]) -> None:
+        window.append((batch, executor.submit(search, batch)))
+
+    def matches() -> Iterator[str]:
+        batch, future = window.popleft()
+        for path, found in zip(batch, future.result()):
+            if found:
+                yield path
+
+    batch: List[str] = []
+    try:
+        for path in paths:
+            if cancel is not None and cancel.is_set():
+                return
+            batch.append(path)
+            if len(batch) == GREP_BATCH:
+                submit(batch)
+                batch = []
+                if len(window) >= GREP_WINDOW:
+                    yield from matches()
+        if batch:
+            submit(batch)
+        while window:
+            if cancel is not None and cancel.is_set():
+                return
+            yield from matches()
+    finally:
+        for _, future in window:
+            future.cancel()
+
+
+def render_tree(
+    root: Union[str, Path],
+    exclude: Sequence[str] = (),
+    max_depth: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[str, bool]:
+    """
+    Renders the directory tree in the format of `tree -L <max_depth> -I <exclude>`:
+    hidden entries are left out and a directory/file count closes the output.
+    Returns the text and whether it was cut off at `max_bytes`.
+    """
+    root_path = os.fspath(root)
+    lines = [root_path]
+    size = len(root_path)
+    prefixes: List[str] = []  # one per ancestor: "│   " or "    "
+    directories = files = 0
+    for entry in walk(root, exclude, False, max_depth, executor, cancel):
+        del prefixes[entry.depth - 1 :]
+        name = entry.name
+        if entry.kind == SYMLINK:
+            try:
+                name = f"{name} -> {os.readlink(os.path.join(root_path, entry.path))}"
+            except OSError:
+                pass
+        line = f"{''.join(prefixes)}{'└── ' if entry.is_last else '├── '}{name}"
+        size += len(line.encode("utf-8")) + 1
+        if max_bytes is not None and size > max_bytes:
+            return "\n".join(lines) + "\n", True
+        lines.append(line)
+        prefixes.append("    " if entry.is_last else "│   ")
+        if entry.kind == DIRECTORY:
+            directories += 1
+        else:
+            files += 1
+
+    lines.append("")
+    lines.append(
+        f"{directories} director{'y' if directories == 1 else 'ies'}, "
+        f"{files} file{'' if files == 1 else 's'}"
+    )
+    return "\n".join(lines) + "\n", False
@@ -1,8 +1,16 @@
 import os
 import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import random
 import logging
-from typing import Optional, Dict, Union
+import threading
+from typing import Optional, Dict, List, Tuple, Union
 import logging.config
+import logging.handlers
 
 from colorama import Fore, Style, init as colorama_init
 
@@ -109,8 +117,10 @@ class ColoredFormatter(logging.Formatter):
         exc_text = ""
         if record.exc_info:
             exc_text = self.formatException(record.exc_info)
-            if exc_text:
-                exc_text = f"\n{exc_text}"
+        elif record.exc_text:  # Pre-rendered by _QueueHandler
+            exc_text = record.exc_text
+        if exc_text:
+            exc_text = f"\n{exc_text}"
 
         # Construct the formatted log message based on desired structure
         formatted_message = f"[{colored_level}] - {colored_name} - {colored_timestamp}: {message}{exc_text}"
@@ -118,6 +128,208 @@ class ColoredFormatter(logging.Formatter):
         return formatted_message
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects for log shippers.
+
+    Fields: ts (ISO 8601, UTC, milliseconds), level, logger, message, process,
+    thread and, when present, exc_info.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limits repetitive log lines per call site (logger name, file and line).
+
+    Each call site may emit `rate_per_second` lines per second with bursts up to
+    `burst`; excess lines are dropped, except a `sample_ratio` fraction that is
+    let through. The next line that passes reports how many were suppressed.
+    Records above `max_level` (WARNING and up by default) are never limited.
+    A `rate_per_second` of 0 disables limiting.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = 0.0,
+        burst: int = 100,
+        sample_ratio: float = 0.0,
+        max_level: int = logging.INFO,
+    ):
+        super().__init__()
+        self.configure(rate_per_second, burst, sample_ratio)
+        self.max_level = max_level
+        self._buckets: Dict[Tuple[str, str, int], List[float]] = {}
+        self._lock = threading.Lock()
+        # The console and file handlers share this filter; a record reaching the
+        # second handler gets the first handler's verdict instead of a second token
+        self._last_record: Optional[logging.LogRecord] = None
+        self._last_verdict: Union[bool, logging.LogRecord] = True
+
+    def configure(self, rate_per_second: float, burst: int, sample_ratio: float):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.sample_ratio = sample_ratio
+
+    def filter(self, record: logging.LogRecord) -> Union[bool, logging.LogRecord]:
+        if self.rate_per_second <= 0 or record.levelno > self.max_level:
+            return True
+
+        with self._lock:
+            if record is not self._last_record:
+                self._last_record = record
+                self._last_verdict = self._check(record)
+            return self._last_verdict
+
+    def _check(self, record: logging.LogRecord) -> Union[bool, logging.LogRecord]:
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        # [tokens, updated_at, suppressed]
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        bucket[0] = min(
+            self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_second
+        )
+        bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+        elif self.sample_ratio <= 0 or random.random() >= self.sample_ratio:
+            bucket[2] += 1
+            return False
+        suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            # Other handlers and loggers see the original record: annotate a copy
+            record = copy.copy(record)
+            record.msg = (
+                f"{record.getMessage()} [{suppressed} similar messages suppressed]"
+            )
+            record.args = None
+            return record
+        return True
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# All console output is formatted and written by one background thread; callers only
+# enqueue records, so a slow terminal or pipe cannot stall the event loop.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_console_handler = logging.StreamHandler(sys.stdout)
+_queue_listener = logging.handlers.QueueListener(
+    _log_queue, _console_handler, respect_handler_level=True
+)
+_rate_limit_filter = RateLimitFilter()
+_file_listeners: Dict[str, logging.handlers.QueueListener] = {}
+_running_listeners: List[logging.handlers.QueueListener] = []
+_paused_listeners: List[logging.handlers.QueueListener] = []
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records with the message and traceback rendered but kept apart, so the
+    listener's formatter (text or JSON) still decides how to lay out the traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_traceback_formatter = logging.Formatter()
+
+
+def _make_queue_handler(log_queue: "queue.SimpleQueue") -> logging.Handler:
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(_rate_limit_filter)
+    return handler
+
+
+def console_queue_handler() -> logging.Handler:
+    """Handler factory used by LOGGING_CONFIG and `MCPServersLogger.get_logger`."""
+    return _make_queue_handler(_log_queue)
+
+
+def configure_logging() -> None:
+    """
+    Applies logging options from the environment. Called at import and again once the
+    .env file is loaded (see `mcp_servers.load_env_vars`).
+
+    Environment variables:
+        MCP_SERVERS_LOG_FORMAT: "text" (colored, default) or "json" (one object per line).
+        MCP_SERVERS_LOG_RATE_LIMIT: Lines per second allowed per call site at INFO and
+            below; 0 disables rate limiting. Default: 0.
+        MCP_SERVERS_LOG_RATE_BURST: Burst size per call site. Default: 100.
+        MCP_SERVERS_LOG_SAMPLE_RATIO: Fraction of rate-limited lines still emitted.
+            Default: 0.01.
+    """
+    if os.environ.get("MCP_SERVERS_LOG_FORMAT", "text").lower() == "json":
+        _console_handler.setFormatter(JsonLinesFormatter())
+    else:
+        _console_handler.setFormatter(ColoredFormatter())
+    _rate_limit_filter.configure(
+        rate_per_second=_env_float("MCP_SERVERS_LOG_RATE_LIMIT", 0.0),
+        burst=int(_env_float("MCP_SERVERS_LOG_RATE_BURST", 100)),
+        sample_ratio=_env_float("MCP_SERVERS_LOG_SAMPLE_RATIO", 0.01),
+    )
+
+
+def _start_listener(listener: logging.handlers.QueueListener) -> None:
+    listener.start()
+    _running_listeners.append(listener)
+
+
+def _stop_listeners() -> None:
+    """Flushes queued records and stops the writer threads."""
+    while _running_listeners:
+        listener = _running_listeners.pop()
+        listener.stop()
+        _paused_listeners.append(listener)
+
+
+def _resume_listeners() -> None:
+    """Restarts the writer threads stopped by `_stop_listeners` before a fork."""
+    while _paused_listeners:
+        _start_listener(_paused_listeners.pop())
+
+
+configure_logging()
+_start_listener(_queue_listener)
+atexit.register(_stop_listeners)
+# Writer threads do not survive fork (e.g. `mcpserver start --detach`), and forking
+# while one holds a lock can deadlock the child: drain and stop them around fork.
+os.register_at_fork(
+    before=_stop_listeners,
+    after_in_parent=_resume_listeners,
+    after_in_child=_resume_listeners,
+)
+
+
 class UvicornAccessFilter(logging.Filter):
     def filter(self, record):
         message = record.getMessage()
@@ -161,8 +373,7 @@ LOGGING_CONFIG = {
     },
     "handlers": {
         "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "colored",
+            "()": console_queue_handler,
             "level": "DEBUG",
         },
     },
@@ -238,21 +449,28 @@ class MCPServersLogger:
         # Clear any existing handlers to prevent duplication and allow reconfiguration
         log.handlers.clear()
 
-        # Console Handler with ColoredFormatter
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(ColoredFormatter())
-        log.addHandler(console_handler)
+        # Console output goes through the shared queue and background writer thread
+        log.addHandler(console_queue_handler())
 
-        # Optional File Handler
+        # Optional File Handler, also written from a background thread
         if log_file:
             try:
-                file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
-                # For files, a more detailed, non-colored format is often preferred.
-                file_formatter = logging.Formatter(
-                    "%(asctime)s - %(name)s - [%(levelname)s] - %(message)s (%(filename)s:%(lineno)d)"
-                )
-                file_handler.setFormatter(file_formatter)
-                log.addHandler(file_handler)
+                listener = _file_listeners.get(log_file)
+                if listener is None:
+                    file_handler = logging.FileHandler(
+                        log_file, mode="a", encoding="utf-8"
+                    )
+                    # For files, a more detailed, non-colored format is often preferred.
+                    file_formatter = logging.Formatter(
+                        "%(asctime)s - %(name)s - [%(levelname)s] - %(message)s (%(filename)s:%(lineno)d)"
+                    )
+                    file_handler.setFormatter(file_formatter)
+                    listener = logging.handlers.QueueListener(
+                        queue.SimpleQueue(), file_handler
+                    )
+                    _start_listener(listener)
+                    _file_listeners[log_file] = listener
+                log.addHandler(_make_queue_handler(listener.queue))  # type: ignore[arg-type]
             except Exception as e:
                 log.error(
                     f"Failed to set up file handler for logger '{logger_name}' at '{log_file}': {e}",
@@ -0,0 +1,315 @@
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds) covering local filesystem calls up to slow upstream crawls
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+
+
+class MetricFamily:
+    """A named metric with its samples, as produced by collectors at scrape time."""
+
+    def __init__(self, name: str, type_: str, help_: str):
+        self.name = name
+        self.type = type_
+        self.help = help_
+        self.samples: List[Sample] = []
+
+    def add(self, labels: Dict[str, str], value: float, suffix: str = "") -> None:
+        self.samples.append((suffix, labels, value))
+
+
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, help_: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+
+    def labels(self, *values: str):
+        """
+        Returns the child for the given label values, creating it on first use.
+        Hot paths should keep the returned child instead of calling this per event.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}."
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """A new child holding the samples of one set of label values."""
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            for suffix, extra_labels, value in child.samples():  # type: ignore[attr-defined]
+                family.add({**labels, **extra_labels}, value, suffix)
+        return family
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def samples(self) -> Iterable[Sample]:
+        yield ("_total", {}, self.value)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value. Exposed with a `_total` suffix."""
+
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def samples(self) -> Iterable[Sample]:
+        yield ("", {}, self.value)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> Iterable[Sample]:
+        cumulative = 0
+        for upper_bound, count in zip(self.upper_bounds, self.counts):
+            cumulative += count
+            yield ("_bucket", {"le": _format_value(upper_bound)}, cumulative)
+        yield ("_bucket", {"le": "+Inf"}, self.count)
+        yield ("_sum", {}, self.sum)
+        yield ("_count", {}, self.count)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text exposition format.
+
+    Instruments are plain Python objects updated from the event loop without locks;
+    values derived from existing state (cache stats, breaker state, queue depth) are
+    read by collectors only when `/metrics` is scraped.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_: str, labelnames: Sequence[str] = ()):
+        return self.register(Counter(name, help_, labelnames))
+
+    def gauge(self, name: str, help_: str, labelnames: Sequence[str] = ()):
+        return self.register(Gauge(name, help_, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        return self.register(Histogram(name, help_, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Collector) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        families: Dict[str, MetricFamily] = {}
+        for metric in self._metrics.values():
+            families[metric.name] = metric.collect()
+        for collector in list(self._collectors):
+            for family in collector():
+                merged = families.get(family.name)
+                if merged is None:
+                    families[family.name] = family
+                else:
+                    merged.samples.extend(family.samples)
+        return list(families.values())
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self.collect():
+            if not family.samples:
+                continue
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for suffix, labels, value in family.samples:
+                lines.append(
+                    f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+                )
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{key}="{_escape_label(str(value))}"' for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: Optional[float]) -> str:
+    if value is None or math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALLS = REGISTRY.counter(
+    "mcp_tool_calls",
+    "Tool calls by outcome (ok, error, rejected).",
+    ["server", "tool", "outcome"],
+)
+TOOL_CALL_DURATION = REGISTRY.histogram(
+    "mcp_tool_call_duration_seconds",
+    "Tool call latency, including admission queue time.",
+    ["server", "tool"],
+)
+TOOL_CALLS_IN_FLIGHT = REGISTRY.gauge(
+    "mcp_tool_calls_in_flight", "Tool calls currently running.", ["server", "tool"]
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "mcp_upstream_responses",
+    "Upstream HTTP attempts by status code ('error' for network failures).",
+    ["server", "endpoint", "status"],
+)
+UPSTREAM_REQUEST_DURATION = REGISTRY.histogram(
+    "mcp_upstream_request_duration_seconds",
+    "Latency of completed upstream HTTP attempts.",
+    ["server", "endpoint"],
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "mcp_upstream_retries", "Upstream request retries.", ["server", "endpoint"]
+)
+UPSTREAM_HEDGES = REGISTRY.counter(
+    "mcp_upstream_hedged_requests",
+    "Hedged upstream requests sent.",
+    ["server", "endpoint"],
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "mcp_rate_limit_wait_seconds",
+    "Time spent waiting for a client-side rate limit token.",
+    ["server", "endpoint"],
+)
+RATE_LIMIT_REJECTIONS = REGISTRY.counter(
+    "mcp_rate_limit_rejections",
+    "Requests rejected by the client-side rate limiter.",
+    ["server", "endpoint"],
+)
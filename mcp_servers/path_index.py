@@ -0,0 +1,590 @@
+import os
+import re
+import sys
+import stat
+import time
+import ctypes
+import errno
+import struct
+import asyncio
+import logging
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from mcp_servers.fswalk import DIRECTORY, FILE, OTHER, SYMLINK, compile_excludes
+from mcp_servers.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+UPDATE_LAG = REGISTRY.histogram(
+    "mcp_path_index_update_lag_seconds",
+    "Delay between reading a batch of filesystem events and the path index "
+    "reflecting it.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+).labels()
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_CREATE
+    | IN_DELETE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+READ_SIZE = 1024 * 1024
+
+ROOT = 0
+NONE = -1
+KINDS = (FILE, DIRECTORY, SYMLINK, OTHER)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+# Exact-name lookups go through the name table unless the name has regex syntax;
+# a "." is taken literally
+_REGEX_SYNTAX = re.compile(r"[\\^$*+?{}\[\]|()]")
+
+
+class Inotify:
+    """Minimal ctypes binding of the Linux inotify API, non-blocking."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    @staticmethod
+    def supported() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(ctypes.CDLL(None), "inotify_init1")
+        except OSError:
+            return False
+
+    def add_watch(self, path: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)  # fails only for watches already gone
+
+    def read(self) -> bytes:
+        """Pending events, or b"" when there are none."""
+        try:
+            return os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return b""
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def parse_events(data: bytes) -> List[Tuple[int, int, int, str]]:
+    """Splits a read of the inotify descriptor into (wd, mask, cookie, name)."""
+    events = []
+    offset = 0
+    while offset < len(data):
+        wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+        offset += length
+        events.append((wd, mask, cookie, name))
+    return events
+
+
+class PathIndex:
+    """
+    Every path under `root`, held in memory and kept current from inotify events, so
+    name searches do not walk the tree.
+
+    Paths are stored as a tree of nodes in flat arrays (parent, name, kind, child and
+    sibling links); names are interned, so a name shared by thousands of files is
+    stored once. A table from lowercased name to nodes answers exact-name lookups
+    directly, and regex lookups match each distinct name once.
+
+    All reads and writes of the index run on one thread, in order: the initial build,
+    the inotify events read on the event loop, and queries. Events that arrive during
+    the build are applied after it. Each directory is watched before it is listed, so
+    nothing created during the build is missed; applying an event twice is harmless.
+
+    If the index cannot be kept current (the inotify watch limit is reached, the
+    event queue overflowed, the root was removed) it is marked not ready, and searches
+    fall back to walking the tree. A queue overflow triggers a rebuild.
+
+    `on_file_change(path, exists)` is called on the index thread for every regular
+    file created, written, moved or removed after the build, with its path relative
+    to `root`; `on_events_lost()` after a queue overflow, when changes may have been
+    missed.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        exclude: Sequence[str] = (),
+        on_file_change: Optional[Callable[[str, bool], None]] = None,
+        on_events_lost: Optional[Callable[[], None]] = None,
+    ):
+        self.root = os.fspath(root)
+        self._exclude = compile_excludes(exclude)
+        self._on_file_change = on_file_change
+        self._on_events_lost = on_events_lost
+        self.ready = False
+        self.closing = False
+        self.entries = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+        self._inotify: Optional[Inotify] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="mcp-path-index")
+        self._reset()
+
+    def _reset(self) -> None:
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._name_bytes = 0
+        self._parent = array("q")
+        self._name = array("q")
+        self._kind = bytearray()
+        self._first_child = array("q")
+        self._next_sibling = array("q")
+        self._prev_sibling = array("q")
+        self._free: List[int] = []
+        # (parent << 32 | name id) -> node
+        self._children: Dict[int, int] = {}
+        # lowercased name id -> node, or list of nodes when the name is shared
+        self._by_name: Dict[int, Union[int, List[int]]] = {}
+        self._wd_node: Dict[int, int] = {}
+        self._node_wd: Dict[int, int] = {}
+        self.entries = 0
+        self._new_node(NONE, self._intern(""), DIRECTORY)  # the root
+
+    # Lifecycle, on the event loop
+
+    def start(self) -> None:
+        """Starts watching and builds the index in the background."""
+        self._loop = asyncio.get_running_loop()
+        self._inotify = Inotify()
+        self._loop.add_reader(self._inotify.fd, self._on_events)
+        self._submit(self._build)
+
+    async def close(self) -> None:
+        self.ready = False
+        self.closing = True  # stops a build in progress
+        if self._inotify is not None:
+            if self._loop is not None:
+                self._loop.remove_reader(self._inotify.fd)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            await asyncio.to_thread(self._executor.shutdown)
+            self._inotify.close()
+            self._inotify = None
+
+    def _on_events(self) -> None:
+        assert self._inotify is not None
+        data = self._inotify.read()
+        if data:
+            self._submit(self._apply, data, time.monotonic())
+
+    def _submit(self, fn: Callable[..., None], *args: Any) -> None:
+        self._executor.submit(fn, *args).add_done_callback(_log_failure)
+
+    async def find(
+        self,
+        pattern: str,
+        kind: str,
+        exact: bool = False,
+        exclude: Sequence[str] = (),
+        offset: int = 0,
+        limit: int = 200,
+    ) -> Tuple[List[str], bool]:
+        """
+        Paths (relative to `root`) of entries of `kind` whose name matches `pattern`,
+        ignoring case: the whole name if `exact`, else the regex `pattern` anywhere in
+        it. Entries under a directory matching an `exclude` glob are left out. Returns
+        results `offset` to `offset + limit`, in a stable order while the tree does not
+        change, and whether more are available.
+
+        Raises:
+            re.error: If `pattern` is not a valid regular expression.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._find, pattern, kind, exact, exclude, offset, limit
+        )
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the index: arrays, tables and the objects they hold."""
+        arrays = (
+            self._parent,
+            self._name,
+            self._first_child,
+            self._next_sibling,
+            self._prev_sibling,
+        )
+        shared = len(self._children) - len(self._by_name)  # nodes in lists, roughly
+        return (
+            sum(sys.getsizeof(a) for a in arrays)
+            + sys.getsizeof(self._kind)
+            + sys.getsizeof(self._names)
+            + sys.getsizeof(self._name_ids)
+            + self._name_bytes
+            + sys.getsizeof(self._children)
+            + sys.getsizeof(self._by_name)
+            + 64 * len(self._children)  # int keys and values
+            + 32 * len(self._by_name)
+            + 8 * max(shared, 0)
+            + 8 * len(self._free)
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "entries": self.entries,
+            "names": len(self._names),
+            "watches": len(self._wd_node),
+            "memory_bytes": self.memory_bytes(),
+            "builds": self.builds,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+    # Index thread
+
+    def _build(self) -> None:
+        assert self._inotify is not None
+        started_at = time.perf_counter()
+        for wd in self._wd_node:
+            self._inotify.rm_watch(wd)
+        self._reset()
+        self.ready = self._add_tree(ROOT, self.root) and not self.closing
+        if self.closing:
+            return
+        self.builds += 1
+        self.build_seconds = time.perf_counter() - started_at
+        logger.info(
+            f"Indexed {self.entries} paths under {self.root} in "
+            f"{self.build_seconds:.1f}s ({self.memory_bytes() / 2**20:.0f} MiB)."
+        )
+
+    def _add_tree(self, node: int, path: str, notify: bool = False) -> bool:
+        """
+        Watches and indexes the directory at `path` and everything under it. Returns
+        False if a watch could not be added.
+        """
+        assert self._inotify is not None
+        stack = [(node, path)]
+        while stack and not self.closing:
+            node, path = stack.pop()
+            try:
+                wd = self._inotify.add_watch(path)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    logger.error(
+                        "Path index disabled: the inotify watch limit is reached "
+                        "(raise fs.inotify.max_user_watches)."
+                    )
+                    return False
+                continue  # removed meanwhile or unreadable
+            self._wd_node[wd] = node
+            self._node_wd[node] = wd
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if self._exclude is not None and self._exclude.match(
+                            entry.name
+                        ):
+                            continue
+                        kind = _entry_kind(entry)
+                        child = self._add(node, entry.name, kind)
+                        if kind == DIRECTORY:
+                            stack.append((child, entry.path))
+                        elif kind == FILE and notify:
+                            self._notify(os.path.relpath(entry.path, self.root), True)
+            except OSError:
+                pass
+        return True
+
+    def _apply(self, data: bytes, read_at: float) -> None:
+        if not self.ready:
+            return
+        for wd, mask, _, name in parse_events(data):
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify event queue overflowed, rebuilding path index.")
+                self._build()
+                if self._on_events_lost:
+                    self._on_events_lost()
+                return
+            node = self._wd_node.get(wd)
+            if node is None:
+                continue
+            if mask & IN_IGNORED:
+                self._wd_node.pop(wd, None)
+                self._node_wd.pop(node, None)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if node == ROOT:
+                    logger.error(f"{self.root} was removed; path index disabled.")
+                    self.ready = False
+                    return
+            elif self._exclude is not None and self._exclude.match(name):
+                continue
+            elif mask & IN_CLOSE_WRITE and self._on_file_change:
+                self._notify(os.path.join(self._path(node), name), True)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                child = self._children.get(node << 32 | self._name_ids.get(name, -1))
+                if child is not None:
+                    self._remove(child, notify=True)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                path = os.path.join(self._path(node, absolute=True), name)
+                kind = DIRECTORY if mask & IN_ISDIR else _path_kind(path)
+                child = self._add(node, name, kind)
+                if kind == FILE:
+                    self._notify(os.path.join(self._path(node), name), True)
+                elif kind == DIRECTORY and not self._add_tree(child, path, True):
+                    self.ready = False
+                    return
+        UPDATE_LAG.observe(time.monotonic() - read_at)
+
+    def _notify(self, path: str, exists: bool) -> None:
+        if self._on_file_change:
+            self._on_file_change(path, exists)
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+            self._name_bytes += sys.getsizeof(name)
+        return name_id
+
+    def _new_node(self, parent: int, name_id: int, kind: str) -> int:
+        if self._free:
+            node = self._free.pop()
+            self._parent[node] = parent
+            self._name[node] = name_id
+            self._kind[node] = KIND_CODES[kind]
+            self._first_child[node] = NONE
+        else:
+            node = len(self._parent)
+            self._parent.append(parent)
+            self._name.append(name_id)
+            self._kind.append(KIND_CODES[kind])
+            self._first_child.append(NONE)
+            self._next_sibling.append(NONE)
+            self._prev_sibling.append(NONE)
+        self._prev_sibling[node] = NONE
+        self._next_sibling[node] = NONE
+        if parent != NONE:
+            head = self._first_child[parent]
+            self._next_sibling[node] = head
+            if head != NONE:
+                self._prev_sibling[head] = node
+            self._first_child[parent] = node
+        return node
+
+    def _add(self, parent: int, name: str, kind: str) -> int:
+        name_id = self._intern(name)
+        key = parent << 32 | name_id
+        node = self._children.get(key)
+        if node is not None:
+            if self._kind[node] != KIND_CODES[kind]:  # replaced by another kind
+                self._remove(node)
+            else:
+                return node
+        node = self._new_node(parent, name_id, kind)
+        self._children[key] = node
+        lower_id = self._intern(name.lower())
+        nodes = self._by_name.get(lower_id)
+        if nodes is None:
+            self._by_name[lower_id] = node
+        elif isinstance(nodes, list):
+            nodes.append(node)
+        else:
+            self._by_name[lower_id] = [nodes, node]
+        self.entries += 1
+        return node
+
+    def _remove(self, node: int, notify: bool = False) -> None:
+        """Removes `node` and everything under it."""
+        if notify and self._on_file_change:
+            for path in self._file_paths(node):
+                self._notify(path, False)
+        parent = self._parent[node]
+        prev, next_ = self._prev_sibling[node], self._next_sibling[node]
+        if prev != NONE:
+            self._next_sibling[prev] = next_
+        else:
+            self._first_child[parent] = next_
+        if next_ != NONE:
+            self._prev_sibling[next_] = prev
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            child = self._first_child[node]
+            while child != NONE:
+                stack.append(child)
+                child = self._next_sibling[child]
+            name_id = self._name[node]
+            del self._children[self._parent[node] << 32 | name_id]
+            lower_id = self._name_ids[self._names[name_id].lower()]
+            nodes = self._by_name[lower_id]
+            if isinstance(nodes, list):
+                nodes.remove(node)
+                if len(nodes) == 1:
+                    self._by_name[lower_id] = nodes[0]
+            else:
+                del self._by_name[lower_id]
+            wd = self._node_wd.pop(node, None)
+            if wd is not None:  # moved away: the kernel keeps watching it
+                del self._wd_node[wd]
+                assert self._inotify is not None
+                self._inotify.rm_watch(wd)
+            self._parent[node] = NONE
+            self._name[node] = NONE
+            self._free.append(node)
+            self.entries -= 1
+
+    def _file_paths(self, node: int) -> List[str]:
+        """Paths of the regular files at or under `node`."""
+        paths = []
+        stack = [(node, self._path(node))]
+        while stack:
+            node, path = stack.pop()
+            if self._kind[node] == KIND_CODES[FILE]:
+                paths.append(path)
+            child = self._first_child[node]
+            while child != NONE:
+                stack.append(
+                    (child, os.path.join(path, self._names[self._name[child]]))
+                )
+                child = self._next_sibling[child]
+        return paths
+
+    def _path(self, node: int, absolute: bool = False) -> str:
+        parts = []
+        while node != ROOT:
+            parts.append(self._names[self._name[node]])
+            node = self._parent[node]
+        if absolute:
+            parts.append(self.root)
+        return os.path.join(*reversed(parts)) if parts else ""
+
+    def _find(
+        self,
+        pattern: str,
+        kind: str,
+        exact: bool,
+        exclude: Sequence[str],
+        offset: int,
+        limit: int,
+    ) -> Tuple[List[str], bool]:
+        if exact and not _REGEX_SYNTAX.search(pattern):
+            lower_id = self._name_ids.get(pattern.lower())
+            name_ids = [lower_id] if lower_id in self._by_name else []
+        else:
+            regex = re.compile(f"^{pattern}$" if exact else pattern, re.IGNORECASE)
+            names = self._names
+            name_ids = [i for i in self._by_name if regex.search(names[i])]
+
+        kind_code = KIND_CODES[kind]
+        candidates: List[int] = []
+        for name_id in name_ids:
+            nodes = self._by_name[name_id]
+            for node in nodes if isinstance(nodes, list) else (nodes,):
+                if self._kind[node] == kind_code:
+                    candidates.append(node)
+        excluded = compile_excludes(exclude)
+        if excluded is not None:
+            verdicts: Dict[int, bool] = {}
+            candidates = [
+                n for n in candidates if not self._is_excluded(n, excluded, verdicts)
+            ]
+        candidates.sort()
+        page = candidates[offset : offset + limit]
+        return [self._path(node) for node in page], len(candidates) > offset + limit
+
+    def _is_excluded(
+        self, node: int, excluded: Pattern[str], verdicts: Dict[int, bool]
+    ) -> bool:
+        """Whether `node` or one of its ancestors has an excluded name, memoized."""
+        path: List[int] = []
+        verdict = False
+        while node != ROOT:
+            if node in verdicts:
+                verdict = verdicts[node]
+                break
+            path.append(node)
+            if excluded.match(self._names[self._name[node]]):
+                verdict = True
+                break
+            node = self._parent[node]
+        for node in path:
+            verdicts[node] = verdict
+        return verdict
+
+
+def _entry_kind(entry: os.DirEntry) -> str:
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            return DIRECTORY
+        if entry.is_file(follow_symlinks=False):
+            return FILE
+        if entry.is_symlink():
+            return SYMLINK
+    except OSError:
+        pass
+    return OTHER
+
+
+def _path_kind(path: str) -> str:
+    try:
+        mode = os.lstat(path).st_mode
+    except OSError:
+        return OTHER
+    if stat.S_ISREG(mode):
+        return FILE
+    if stat.S_ISLNK(mode):
+        return SYMLINK
+    return OTHER
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Path index update failed.", exc_info=future.exception())
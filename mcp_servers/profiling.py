@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DURATION = 30.0
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TOP_ALLOCATIONS = 50
+ALLOCATION_FRAMES = 8  # innermost frames shown per allocation site
+
+# Written by `mcpserver profile` before it signals the server, to pass the duration
+PROFILE_REQUEST_SUFFIX = ".profile_request"
+# Written by a --workers supervisor: the output prefix of every worker it signalled
+PROFILE_TARGETS_SUFFIX = ".profile_targets"
+CPU_PROFILE_SUFFIX = ".cpu.collapsed"
+ALLOCATION_REPORT_SUFFIX = ".alloc.txt"
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler: a thread snapshots every other thread's stack at a fixed
+    interval and counts identical stacks. The profiled code is not instrumented, so the
+    overhead is one `sys._current_frames()` walk per sample regardless of load.
+
+    `write_collapsed` produces the "folded" format read by flamegraph.pl, speedscope
+    and inferno: one `root;...;leaf count` line per distinct stack.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_id: Optional[int] = None
+
+    def start(self) -> None:
+        self._owner_id = threading.get_ident()  # only waits for the profile to end
+        self._thread = threading.Thread(
+            target=self._run, name="mcp-sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        thread_names: Dict[int, str] = {}
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            if len(thread_names) != len(frames):
+                thread_names = {
+                    t.ident: t.name for t in threading.enumerate() if t.ident
+                }
+            for thread_id, frame in frames.items():
+                if thread_id == own_id or thread_id == self._owner_id:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        with path.open("w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def write_allocation_report(
+    snapshot: tracemalloc.Snapshot,
+    path: Path,
+    duration: float,
+    baseline: Optional[tracemalloc.Snapshot] = None,
+    limit: int = TOP_ALLOCATIONS,
+) -> None:
+    """Writes the top allocation sites, and the growth over the profile if a baseline exists."""
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+    )
+    lines = [f"# tracemalloc report after {duration:.1f}s", ""]
+    if baseline is not None:
+        lines.append(f"## Top {limit} allocation sites by growth during the profile")
+        for diff in snapshot.compare_to(baseline, "traceback")[:limit]:
+            lines.append(
+                f"{diff.size_diff / 1024:+.1f} KiB ({diff.count_diff:+d} blocks), "
+                f"{diff.size / 1024:.1f} KiB total"
+            )
+            lines.extend(_format_traceback(diff.traceback))
+        lines.append("")
+
+    statistics = snapshot.statistics("traceback")
+    total = sum(stat.size for stat in statistics)
+    scope = (
+        "live" if baseline is not None else "allocated during the profile, still live"
+    )
+    lines.append(f"## Top {limit} allocation sites ({total / 1024:.1f} KiB {scope})")
+    for stat in statistics[:limit]:
+        lines.append(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        lines.extend(_format_traceback(stat.traceback))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _format_traceback(traceback: tracemalloc.Traceback) -> List[str]:
+    return [
+        f"    {line}"
+        for line in traceback.format(limit=ALLOCATION_FRAMES, most_recent_first=True)
+    ]
+
+
+_profile_lock = threading.Lock()
+
+
+def run_profile(
+    output_prefix: str,
+    duration: float = DEFAULT_PROFILE_DURATION,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+) -> Optional[Tuple[Path, Path]]:
+    """
+    Profiles the whole process for `duration` seconds (blocking the calling thread, so run
+    it off the event loop). Writes `<output_prefix>.cpu.collapsed` and
+    `<output_prefix>.alloc.txt`. Returns None if a profile is already running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        logger.warning("A profile is already running; ignoring request.")
+        return None
+    try:
+        cpu_path = Path(output_prefix + CPU_PROFILE_SUFFIX)
+        alloc_path = Path(output_prefix + ALLOCATION_REPORT_SUFFIX)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(25)
+        baseline = None if started_tracing else tracemalloc.take_snapshot()
+
+        logger.info(f"Profiling CPU and memory for {duration:g}s.")
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+        try:
+            time.sleep(duration)
+        finally:
+            profiler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()  # tracing slows every allocation down
+
+        profiler.write_collapsed(cpu_path)
+        write_allocation_report(snapshot, alloc_path, duration, baseline)
+        logger.info(
+            f"Profile written: {cpu_path} ({profiler.sample_count} samples), {alloc_path}."
+        )
+        return cpu_path, alloc_path
+    except Exception as e:
+        logger.error(f"Profiling failed: {e}", exc_info=True)
+        return None
+    finally:
+        _profile_lock.release()
+
+
+def write_profile_request(output_prefix: str, duration: float) -> None:
+    Path(output_prefix + PROFILE_REQUEST_SUFFIX).write_text(str(duration))
+
+
+def read_profile_request(output_prefix: str) -> float:
+    """Consumes the pending profile request; without one, profiles for the default duration."""
+    request_file = Path(output_prefix + PROFILE_REQUEST_SUFFIX)
+    try:
+        duration = float(request_file.read_text().strip())
+        request_file.unlink()
+        return duration
+    except (OSError, ValueError):
+        return DEFAULT_PROFILE_DURATION
+
+
+def write_profile_targets(output_prefix: str, target_prefixes: List[str]) -> None:
+    Path(output_prefix + PROFILE_TARGETS_SUFFIX).write_text(
+        "".join(f"{prefix}\n" for prefix in target_prefixes)
+    )
+
+
+def read_profile_targets(output_prefix: str) -> List[str]:
+    """Output prefixes of the processes profiled for `output_prefix`: its workers, or itself."""
+    try:
+        targets = Path(output_prefix + PROFILE_TARGETS_SUFFIX).read_text().split()
+    except OSError:
+        targets = []
+    return targets or [output_prefix]
+
+
+def install_profile_signal_handler(output_prefix: str) -> bool:
+    """
+    Starts a profile in a background thread whenever the process receives SIGUSR1.
+    The duration is read from `<output_prefix>.profile_request` if present.
+    Must be called from the thread running the event loop.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+
+    def _on_signal() -> None:
+        duration = read_profile_request(output_prefix)
+        threading.Thread(
+            target=run_profile,
+            args=(output_prefix, duration),
+            name="mcp-profile",
+            daemon=True,
+        ).start()
+
+    asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, _on_signal)
+    logger.debug(f"Send SIGUSR1 to PID {os.getpid()} to profile this server.")
+    return True
@@ -0,0 +1,273 @@
+import time
+import asyncio
+import logging
+import functools
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from mcp_servers.exceptions import MCPRateLimitError
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    A single token bucket that refills at `rate` tokens per second up to `capacity`.
+
+    Callers that find the bucket empty reserve a future token by driving the token
+    count negative; the deficit divided by the refill rate is how long they must wait.
+    Because every reservation is taken in arrival order, waiters are served FIFO.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens: float = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def reserve(self, max_wait: Optional[float]) -> float:
+        """
+        Reserves one token and returns the delay (seconds) before it may be used.
+
+        Raises:
+            MCPRateLimitError: If the delay would exceed `max_wait`. Nothing is reserved.
+        """
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+
+        delay = -self.tokens / self.rate
+        if max_wait is not None and delay > max_wait:
+            self.tokens += 1
+            raise MCPRateLimitError(
+                f"Rate limit queue is full: waiting {delay:.2f}s would exceed max wait of {max_wait:.2f}s."
+            )
+        return delay
+
+    def try_reserve(self) -> bool:
+        """Takes a token only if one is available right now."""
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def release(self) -> None:
+        """Returns a reserved token, e.g. when its waiter was cancelled."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def available(self) -> float:
+        self._refill(time.monotonic())
+        return self.tokens
+
+
+class TokenBucketRateLimiter:
+    """
+    Asyncio token-bucket rate limiter with one bucket per key (e.g. per endpoint).
+
+    Bursts up to `burst` requests pass immediately; anything beyond that waits in
+    FIFO order until the bucket has refilled, as long as the wait stays below
+    `max_wait` seconds. Requests that would wait longer are rejected with
+    MCPRateLimitError.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive.")
+        self.rate_per_second = rate_per_second
+        self.burst = burst if burst and burst > 0 else max(1, int(rate_per_second))
+        self.max_wait = max_wait
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def _get_bucket(self, key: str) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self.buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, key: str = "default") -> float:
+        """
+        Waits until a token for `key` is available and consumes it.
+
+        Returns:
+            float: Seconds spent waiting for the token.
+
+        Raises:
+            MCPRateLimitError: If the wait would exceed `max_wait`.
+        """
+        bucket = self._get_bucket(key)
+        delay = bucket.reserve(self.max_wait)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                bucket.release()
+                raise
+        return delay
+
+    async def try_acquire(self, key: str = "default") -> bool:
+        """Consumes a token for `key` without waiting. Returns False if none is available."""
+        return self._get_bucket(key).try_reserve()
+
+    async def refresh(self) -> None:
+        """Brings `snapshot` up to date; in-process buckets always are."""
+
+    def snapshot(self) -> Dict[str, float]:
+        """Returns the currently available tokens per key (negative means queued waiters)."""
+        return {key: bucket.available() for key, bucket in self.buckets.items()}
+
+
+class SQLiteTokenBucketRateLimiter(TokenBucketRateLimiter):
+    """
+    Token-bucket rate limiter whose buckets live in a SQLite file, so every process
+    using the same file and `namespace` draws from one budget. This keeps the
+    provider's aggregate limit when a server runs several worker processes.
+
+    Each reservation is a short `BEGIN IMMEDIATE` transaction that runs in a thread,
+    since it may wait for other processes. `snapshot` reports the buckets as this
+    process last saw them; `refresh` reloads them. Bucket timestamps use
+    `time.monotonic()`, which is system-wide on Linux and macOS; buckets stamped in
+    the future (e.g. before a reboot) are reset.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        rate_per_second: float,
+        burst: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        namespace: str = "",
+    ):
+        super().__init__(rate_per_second, burst, max_wait)
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        # (tokens, updated_at) per key; replaced, never mutated, so the event loop
+        # can read it while a thread updates it
+        self._seen: Dict[str, Tuple[float, float]] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _update(self, key: str, fn: Callable[[TokenBucket], _T]) -> _T:
+        """Loads the bucket for `key`, applies `fn` and stores it, in one transaction."""
+        row_key = f"{self.namespace}/{key}"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Stamped after taking the write lock, so every stored bucket is older
+                bucket = TokenBucket(self.rate_per_second, self.burst)
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE key = ?", (row_key,)
+                ).fetchone()
+                if row is not None and row[1] <= bucket.updated_at:
+                    bucket.tokens, bucket.updated_at = row
+                result = fn(bucket)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (row_key, bucket.tokens, bucket.updated_at),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._seen = {**self._seen, key: (bucket.tokens, bucket.updated_at)}
+        return result
+
+    async def acquire(self, key: str = "default") -> float:
+        reserve = asyncio.ensure_future(
+            asyncio.to_thread(
+                self._update, key, lambda bucket: bucket.reserve(self.max_wait)
+            )
+        )
+        try:
+            # Shielded: a cancelled caller must still learn whether a token was taken
+            delay = await asyncio.shield(reserve)
+        except asyncio.CancelledError:
+            reserve.add_done_callback(functools.partial(self._release_if_reserved, key))
+            raise
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._release(key)
+                raise
+        return delay
+
+    def _release_if_reserved(self, key: str, reserve: "asyncio.Future[float]") -> None:
+        if not reserve.cancelled() and reserve.exception() is None:
+            self._release(key)
+
+    def _release(self, key: str) -> None:
+        """Returns a reserved token from a thread, without blocking or awaiting it."""
+        release = asyncio.ensure_future(
+            asyncio.to_thread(self._update, key, TokenBucket.release)
+        )
+        release.add_done_callback(_log_release_failure)
+
+    async def try_acquire(self, key: str = "default") -> bool:
+        return await asyncio.to_thread(self._update, key, TokenBucket.try_reserve)
+
+    async def refresh(self) -> None:
+        await asyncio.to_thread(self._load)
+
+    def _load(self) -> None:
+        prefix = f"{self.namespace}/"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, tokens, updated_at FROM buckets WHERE key >= ? AND key < ?",
+                (prefix, prefix + "\uffff"),
+            ).fetchall()
+            self._seen = {
+                key[len(prefix) :]: (tokens, updated_at)
+                for key, tokens, updated_at in rows
+            }
+
+    def snapshot(self) -> Dict[str, float]:
+        now = time.monotonic()
+        return {
+            key: min(
+                self.burst, tokens + max(0.0, now - updated_at) * self.rate_per_second
+            )
+            for key, (tokens, updated_at) in self._seen.items()
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _log_release_failure(task: "asyncio.Future[None]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Could not return a rate limit token: {task.exception()}")
@@ -0,0 +1,73 @@
+import math
+import time
+import random
+from email.utils import parsedate_to_datetime
+from typing import Optional, Mapping
+
+# Statuses worth retrying: throttling and server-side failures.
+RETRYABLE_STATUS_CODES = frozenset({429}) | frozenset(range(500, 600))
+
+# X-RateLimit-Reset values above this are treated as unix timestamps, not deltas.
+_EPOCH_THRESHOLD = 1_000_000_000
+
+
+def compute_backoff_delay(
+    previous_delay: float, base_delay: float, max_delay: float
+) -> float:
+    """
+    Decorrelated jitter backoff: the next delay is drawn uniformly between the base
+    delay and three times the previous one, capped at `max_delay`. Spreads retries
+    of concurrent clients instead of letting them retry in synchronized waves.
+    """
+    upper = max(base_delay, previous_delay * 3)
+    return min(max_delay, random.uniform(base_delay, upper))
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(0.0, delay) if math.isfinite(delay) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _parse_rate_limit_reset(value: str) -> Optional[float]:
+    # Some providers (e.g. Brave) send one value per window: "1, 1419704".
+    # The first one belongs to the shortest window, which is the one we hit.
+    first = value.split(",")[0].strip()
+    try:
+        reset = float(first)
+    except ValueError:
+        return None
+    if not math.isfinite(reset):
+        return None
+    if reset > _EPOCH_THRESHOLD:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def get_retry_after_delay(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Returns the delay (seconds) the upstream asked us to wait before retrying,
+    based on `Retry-After` or `X-RateLimit-Reset` headers, or None if there is no hint.
+    """
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        delay = _parse_retry_after(retry_after)
+        if delay is not None:
+            return delay
+
+    rate_limit_reset = headers.get("x-ratelimit-reset")
+    if rate_limit_reset:
+        return _parse_rate_limit_reset(rate_limit_reset)
+
+    return None
@@ -177,9 +177,13 @@ class MCPServerSearxng(MCPServerHttpBase):
         if language:
             params["language"] = language
 
-        json_data = await self._make_get_request_with_retry(search_endpoint, params)
-        data = SearXNGResponse.model_validate(json_data)
-        return self._format_searxng_results(data)
+        json_data = await self._make_get_request_with_retry(
+            search_endpoint, params, idempotent=True
+        )
+        with self.tracer.span("validate"):
+            data = SearXNGResponse.model_validate(json_data)
+        with self.tracer.span("format"):
+            return self._format_searxng_results(data)
 
     async def _search_web_via_searxng(
         self,
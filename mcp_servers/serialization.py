@@ -0,0 +1,35 @@
+"""JSON helpers that use orjson when it is installed and fall back to the stdlib."""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def json_loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Parses JSON directly from bytes (or str) without an intermediate decode step.
+
+    Raises:
+        ValueError: If `data` is not valid JSON (both backends raise a subclass).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serializes `obj` to compact UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller starts the work in its own task; callers arriving while it is
+    still running await the same task and receive the same result (or exception).
+    The result object is shared, so callers must treat it as read-only.
+
+    Each waiter is shielded from the others: cancelling one waiter never cancels
+    the shared task while anyone else still waits for it. When the last waiter is
+    cancelled the task is cancelled too, so abandoned work does not keep running.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+
+    def _start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> _Call:
+        call = _Call(asyncio.ensure_future(fn()))
+        self._calls[key] = call
+
+        def _done(task: asyncio.Task) -> None:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if not task.cancelled():
+                task.exception()  # Mark as retrieved even if every waiter left
+
+        call.task.add_done_callback(_done)
+        return call
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs `fn()` unless a call with the same key is already in flight, then awaits it."""
+        call: Optional[_Call] = self._calls.get(key)
+        if call is None or call.abandoned:
+            call = self._start(key, fn)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.abandoned = True
+                call.task.cancel()
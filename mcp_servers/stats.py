@@ -0,0 +1,94 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class LatencyWindow:
+    """
+    Fixed-size ring buffer of the most recent latency samples (seconds).
+
+    Recording is O(1) and allocation-free; percentiles sort a copy of the window,
+    which is cheap for the few hundred samples kept and only done on read.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self._samples: List[float] = [0.0] * size
+        self._index = 0
+        self.count = 0
+
+    def record(self, value: float) -> None:
+        self._samples[self._index] = value
+        self._index = (self._index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def next_slot(self) -> int:
+        """Index of the slot the next `record` call writes (and, once full, overwrites)."""
+        return self._index
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None while it is empty."""
+        return self.percentiles((percent,))[0]
+
+    def percentiles(self, percents: Sequence[float]) -> List[Optional[float]]:
+        """Several nearest-rank percentiles from a single sort of the window."""
+        if not self.count:
+            return [None] * len(percents)
+        ordered = sorted(self._samples[: self.count])
+        return [
+            ordered[max(1, math.ceil(percent / 100 * self.count)) - 1]
+            for percent in percents
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Sample count and p50/p95/p99 in milliseconds."""
+        p50, p95, p99 = self.percentiles((50, 95, 99))
+        return {
+            "window": self.count,
+            "p50_ms": _to_ms(p50),
+            "p95_ms": _to_ms(p95),
+            "p99_ms": _to_ms(p99),
+        }
+
+
+class ToolCallStats:
+    """
+    Rolling latency and error rate of one tool over its last `size` calls, plus
+    lifetime totals. Written only from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.latency = LatencyWindow(size)
+        self._errors = bytearray(size)
+        self._window_errors = 0
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+
+    def record(self, latency: float, error: bool) -> None:
+        index = self.latency.next_slot()
+        if self.latency.count == self.latency.size:
+            self._window_errors -= self._errors[index]
+        self._errors[index] = error
+        self._window_errors += error
+        self.latency.record(latency)
+        self.calls += 1
+        self.errors += error
+
+    @property
+    def error_rate(self) -> float:
+        count = self.latency.count
+        return self._window_errors / count if count else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "error_rate": round(self.error_rate, 4),
+            **self.latency.summary(),
+        }
+
+
+def _to_ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
@@ -86,8 +86,11 @@ class TavilyExtractApiResponse(BaseModel):
 
             # Tavily API returns 'raw_content' for the main content in /extract
             # We map it to 'content' in our TavilyExtractResultItem model for consistency
+            # Copy instead of popping: the response dict may be shared by coalesced requests
             if "raw_content" in item and "content" not in item:
-                item["content"] = item.pop("raw_content")
+                item = {k: v for k, v in item.items() if k != "raw_content"} | {
+                    "content": item["raw_content"]
+                }
 
             if "error" in item:
                 parsed_results.append(item)
@@ -324,11 +327,13 @@ class MCPServerTavily(MCPServerHttpBase):
 
         try:
             response_dict = await self._make_post_request_with_retry(
-                self.TAVILY_ENDPOINT, payload
+                self.TAVILY_ENDPOINT, payload, idempotent=True
             )
-            validated_response = TavilyApiResponse.model_validate(response_dict)
+            with self.tracer.span("validate"):
+                validated_response = TavilyApiResponse.model_validate(response_dict)
             self.logger.info(f"Tavily search tool returned result for query: {query}")
-            return self._format_search_results(validated_response)
+            with self.tracer.span("format"):
+                return self._format_search_results(validated_response)
         except Exception as e:
             self.logger.error(
                 f"Error in tavily search for query '{query}': {e}", exc_info=True
@@ -382,14 +387,18 @@ class MCPServerTavily(MCPServerHttpBase):
         }
         try:
             response_dict = await self._make_post_request_with_retry(
-                self.TAVILY_EXTRACT_ENDPOINT, payload
+                self.TAVILY_EXTRACT_ENDPOINT, payload, idempotent=True
             )
 
-            validated_response = TavilyExtractApiResponse.model_validate(response_dict)
+            with self.tracer.span("validate"):
+                validated_response = TavilyExtractApiResponse.model_validate(
+                    response_dict
+                )
             self.logger.info(
                 f"Tavily extract content tool returned result for URL: {url_to_extract}"
             )
-            return self._format_extract_results(validated_response)
+            with self.tracer.span("format"):
+                return self._format_extract_results(validated_response)
         except Exception as exp:
             self.logger.error(
                 f"Error in extracting URL '{url_to_extract}': {exp}",
@@ -498,11 +507,15 @@ class MCPServerTavily(MCPServerHttpBase):
             response_dict = await self._make_post_request_with_retry(
                 self.TAVILY_CRAWL_ENDPOINT, payload
             )
-            validated_response = TavilyCrawlApiResponse.model_validate(response_dict)
+            with self.tracer.span("validate"):
+                validated_response = TavilyCrawlApiResponse.model_validate(
+                    response_dict
+                )
             self.logger.info(
                 f"Tavily crawl URL tool returned result for URL: {url_to_crawl}"
             )
-            return self._format_crawl_results(validated_response)
+            with self.tracer.span("format"):
+                return self._format_crawl_results(validated_response)
         except Exception as e:
             self.logger.error(
                 f"Error in tavily_crawl_url for URL '{url_to_crawl}': {e}",
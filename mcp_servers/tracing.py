@@ -0,0 +1,338 @@
+import os
+import time
+import queue
+import random
+import logging
+import threading
+from pathlib import Path
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from mcp_servers.serialization import json_dumps
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """A timed operation within a trace, shaped after the OpenTelemetry span model."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "kind",
+        "start_time_ns",
+        "end_time_ns",
+        "attributes",
+        "status_code",
+        "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        kind: int,
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns = 0
+        self.attributes = attributes
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+
+    def to_dict(self, service_name: str) -> Dict[str, Any]:
+        return {
+            "service.name": service_name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time_ns,
+            "end_time_unix_nano": self.end_time_ns,
+            "duration_ms": (self.end_time_ns - self.start_time_ns) / 1e6,
+            "attributes": self.attributes,
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for spans that are not recorded; also marks a sampled-out trace."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Any] = ContextVar("mcp_servers_current_span", default=None)
+
+
+def current_span() -> Any:
+    """Returns the active span, `NOOP_SPAN` inside a sampled-out trace, or None."""
+    return _current_span.get()
+
+
+class _NoopScope:
+    """Reusable, stateless context manager returned when nothing is recorded."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopSpan:
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Any):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Any:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self.token)
+        span = self.span
+        if span is NOOP_SPAN:
+            return False
+        span.end_time_ns = time.time_ns()
+        if exc is not None and span.status_code != STATUS_ERROR:
+            span.set_error(f"{type(exc).__name__}: {exc}")
+        self.tracer._on_end(span)
+        return False
+
+
+class Tracer:
+    """
+    Creates spans for one server and hands finished ones to a background exporter.
+
+    Sampling is decided once per trace, at the root span: a sampled-out trace marks
+    the context with `NOOP_SPAN`, so its nested spans cost one ContextVar lookup.
+    When tracing is disabled `span()` returns a shared no-op context manager.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        processor: Optional["BatchSpanProcessor"] = None,
+        sample_ratio: float = 1.0,
+    ):
+        self.service_name = service_name
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+        self.enabled = processor is not None and sample_ratio > 0
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+        """Context manager that records `name` as a child of the active span, if any."""
+        if not self.enabled:
+            return _NOOP_SCOPE
+        parent = _current_span.get()
+        if parent is NOOP_SPAN:
+            return _NOOP_SCOPE
+        if parent is None:
+            if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+                return _SpanScope(self, NOOP_SPAN)
+            span = Span(name, os.urandom(16).hex(), None, kind, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+        return _SpanScope(self, span)
+
+    def _on_end(self, span: Span) -> None:
+        if self.processor:
+            self.processor.on_end(span)
+
+    def shutdown(self) -> None:
+        if self.processor:
+            self.processor.shutdown()
+        self.enabled = False
+
+
+class JsonLinesSpanExporter:
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: Path, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        with self.path.open("ab") as f:
+            for span in spans:
+                f.write(json_dumps(span.to_dict(self.service_name)) + b"\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OTLPHttpSpanExporter:
+    """Sends spans to an OpenTelemetry collector using OTLP/HTTP with JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: List[Span]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "mcp_servers"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        response = self._client.post(
+            self.endpoint,
+            content=json_dumps(body),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class BatchSpanProcessor:
+    """
+    Buffers finished spans and exports them in batches from a daemon thread, so file
+    and network I/O never run on the event loop. When the buffer is full new spans
+    are dropped rather than blocking the caller.
+    """
+
+    _SHUTDOWN = object()
+
+    def __init__(
+        self,
+        exporter: Any,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 256,
+        schedule_delay: float = 2.0,
+    ):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="mcp-span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            stop = False
+            try:
+                item = self._queue.get(timeout=self.schedule_delay)
+                while True:
+                    if item is self._SHUTDOWN:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.max_batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(batch)} spans: {e}")
+            if stop:
+                return
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flushes buffered spans and stops the export thread."""
+        try:
+            self._queue.put(self._SHUTDOWN, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self.exporter.shutdown()
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": typed})
+    return encoded
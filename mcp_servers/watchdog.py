@@ -0,0 +1,194 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_servers.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = REGISTRY.histogram(
+    "mcp_event_loop_lag_seconds",
+    "Delay between when the watchdog heartbeat was due and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+).labels()
+LOOP_BLOCKED = REGISTRY.counter(
+    "mcp_event_loop_blocked",
+    "Event loop stalls longer than the watchdog threshold, by blocking call site.",
+    ["site"],
+)
+LOOP_BLOCKED_SECONDS = REGISTRY.counter(
+    "mcp_event_loop_blocked_seconds",
+    "Total event loop stall time, by blocking call site.",
+    ["site"],
+)
+
+_PACKAGE_DIR = str(Path(__file__).resolve().parent)
+_ASYNCIO_DIR = str(Path(asyncio.__file__).resolve().parent)
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag and reports what blocked the loop.
+
+    A heartbeat task sleeps for `interval` seconds and records how late it wakes up.
+    A monitor thread checks the heartbeat; once it is overdue by more than `threshold`
+    the loop thread is stuck in synchronous code, so the monitor captures that
+    thread's stack (and the running task) and logs it while the stall is happening.
+    Stalls are ranked by call site: the innermost frame inside `mcp_servers`, or the
+    innermost frame when the stack has none.
+
+    One watchdog serves every server on a loop; use `acquire()` / `release()`.
+    """
+
+    _instances: Dict[asyncio.AbstractEventLoop, "LoopWatchdog"] = {}
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float = 0.25,
+        interval: float = 0.05,
+    ):
+        self.loop = loop
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._users = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = threading.get_ident()
+        self._pending_site: Optional[str] = None
+        self._hot_spots: Dict[str, List[float]] = {}  # site -> [count, seconds]
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def acquire(cls, threshold: float = 0.25, interval: float = 0.05) -> "LoopWatchdog":
+        """Returns the running loop's watchdog, starting it on first use."""
+        loop = asyncio.get_running_loop()
+        watchdog = cls._instances.get(loop)
+        if watchdog is None:
+            watchdog = cls._instances[loop] = cls(loop, threshold, interval)
+            watchdog._start()
+        watchdog._users += 1
+        return watchdog
+
+    def release(self) -> None:
+        self._users -= 1
+        if self._users <= 0:
+            self._instances.pop(self.loop, None)
+            self._stop()
+
+    def _start(self) -> None:
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = self.loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._monitor, name="mcp-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def _stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - due)
+            self._last_beat = now
+            LOOP_LAG.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                with self._lock:
+                    site = self._pending_site or "unknown"
+                    self._pending_site = None
+                    self.stalls += 1
+                    hot_spot = self._hot_spots.setdefault(site, [0, 0.0])
+                    hot_spot[0] += 1
+                    hot_spot[1] += lag
+                LOOP_BLOCKED.labels(site).inc()
+                LOOP_BLOCKED_SECONDS.labels(site).inc(lag)
+
+    def _monitor(self) -> None:
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            overdue = time.monotonic() - last_beat - self.interval
+            if overdue < self.threshold or last_beat == reported_beat:
+                continue
+            reported_beat = last_beat  # one report per stall
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = _task_frames(traceback.extract_stack(frame))
+            site = _blocking_site(stack)
+            with self._lock:
+                self._pending_site = site
+            task = self._running_task()
+            logger.warning(
+                f"Event loop blocked for {overdue * 1000:.0f}+ ms at {site}"
+                f"{f' in task {task}' if task else ''}:\n"
+                + "".join(traceback.format_list(stack))
+            )
+
+    def _running_task(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+    def hot_spots(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Call sites that blocked the loop, by total stall time."""
+        with self._lock:
+            ranked: List[Tuple[str, List[float]]] = sorted(
+                self._hot_spots.items(), key=lambda item: item[1][1], reverse=True
+            )
+        return [
+            {"site": site, "stalls": int(count), "blocked_ms": round(seconds * 1000, 1)}
+            for site, (count, seconds) in ranked[:limit]
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stalls,
+            "hot_spots": self.hot_spots(),
+        }
+
+
+def _task_frames(stack: traceback.StackSummary) -> traceback.StackSummary:
+    """Drops the event loop machinery above the callback that is currently running."""
+    for index, frame in enumerate(stack):
+        # Handle._run (asyncio/events.py) invokes every callback and task step
+        if frame.name == "_run" and frame.filename.startswith(_ASYNCIO_DIR):
+            if index + 1 < len(stack):
+                return traceback.StackSummary.from_list(stack[index + 1 :])
+            break
+    return stack
+
+
+def _blocking_site(stack: traceback.StackSummary) -> str:
+    chosen = stack[-1] if stack else None
+    for frame in reversed(stack):
+        if frame.filename.startswith(_PACKAGE_DIR) and not frame.filename.endswith(
+            "watchdog.py"
+        ):
+            chosen = frame
+            break
+    if chosen is None:
+        return "unknown"
+    return f"{Path(chosen.filename).name}:{chosen.lineno} ({chosen.name})"
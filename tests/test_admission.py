@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from mcp_servers.admission import AdmissionController
+from mcp_servers.exceptions import MCPServerOverloadedError
+
+
+def test_admits_up_to_max_concurrency_then_queues():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=2, max_queue=1)
+        await admission.acquire()
+        await admission.acquire()
+        queued = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.snapshot()["queued"] == 1
+        with pytest.raises(MCPServerOverloadedError):
+            await admission.acquire()
+        assert admission.rejected == 1
+        queued.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_release_hands_slots_over_in_fifo_order():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=3)
+        order = []
+
+        async def call(name):
+            await admission.acquire()
+            order.append(name)
+
+        await admission.acquire()
+        waiters = [asyncio.create_task(call(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        for _ in waiters:
+            admission.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiters)
+        # The slot moved from caller to caller without ever being free
+        assert admission.active == 1
+        admission.release()
+        assert admission.active == 0
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_new_call_does_not_overtake_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=2)
+        await admission.acquire()
+        queued = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        admission.release()
+        late = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert queued.done() and not late.done()
+        admission.release()
+        await late
+        admission.release()
+        assert admission.snapshot()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_rejects_and_frees_the_queue():
+    async def scenario():
+        admission = AdmissionController(
+            max_concurrency=1, max_queue=1, queue_timeout=0.01
+        )
+        await admission.acquire()
+        with pytest.raises(MCPServerOverloadedError):
+            await admission.acquire()
+        assert admission.timed_out == 1
+        assert admission.queue_depth == 0
+        admission.release()
+        assert admission.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_is_skipped():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=2)
+        await admission.acquire()
+        cancelled = asyncio.create_task(admission.acquire())
+        queued = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        admission.release()
+        await queued
+        assert admission.active == 1
+        assert admission.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_handed_over_while_waiter_is_cancelled_is_passed_on():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=2)
+        await admission.acquire()
+        first = asyncio.create_task(admission.acquire())
+        second = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        admission.release()  # Hands the slot to `first`...
+        first.cancel()  # ...which is cancelled before it resumes
+        await asyncio.gather(first, return_exceptions=True)
+        await second
+        assert admission.active == 1
+        admission.release()
+        assert admission.active == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,138 @@
+import pytest
+
+from mcp_servers import circuit_breaker
+from mcp_servers.circuit_breaker import CircuitBreaker, CircuitState
+from mcp_servers.exceptions import MCPCircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = dict(
+        failure_threshold=3,
+        error_rate_threshold=0.5,
+        window_size=10,
+        min_requests=4,
+        reset_timeout=30.0,
+    )
+    options.update(kwargs)
+    return CircuitBreaker("upstream", **options)
+
+
+def fail(breaker: CircuitBreaker) -> None:
+    breaker.record_failure(breaker.before_request())
+
+
+def succeed(breaker: CircuitBreaker) -> None:
+    breaker.record_success(breaker.before_request())
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = make_breaker()
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CircuitState.CLOSED
+    fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 1
+
+
+def test_opens_on_error_rate(clock):
+    breaker = make_breaker(failure_threshold=100)
+    for _ in range(2):
+        succeed(breaker)
+        fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_success_resets_consecutive_failures(clock):
+    breaker = make_breaker(min_requests=100)
+    for _ in range(5):
+        fail(breaker)
+        fail(breaker)
+        succeed(breaker)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_open_circuit_rejects_until_reset_timeout(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock[0] += 10
+    with pytest.raises(MCPCircuitOpenError) as error:
+        breaker.before_request()
+    assert error.value.retry_after == pytest.approx(20.0)
+    assert breaker.rejected == 1
+
+
+def test_half_open_admits_a_single_probe(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock[0] += 30
+    probe = breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(MCPCircuitOpenError):
+        breaker.before_request()
+    breaker.record_success(probe)
+    assert breaker.state == CircuitState.CLOSED
+    succeed(breaker)
+
+
+def test_failed_probe_reopens(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock[0] += 30
+    breaker.record_failure(breaker.before_request())
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+    with pytest.raises(MCPCircuitOpenError):
+        breaker.before_request()
+
+
+def test_cancelled_probe_frees_the_slot(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock[0] += 30
+    breaker.record_cancelled(breaker.before_request())
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_success(breaker.before_request())
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_stale_request_cannot_decide_for_the_probe(clock):
+    breaker = make_breaker()
+    slow = breaker.before_request()  # Admitted while closed, finishes much later
+    open_breaker(breaker)
+    clock[0] += 30
+    probe = breaker.before_request()
+
+    breaker.record_success(slow)
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_cancelled(slow)
+    with pytest.raises(MCPCircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_failure(probe)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_stale_failure_does_not_reopen_a_recovered_circuit(clock):
+    breaker = make_breaker(failure_threshold=1)
+    slow = breaker.before_request()
+    fail(breaker)
+    clock[0] += 30
+    breaker.record_success(breaker.before_request())
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure(slow)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.consecutive_failures == 0
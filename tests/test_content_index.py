@@ -0,0 +1,211 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mcp_servers import content_index, fswalk
+from mcp_servers.content_index import ContentIndex, trigram_query, trigrams
+
+
+def normalize(query):
+    """Terms of a query as sets: their order carries no meaning."""
+    if query is None or isinstance(query, int):
+        return query
+    op, terms = query
+    return op, frozenset(normalize(term) for term in terms)
+
+
+def literal(text: str):
+    """The query for a single literal run."""
+    grams = trigrams(text.encode())
+    return normalize(("and", list(grams)) if len(grams) > 1 else grams.pop())
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("abc", literal("abc")),
+        ("needle", literal("needle")),
+        ("NeEdLe", literal("needle")),
+        (r"def\s+main", normalize(("and", [*trigrams(b"def"), *trigrams(b"main")]))),
+        ("(abc)+x", literal("abc")),
+        ("(?:abc){2,}", literal("abc")),
+        ("(abc)*xyz", literal("xyz")),
+        ("^abc$", literal("abc")),
+        ("(?=abc)", None),
+        ("(abc)?", None),
+        ("ab", None),
+        ("a.b.c", None),
+        (".*", None),
+        ("[0-9]+", None),
+        ("ab\ncd", None),
+        ("(", None),
+        ("café", literal("caf")),
+        ("CAFÉ", literal("caf")),
+        (r"caf\xe9", literal("caf")),
+        ("été", None),
+    ],
+)
+def test_trigram_query(pattern, expected):
+    assert normalize(trigram_query(pattern)) == expected
+
+
+@pytest.mark.parametrize(
+    "text, pattern",
+    [
+        ("\u212aelvin", "kelvin"),  # Kelvin sign
+        ("\u017ftring", "string"),  # long s
+        ("\u0130ndex", "index"),
+        ("\u0131ndex", "INDEX"),
+    ],
+)
+def test_non_ascii_letters_matching_ascii_ones_keep_their_trigrams(text, pattern):
+    assert re.search(pattern, text, re.IGNORECASE)
+    assert trigrams(pattern.encode()) <= trigrams(text.encode())
+
+
+def test_alternation_needs_trigrams_in_every_branch():
+    assert normalize(trigram_query("foo|needle")) == (
+        "or",
+        frozenset([literal("foo"), literal("needle")]),
+    )
+    assert trigram_query("foo|x") is None
+    assert normalize(trigram_query("(foo|bar)baz")) == normalize(
+        ("and", [("or", [*trigrams(b"foo"), *trigrams(b"bar")]), *trigrams(b"baz")])
+    )
+
+
+def test_without_the_re_parser_nothing_is_covered(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_index, "sre_parse", None)
+    assert trigram_query("needle") is None
+    index = ContentIndex(tmp_path, tmp_path / "index")
+    index.ready = True
+    try:
+        assert not index.covers("needle")
+    finally:
+        index._executor.shutdown()
+
+
+EXCLUDE = ["node_modules"]
+PATTERNS = ["needle", "NEEDLE", "CAFÉ", "kelvin", "^def main", "needle|haystack"]
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_index, "SHARD_FILES", 4)
+    monkeypatch.setattr(content_index, "MAX_FILE_BYTES", 64)
+    files = {
+        "a.txt": "a needle\n",
+        "b.txt": "hay\n",
+        "c/menu.txt": "un café\n",
+        "c/units.txt": "\u212aelvin\n",  # Kelvin sign
+        "c/main.py": "def main():\n    pass\n",
+        "d/large.txt": "x" * 100 + " needle\n",  # over MAX_FILE_BYTES
+        "d/haystack.txt": "haystack\n",
+        ".hidden/needle.txt": "needle\n",
+        "node_modules/needle.js": "needle\n",
+    }
+    for path, content in files.items():
+        (tmp_path / "root" / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / "root" / path).write_text(content, encoding="utf-8")
+    (tmp_path / "root" / "d" / "binary.bin").write_bytes(b"\0needle\n")
+    return tmp_path / "root"
+
+
+def open_index(root) -> ContentIndex:
+    """A started index over `root`, once it is up to date."""
+    index = ContentIndex(root, root.parent / "index", EXCLUDE)
+    index.start()
+    settle(index)
+    assert index.ready
+    return index
+
+
+def settle(index: ContentIndex) -> None:
+    """Waits for the updates submitted so far."""
+    index._executor.submit(lambda: None).result()
+
+
+def close(index: ContentIndex) -> None:
+    asyncio.run(index.close())
+
+
+def assert_greps_like_fswalk(index: ContentIndex) -> None:
+    with ThreadPoolExecutor(2) as pool:
+        for pattern in PATTERNS:
+            assert index.covers(pattern)
+            expected = fswalk.grep(index.root, pattern, EXCLUDE, executor=pool)
+            assert list(index.grep(pattern, pool)) == sorted(expected), pattern
+
+
+def test_grep_returns_what_fswalk_grep_returns(root):
+    index = open_index(root)
+    try:
+        assert_greps_like_fswalk(index)
+        assert index.snapshot()["files"] == 8
+    finally:
+        close(index)
+
+
+def test_shards_round_trip_through_disk(root):
+    index = open_index(root)
+    try:
+        assert index.snapshot()["shards"] == 2  # 8 files, 4 per shard
+        shard = index._shards[0]
+        paths = [shard.path_at(i) for i in range(shard.files)]
+        assert paths == sorted(paths)
+        for file_id, path in enumerate(paths):
+            assert shard.find(path) == file_id
+        assert shard.find("zzz.txt") is None
+        for trigram in trigrams(b"needle"):
+            ids = list(shard.postings(trigram))
+            assert ids == sorted(ids)
+    finally:
+        close(index)
+
+
+def test_changes_are_applied_and_old_entries_marked_stale(root):
+    index = open_index(root)
+    try:
+        (root / "b.txt").write_text("a needle in the hay\n")
+        (root / "a.txt").unlink()
+        (root / "e.txt").write_text("needle\n")
+        for path, exists in (("b.txt", True), ("a.txt", False), ("e.txt", True)):
+            index.file_changed(path, exists)
+        settle(index)
+        assert sum(len(shard.stale) for shard in index._shards) == 2
+        assert sorted(index._delta.ids) == ["b.txt", "e.txt"]
+        assert_greps_like_fswalk(index)
+    finally:
+        close(index)
+
+
+def test_mostly_stale_shard_is_reindexed_and_deleted(root):
+    index = open_index(root)
+    try:
+        shard = index._shards[0]
+        changed = [shard.path_at(i) for i in range(3)]
+        for path in changed:
+            (root / path).write_text("needle\n")
+            index.file_changed(path, True)
+        settle(index)
+        assert shard not in index._shards
+        assert not shard.path.exists()
+        assert_greps_like_fswalk(index)
+    finally:
+        close(index)
+
+
+def test_restart_reconciles_offline_changes(root):
+    close(open_index(root))
+    (root / "b.txt").write_text("the needle moved here\n")
+    (root / "a.txt").unlink()
+    (root / "c" / "new.txt").write_text("haystack\n")
+
+    index = open_index(root)
+    try:
+        assert index.reindexed == 2
+        assert_greps_like_fswalk(index)
+    finally:
+        close(index)
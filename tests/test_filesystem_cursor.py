@@ -0,0 +1,59 @@
+import base64
+
+import pytest
+
+from mcp_servers.filesystem import _decode_cursor, _encode_cursor
+
+QUERY = ["fd", "--type", "f", "report", "."]
+
+
+@pytest.mark.parametrize("offset", [0, 1, 1000, 10**9])
+def test_round_trip(offset):
+    assert _decode_cursor(_encode_cursor(QUERY, offset), QUERY) == offset
+
+
+def test_cursor_is_opaque_and_url_safe():
+    cursor = _encode_cursor(QUERY, 200)
+    assert "report" not in cursor
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_="
+    )
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        ["fd", "--type", "f", "summary", "."],
+        ["fd", "--type", "d", "report", "."],
+        ["index", "fd", "--type", "f", "report", "."],
+        ["fd", "--type", "f", "report"],
+    ],
+)
+def test_cursor_is_bound_to_its_query(other):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(_encode_cursor(QUERY, 50), other)
+
+
+def test_argument_boundaries_are_part_of_the_key():
+    with pytest.raises(ValueError):
+        _decode_cursor(_encode_cursor(["ab", "c"], 5), ["a", "bc"])
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not base64!",
+        base64.urlsafe_b64encode(b"12").decode(),
+        base64.urlsafe_b64encode(b"x:abc").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe:1").decode(),
+    ],
+)
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(cursor, QUERY)
+
+
+def test_negative_offset_is_rejected():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(_encode_cursor(QUERY, -1), QUERY)
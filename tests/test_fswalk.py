@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+
+import pytest
+
+from mcp_servers import fswalk
+from mcp_servers.fswalk import DIRECTORY, FILE, SYMLINK, find, grep, render_tree, walk
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    tmp_path/
+        README.md        "Project notes"
+        src/
+            app.py       "def main():\\n    return TODO\\n"
+            util.py      "import os\\n"
+            data.bin     binary, contains TODO
+        docs/
+            guide.md     "todo: write guide"
+        .hidden/
+            secret.txt   "TODO"
+        node_modules/
+            dep.js       "TODO"
+        link -> src
+    """
+    files = {
+        "README.md": b"Project notes\n",
+        "src/app.py": b"def main():\n    return TODO\n",
+        "src/util.py": b"import os\n",
+        "src/data.bin": b"\0\x01TODO\n",
+        "docs/guide.md": b"todo: write guide\n",
+        ".hidden/secret.txt": b"TODO\n",
+        "node_modules/dep.js": b"TODO\n",
+    }
+    for path, content in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_bytes(content)
+    os.symlink("src", tmp_path / "link")
+    return tmp_path
+
+
+def test_walk_is_sorted_depth_first_and_does_not_follow_symlinks(tree):
+    entries = [(entry.path, entry.kind, entry.depth) for entry in walk(tree)]
+    assert entries == [
+        (".hidden", DIRECTORY, 1),
+        (os.path.join(".hidden", "secret.txt"), FILE, 2),
+        ("README.md", FILE, 1),
+        ("docs", DIRECTORY, 1),
+        (os.path.join("docs", "guide.md"), FILE, 2),
+        ("link", SYMLINK, 1),
+        ("node_modules", DIRECTORY, 1),
+        (os.path.join("node_modules", "dep.js"), FILE, 2),
+        ("src", DIRECTORY, 1),
+        (os.path.join("src", "app.py"), FILE, 2),
+        (os.path.join("src", "data.bin"), FILE, 2),
+        (os.path.join("src", "util.py"), FILE, 2),
+    ]
+
+
+def test_walk_excludes_hidden_and_globs_and_limits_depth(tree):
+    paths = [
+        entry.path
+        for entry in walk(
+            tree, exclude=["node_modules", "*.md"], include_hidden=False, max_depth=1
+        )
+    ]
+    assert paths == ["docs", "link", "src"]
+
+
+def test_walk_stops_when_cancelled(tree):
+    cancel = threading.Event()
+    seen = []
+    for entry in walk(tree, cancel=cancel):
+        seen.append(entry.path)
+        cancel.set()
+    assert len(seen) == 1
+
+
+def test_find_matches_names_by_kind(tree):
+    assert list(find(tree, r"\.PY$", FILE)) == [
+        os.path.join("src", "app.py"),
+        os.path.join("src", "util.py"),
+    ]
+    assert list(find(tree, r"\.PY$", FILE, ignore_case=False)) == []
+    assert list(find(tree, "^(docs|src)$", DIRECTORY)) == ["docs", "src"]
+    assert list(find(tree, "secret", FILE, include_hidden=False)) == []
+
+
+def test_find_rejects_invalid_patterns(tree):
+    with pytest.raises(re.error):
+        list(find(tree, "(", FILE))
+
+
+def test_grep_lists_matching_text_files_like_rg(tree):
+    assert list(grep(tree, "todo")) == [
+        os.path.join("docs", "guide.md"),
+        os.path.join("node_modules", "dep.js"),
+        os.path.join("src", "app.py"),
+    ]
+
+
+def test_grep_respects_case_excludes_and_anchors(tree):
+    assert list(grep(tree, "TODO", ignore_case=False, exclude=["node_modules"])) == [
+        os.path.join("src", "app.py")
+    ]
+    assert list(grep(tree, "^import", ignore_case=False)) == [
+        os.path.join("src", "util.py")
+    ]
+    assert list(grep(tree, "TODO", include_hidden=True, exclude=["node_modules"])) == [
+        os.path.join(".hidden", "secret.txt"),
+        os.path.join("docs", "guide.md"),
+        os.path.join("src", "app.py"),
+    ]
+
+
+def test_grep_reads_large_files_in_line_aligned_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(fswalk, "BINARY_SNIFF_BYTES", 16)
+    monkeypatch.setattr(fswalk, "READ_BLOCK_SIZE", 10)
+    filler = b"".join(b"line %03d\n" % i for i in range(100))
+    (tmp_path / "middle.txt").write_bytes(filler + b"the needle is here\n" + filler)
+    (tmp_path / "last.txt").write_bytes(filler + b"needle without newline")
+    (tmp_path / "split.txt").write_bytes(filler + b"need\nle\n" + filler)
+    assert list(grep(tmp_path, "^the needle is here$")) == ["middle.txt"]
+    assert list(grep(tmp_path, "needle")) == ["last.txt", "middle.txt"]
+
+
+def test_render_tree_matches_tree_output(tree):
+    text, truncated = render_tree(tree, exclude=["node_modules"])
+    assert not truncated
+    assert text == (
+        f"{tree}\n"
+        "├── README.md\n"
+        "├── docs\n"
+        "│   └── guide.md\n"
+        "├── link -> src\n"
+        "└── src\n"
+        "    ├── app.py\n"
+        "    ├── data.bin\n"
+        "    └── util.py\n"
+        "\n"
+        "2 directories, 6 files\n"
+    )
+
+
+def test_render_tree_depth_and_byte_limits(tree):
+    text, truncated = render_tree(tree, exclude=["node_modules"], max_depth=1)
+    assert text.endswith("2 directories, 2 files\n")
+    assert "guide.md" not in text
+    text, truncated = render_tree(tree, max_bytes=len(str(tree)) + 30)
+    assert truncated
+    assert "src" not in text.splitlines()[-1]
+
+
+def test_grep_ignores_case_beyond_ascii_like_rg(tmp_path, monkeypatch):
+    (tmp_path / "menu.txt").write_text("un café crème\n", encoding="utf-8")
+    (tmp_path / "latin1.txt").write_bytes(b"caf\xe9 \xff\n")  # not UTF-8
+    assert list(grep(tmp_path, "CAFÉ")) == ["menu.txt"]
+    assert list(grep(tmp_path, "CAFÉ", ignore_case=False)) == []
+    assert list(grep(tmp_path, r"caf.\s")) == ["latin1.txt", "menu.txt"]
+    # Line-aligned blocks never split a character
+    monkeypatch.setattr(fswalk, "BINARY_SNIFF_BYTES", 16)
+    monkeypatch.setattr(fswalk, "READ_BLOCK_SIZE", 5)
+    (tmp_path / "menu.txt").write_text("ééééé\n" * 20 + "ÉTÉ\n", encoding="utf-8")
+    assert list(grep(tmp_path, "^été$")) == ["menu.txt"]
@@ -0,0 +1,180 @@
+import itertools
+import os
+import shutil
+
+import pytest
+
+from mcp_servers.fswalk import DIRECTORY, FILE
+from mcp_servers.path_index import (
+    EVENT_HEADER,
+    IN_CLOSE_WRITE,
+    IN_CREATE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_IGNORED,
+    IN_ISDIR,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+    PathIndex,
+)
+
+
+class FakeInotify:
+    """Hands out watch descriptors; events are fed to `_apply` by the tests."""
+
+    def __init__(self):
+        self.watches = {}
+        self.removed = []
+        self._next_wd = itertools.count(1)
+
+    def add_watch(self, path: str) -> int:
+        wd = next(self._next_wd)
+        self.watches[os.path.realpath(path)] = wd
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self.removed.append(wd)
+
+
+def event(wd: int, mask: int, name: str = "", cookie: int = 0) -> bytes:
+    encoded = os.fsencode(name)
+    if encoded:
+        encoded += b"\0" * (16 - len(encoded) % 16)
+    return EVENT_HEADER.pack(wd, mask, cookie, len(encoded)) + encoded
+
+
+@pytest.fixture
+def root(tmp_path):
+    for path in ("src/app.py", "src/lib/util.py", "node_modules/dep.js"):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("x")
+    return tmp_path
+
+
+@pytest.fixture
+def index(root):
+    changes = []
+    index = PathIndex(
+        root,
+        exclude=["node_modules"],
+        on_file_change=lambda path, exists: changes.append((path, exists)),
+        on_events_lost=lambda: changes.append("lost"),
+    )
+    index.changes = changes
+    index._inotify = FakeInotify()
+    index._build()
+    assert index.ready
+    yield index
+    index._executor.shutdown()
+
+
+def wd(index, path="") -> int:
+    return index._inotify.watches[os.path.realpath(os.path.join(index.root, path))]
+
+
+def files(index):
+    return sorted(index._find(".", FILE, False, (), 0, 100)[0])
+
+
+def apply(index, *events):
+    index._apply(b"".join(events), 0.0)
+
+
+def test_build_indexes_the_tree_without_excluded_directories(index):
+    assert files(index) == ["src/app.py", "src/lib/util.py"]
+    assert index._find("LIB", DIRECTORY, True, (), 0, 10) == (["src/lib"], False)
+    assert index.entries == 4
+    assert len(index._inotify.watches) == 3
+    assert index.changes == []
+
+
+def test_created_file_is_added_and_reported(index, root):
+    (root / "src" / "new.py").write_text("x")
+    apply(index, event(wd(index, "src"), IN_CREATE, "new.py"))
+    assert "src/new.py" in files(index)
+    assert index.changes == [("src/new.py", True)]
+    # The same event again changes nothing
+    apply(index, event(wd(index, "src"), IN_CREATE, "new.py"))
+    assert index.entries == 5
+
+
+def test_written_file_is_reported(index):
+    apply(index, event(wd(index, "src"), IN_CLOSE_WRITE, "app.py"))
+    assert index.changes == [("src/app.py", True)]
+    assert index.entries == 4
+
+
+def test_created_directory_is_indexed_and_watched_recursively(index, root):
+    (root / "pkg" / "sub").mkdir(parents=True)
+    (root / "pkg" / "sub" / "mod.py").write_text("x")
+    apply(index, event(wd(index), IN_CREATE | IN_ISDIR, "pkg"))
+    assert "pkg/sub/mod.py" in files(index)
+    assert index.changes == [("pkg/sub/mod.py", True)]
+    # Changes inside the new directory are picked up from its own watch
+    (root / "pkg" / "sub" / "other.py").write_text("x")
+    apply(index, event(wd(index, "pkg/sub"), IN_CREATE, "other.py"))
+    assert "pkg/sub/other.py" in files(index)
+
+
+def test_deleted_file_is_removed_and_reported(index, root):
+    (root / "src" / "app.py").unlink()
+    apply(index, event(wd(index, "src"), IN_DELETE, "app.py"))
+    assert files(index) == ["src/lib/util.py"]
+    assert index.changes == [("src/app.py", False)]
+    assert index.entries == 3
+
+
+def test_moved_directory_is_reindexed_and_its_old_watch_dropped(index, root):
+    lib_wd = wd(index, "src/lib")
+    shutil.move(root / "src" / "lib", root / "lib")
+    apply(
+        index,
+        event(wd(index, "src"), IN_MOVED_FROM | IN_ISDIR, "lib", cookie=7),
+        event(wd(index), IN_MOVED_TO | IN_ISDIR, "lib", cookie=7),
+    )
+    assert files(index) == ["lib/util.py", "src/app.py"]
+    assert index.changes == [("src/lib/util.py", False), ("lib/util.py", True)]
+    assert index._inotify.removed == [lib_wd]
+    assert index.entries == 4
+
+
+def test_replaced_entry_takes_the_new_kind(index, root):
+    (root / "src" / "app.py").unlink()
+    (root / "src" / "app.py").mkdir()
+    apply(index, event(wd(index, "src"), IN_CREATE | IN_ISDIR, "app.py"))
+    assert files(index) == ["src/lib/util.py"]
+    assert index._find("app.py", DIRECTORY, True, (), 0, 10) == (["src/app.py"], False)
+    assert index.entries == 4
+
+
+def test_excluded_names_are_ignored(index, root):
+    (root / "src" / "node_modules").mkdir()
+    apply(index, event(wd(index, "src"), IN_CREATE | IN_ISDIR, "node_modules"))
+    assert index.entries == 4
+    assert index.changes == []
+
+
+def test_events_for_unknown_or_ignored_watches_are_skipped(index, root):
+    (root / "src" / "new.py").write_text("x")
+    apply(index, event(999, IN_CREATE, "new.py"))
+    src_wd = wd(index, "src")
+    apply(index, event(src_wd, IN_IGNORED), event(src_wd, IN_CREATE, "new.py"))
+    assert "src/new.py" not in files(index)
+
+
+def test_overflow_rebuilds_and_reports_lost_events(index, root):
+    (root / "missed.py").write_text("x")
+    apply(index, event(-1, IN_Q_OVERFLOW))
+    assert "missed.py" in files(index)
+    assert index.changes == ["lost"]
+    assert index.builds == 2
+    assert index.ready
+
+
+def test_removed_root_disables_the_index(index, root):
+    apply(index, event(wd(index), IN_DELETE_SELF))
+    assert not index.ready
+    (root / "src" / "new.py").write_text("x")
+    apply(index, event(wd(index, "src"), IN_CREATE, "new.py"))
+    assert "src/new.py" not in files(index)
@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from mcp_servers import rate_limiter
+from mcp_servers.exceptions import MCPRateLimitError
+from mcp_servers.rate_limiter import (
+    SQLiteTokenBucketRateLimiter,
+    TokenBucket,
+    TokenBucketRateLimiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_reserve_is_free_within_burst(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    assert [bucket.reserve(None) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.available() == 0
+
+
+def test_reserve_queues_fifo_beyond_burst(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1)
+    assert bucket.reserve(None) == 0.0
+    assert bucket.reserve(None) == pytest.approx(0.5)
+    assert bucket.reserve(None) == pytest.approx(1.0)
+    assert bucket.available() == pytest.approx(-2.0)
+
+
+def test_reserve_over_max_wait_takes_nothing(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    bucket.reserve(None)
+    with pytest.raises(MCPRateLimitError):
+        bucket.reserve(max_wait=0.5)
+    assert bucket.available() == 0
+
+
+def test_release_returns_reservation_and_caps_at_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    bucket.reserve(None)
+    bucket.reserve(None)
+    assert bucket.reserve(None) == pytest.approx(1.0)
+    bucket.release()
+    assert bucket.available() == 0
+    bucket.release()
+    bucket.release()
+    bucket.release()
+    assert bucket.available() == 2
+
+
+def test_refill_is_capped(clock):
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    bucket.reserve(None)
+    bucket.reserve(None)
+    clock.now += 0.1
+    assert bucket.available() == pytest.approx(1.0)
+    clock.now += 60
+    assert bucket.available() == 2
+
+
+def test_try_reserve_never_queues(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    assert bucket.try_reserve()
+    assert not bucket.try_reserve()
+    assert bucket.available() == 0
+
+
+def test_limiter_keeps_one_bucket_per_key(clock):
+    limiter = TokenBucketRateLimiter(rate_per_second=1.0, burst=1)
+
+    async def scenario():
+        return [await limiter.try_acquire(key) for key in ("a", "b", "a")]
+
+    assert asyncio.run(scenario()) == [True, True, False]
+    assert limiter.snapshot() == {"a": 0, "b": 0}
+
+
+def test_cancelled_acquire_releases_its_reservation():
+    limiter = TokenBucketRateLimiter(rate_per_second=1.0, burst=1)
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(scenario())
+    assert limiter.snapshot()["default"] == pytest.approx(0.0, abs=0.05)
+
+
+async def wait_for_tokens(limiter, key, expected, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        await limiter.refresh()
+        if limiter.snapshot().get(key) == pytest.approx(expected, abs=0.01):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{key} never reached {expected}: {limiter.snapshot()}")
+
+
+def test_sqlite_limiter_shares_one_budget(tmp_path):
+    path = tmp_path / "limits.sqlite3"
+    first = SQLiteTokenBucketRateLimiter(path, rate_per_second=0.01, burst=2)
+    second = SQLiteTokenBucketRateLimiter(path, rate_per_second=0.01, burst=2)
+
+    async def scenario():
+        assert await first.acquire() == 0.0
+        assert await second.try_acquire()
+        assert not await first.try_acquire()
+        await second.refresh()
+        assert second.snapshot()["default"] == pytest.approx(0.0, abs=0.01)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_limiter_releases_when_cancelled_while_waiting(tmp_path):
+    limiter = SQLiteTokenBucketRateLimiter(
+        tmp_path / "limits.sqlite3", rate_per_second=0.5, burst=1
+    )
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await wait_for_tokens(limiter, "default", -1.0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await wait_for_tokens(limiter, "default", 0.0)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        limiter.close()
+
+
+def test_sqlite_limiter_releases_when_cancelled_while_reserving(tmp_path):
+    limiter = SQLiteTokenBucketRateLimiter(
+        tmp_path / "limits.sqlite3", rate_per_second=0.01, burst=1
+    )
+
+    async def scenario():
+        limiter._lock.acquire()  # Keeps the reservation stuck in its thread
+        try:
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        finally:
+            limiter._lock.release()
+        # The token taken after the cancellation is handed back
+        await wait_for_tokens(limiter, "default", 1.0)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        limiter.close()
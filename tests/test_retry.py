@@ -0,0 +1,60 @@
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from mcp_servers.retry import compute_backoff_delay, get_retry_after_delay
+
+
+def test_no_hint():
+    assert get_retry_after_delay({}) is None
+
+
+@pytest.mark.parametrize(
+    "value, expected", [("3", 3.0), (" 1.5 ", 1.5), ("-4", 0.0), ("0", 0.0)]
+)
+def test_retry_after_seconds(value, expected):
+    assert get_retry_after_delay({"retry-after": value}) == expected
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = get_retry_after_delay({"retry-after": format_datetime(retry_at)})
+    assert 28 <= delay <= 30
+
+
+def test_retry_after_in_the_past_is_zero():
+    retry_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert get_retry_after_delay({"retry-after": format_datetime(retry_at)}) == 0.0
+
+
+@pytest.mark.parametrize("value", ["inf", "-inf", "nan", "Infinity", "soon", ""])
+def test_unusable_retry_after_is_ignored(value):
+    assert get_retry_after_delay({"retry-after": value}) is None
+
+
+def test_unusable_retry_after_falls_back_to_rate_limit_reset():
+    headers = {"retry-after": "inf", "x-ratelimit-reset": "7"}
+    assert get_retry_after_delay(headers) == 7.0
+
+
+def test_rate_limit_reset_uses_the_shortest_window():
+    assert get_retry_after_delay({"x-ratelimit-reset": "1, 1419704"}) == 1.0
+
+
+def test_rate_limit_reset_epoch_timestamp():
+    delay = get_retry_after_delay({"x-ratelimit-reset": str(int(time.time()) + 20)})
+    assert 18 <= delay <= 20
+
+
+@pytest.mark.parametrize("value", ["inf", "nan", "later"])
+def test_unusable_rate_limit_reset_is_ignored(value):
+    assert get_retry_after_delay({"x-ratelimit-reset": value}) is None
+
+
+def test_backoff_stays_within_bounds():
+    delay = 0.5
+    for _ in range(50):
+        delay = compute_backoff_delay(delay, base_delay=0.5, max_delay=4.0)
+        assert 0.5 <= delay <= 4.0
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from mcp_servers.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": len(calls)}
+
+    async def scenario():
+        results = await asyncio.gather(*(group.do("k", fetch) for _ in range(5)))
+        assert group.in_flight == 0
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_exception_reaches_every_waiter():
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(
+            group.do("k", fail), group.do("k", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_cancelling_one_waiter_keeps_the_call_running():
+    group = SingleFlight()
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return "done"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        first = asyncio.create_task(group.do("k", fetch))
+        second = asyncio.create_task(group.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_the_last_waiter_cancels_the_call():
+    group = SingleFlight()
+    started = []
+    cancelled = []
+
+    async def fetch():
+        started.append(1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return len(started)
+
+    async def scenario():
+        waiter = asyncio.create_task(group.do("k", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # A caller arriving before the abandoned call finishes starts a new one
+        fresh = asyncio.create_task(group.do("k", fetch))
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        fresh.cancel()
+        await asyncio.gather(fresh, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert group.in_flight == 0
+
+    asyncio.run(scenario())
+    assert len(started) == 2
+
+
+def test_keys_do_not_coalesce():
+    group = SingleFlight()
+
+    async def scenario():
+        async def value(v):
+            await asyncio.sleep(0)
+            return v
+
+        return await asyncio.gather(
+            group.do("a", lambda: value(1)), group.do("b", lambda: value(2))
+        )
+
+    assert asyncio.run(scenario()) == [1, 2]